@@ -9,7 +9,8 @@ import logging
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
 from agno.agent import Agent
-from agno.models.google import Gemini
+from model_provider import get_model
+from models import GoalPlan
 
 # Import tools
 from tools.calling_tool import CallingTool
@@ -80,7 +81,7 @@ def get_agent(
     show_tool_calls: bool = True
 ) -> Agent:
     model_id = model_name.split("/")[-1] if model_name and "/" in model_name else (model_name or DEFAULT_MODEL)
-    model = Gemini(id=model_id, api_key=GOOGLE_API_KEY)
+    model = get_model(model_id)
     
     db = get_db() if enable_storage else None
     
@@ -123,6 +124,61 @@ def get_default_agent() -> Agent:
 def get_user_agent(user_id: str, preferences: Optional[Dict[str, Any]] = None) -> Agent:
     return get_agent(user_id=user_id, user_preferences=preferences, enable_storage=True)
 
+PLAN_INSTRUCTIONS = """You are HabitElevate's plan designer. Given a user profile and a goal, write a realistic plan to reach the goal in the given duration.
+- Build it around the user's schedule, current habits and challenges.
+- Habits must be small, specific and doable on their schedule.
+- Milestones cover the whole duration in order, each with concrete actions.
+- Tips address the listed challenges directly.
+Answer only with the plan."""
+
+_plan_agent: Optional[Agent] = None
+
+def get_plan_agent() -> Agent:
+    """
+    Agent used only for goal plans: compact prompt, structured GoalPlan output,
+    no tools, storage, history or memories. Created once and reused, since a
+    plan run keeps no per-user state on the agent.
+    """
+    global _plan_agent
+    if _plan_agent is None:
+        _plan_agent = Agent(
+            model=get_model(DEFAULT_MODEL),
+            id="habit-elevate-plan-agent",
+            name="HabitElevate Plan Designer",
+            instructions=PLAN_INSTRUCTIONS,
+            output_schema=GoalPlan,
+            markdown=False,
+            telemetry=False,
+        )
+    return _plan_agent
+
+PLAN_STREAM_FORMAT = """
+Write the plan as JSON Lines: one complete JSON object per line, no code fences, in this order:
+{"section": "overview", "title": "...", "summary": "...", "duration": "..."}
+{"section": "habit", "name": "...", "description": "...", "frequency": "daily|weekly|monthly|custom", "time_of_day": "..."}   (one line per habit)
+{"section": "milestone", "period": "...", "focus": "...", "actions": ["..."]}   (one line per milestone, in order)
+{"section": "tip", "text": "..."}   (one line per tip)"""
+
+_plan_stream_agent: Optional[Agent] = None
+
+def get_plan_stream_agent() -> Agent:
+    """
+    Plan agent for section-by-section streaming: same prompt as get_plan_agent,
+    but it writes one JSON object per section so each can be sent as soon as
+    its line is complete.
+    """
+    global _plan_stream_agent
+    if _plan_stream_agent is None:
+        _plan_stream_agent = Agent(
+            model=get_model(DEFAULT_MODEL),
+            id="habit-elevate-plan-stream-agent",
+            name="HabitElevate Plan Designer (streaming)",
+            instructions=PLAN_INSTRUCTIONS + PLAN_STREAM_FORMAT,
+            markdown=False,
+            telemetry=False,
+        )
+    return _plan_stream_agent
+
 # Updated to use AgentOS instead of AGUIApp
 agent_os = AgentOS(
     agents=[get_default_agent()],
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from service.call_store import CallStore
+
+router = APIRouter(prefix="/api/v1/calls", tags=["calls"])
+
+@router.get("/search")
+async def search_calls(
+    user_id: Optional[str] = Query(None, description="User whose calls to search"),
+    q: Optional[str] = Query(None, description="What to look for, e.g. 'commit gym'"),
+    limit: int = Query(5, ge=1, le=50, description="Maximum number of calls to return"),
+):
+    """Search a user's past call transcripts, best matches first with highlighted snippets"""
+    if not user_id:
+        raise HTTPException(status_code=400, detail="user_id is required to search calls")
+    if not q or not q.strip():
+        raise HTTPException(status_code=400, detail="q is required to search calls")
+    
+    result = await CallStore.search_transcripts(user_id, q, limit)
+    
+    if result["success"]:
+        return {
+            "status": "success",
+            "data": result["data"],
+            "message": result["message"]
+        }
+    else:
+        raise HTTPException(status_code=500, detail=result["message"])
@@ -3,10 +3,15 @@ Goal Plan Generation API
 Generates personalized habit plans based on user goals and profile using Agno Agent
 """
 
-from fastapi import APIRouter, HTTPException, Body  
+from fastapi import APIRouter, HTTPException, Body, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Any
-from service.goals_service import generate_plan
+from service.goals_service import get_or_generate_plan
+from service.plan_cache import plan_cache
+from service.plan_jobs import plan_job_queue, PlanQueueFull
+from service.plan_batch import generate_plan_batch, PLAN_BATCH_MAX_ITEMS
+from service.plan_stream import stream_plan_sections
 router = APIRouter()
 
 
@@ -29,11 +34,37 @@ class GeneratePlanRequest(BaseModel):
     user_id: str
     profile: UserProfile
     goal: GoalData
+    force_regenerate: bool = Field(default=False, description="Skip the plan cache and generate a fresh plan")
 
 
 class GeneratePlanResponse(BaseModel):
     success: bool
     plan:Any = Field(default=None,description="The generated plan")
+    cached: bool = Field(default=False, description="Served from the plan cache")
+
+
+class BatchPlanRequest(BaseModel):
+    requests: List[GeneratePlanRequest] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(default=None, ge=1, description="Plans generated at the same time")
+
+
+def plan_inputs(request: GeneratePlanRequest):
+    """Profile and goal dicts the plan is generated (and cached) from"""
+    profile_dict = {
+        "age": request.profile.age,
+        "schedule": request.profile.schedule,
+        "goals": request.profile.goals,
+        "challenges": request.profile.challenges,
+        "currenthabits": request.profile.currenthabits,
+        "description": request.profile.description
+    }
+    goal_dict = {
+        "primary_goal": request.goal.primary_goal,
+        "goal_duration": request.goal.goal_duration,
+        "duration_type": request.goal.duration_type
+    }
+    return profile_dict, goal_dict
+
 
 @router.post("/generate-goal-plan", response_model=GeneratePlanResponse)
 async def generate_goal_plan_endpoint(request: GeneratePlanRequest = Body(...)):
@@ -51,37 +82,22 @@ async def generate_goal_plan_endpoint(request: GeneratePlanRequest = Body(...)):
         if not request.user_id or not request.goal.primary_goal:
             raise HTTPException(status_code=400, detail="Missing required fields")
         
-        # Convert profile to dict
         print('request body ! ', request);
-        profile_dict = {
-            "age": request.profile.age,
-            "schedule": request.profile.schedule,
-            "goals": request.profile.goals,
-            "challenges": request.profile.challenges,
-            "currenthabits": request.profile.currenthabits,
-            "description": request.profile.description
-        }
-        
-        # Convert goal to dict
-        # goal_dict = {
-        #     "primary_goal": request.goal.primary_goal,
-        #     "goal_duration": request.goal.goal_duration,
-        #     "duration_type": request.goal.duration_type
-        # }
-        
-        # # Include goal information in profile for generation
-        # profile_dict["goal"] = goal_dict
+        profile_dict, goal_dict = plan_inputs(request)
         
-        # Generate the plan using chat service
-        plan = await generate_plan(
+        # Same normalized profile + goal -> same plan, unless asked to regenerate
+        plan, cached = await get_or_generate_plan(
             user_id=request.user_id,
-            profile=profile_dict
+            profile=profile_dict,
+            goal=goal_dict,
+            force_regenerate=request.force_regenerate
         )
         print("planrecived from the generate goal fx ",plan)
         
         return GeneratePlanResponse(
             success=True,
-            plan=plan
+            plan=plan,
+            cached=cached
         )
         
     except Exception as e:
@@ -90,3 +106,127 @@ async def generate_goal_plan_endpoint(request: GeneratePlanRequest = Body(...)):
             detail=f"Internal server error: {str(e)}"
         )
 
+
+@router.get("/generate-goal-plan/cache-stats")
+async def plan_cache_stats():
+    """Hit/miss counters and size of the plan cache"""
+    return {
+        "status": "success",
+        "data": plan_cache.snapshot(),
+        "message": "Plan cache stats retrieved successfully"
+    }
+
+
+
+@router.post("/generate-goal-plan/jobs", status_code=202)
+async def submit_goal_plan_job(request: GeneratePlanRequest = Body(...)):
+    """
+    Queue plan generation and return a job id right away.
+
+    Poll GET /generate-goal-plan/jobs/{job_id} for the status and, once it
+    has succeeded, the plan.
+    """
+    if not request.user_id or not request.goal.primary_goal:
+        raise HTTPException(status_code=400, detail="Missing required fields")
+
+    profile_dict, goal_dict = plan_inputs(request)
+    try:
+        job = await plan_job_queue.submit(request.user_id, lambda: get_or_generate_plan(
+            user_id=request.user_id,
+            profile=profile_dict,
+            goal=goal_dict,
+            force_regenerate=request.force_regenerate
+        ))
+    except PlanQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+    return {
+        "status": "success",
+        "data": {
+            "job_id": job["id"],
+            "status": job["status"],
+            "status_url": f"/generate-goal-plan/jobs/{job['id']}"
+        },
+        "message": "Plan generation queued"
+    }
+
+
+@router.get("/generate-goal-plan/jobs/metrics")
+async def goal_plan_job_metrics():
+    """Queue depth, throughput and wait/run durations of plan jobs on this worker"""
+    return {
+        "status": "success",
+        "data": plan_job_queue.metrics(),
+        "message": "Plan job metrics retrieved successfully"
+    }
+
+
+@router.get("/generate-goal-plan/jobs/{job_id}")
+async def get_goal_plan_job(job_id: str, wait: float = Query(default=0, ge=0, le=30, description="Seconds to wait for the job to finish")):
+    """Status of a plan job, with the plan once it has succeeded"""
+    job = await plan_job_queue.get(job_id, wait_seconds=wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Plan job not found or expired")
+
+    return {
+        "status": "success",
+        "data": job,
+        "message": f"Plan job {job['status']}"
+    }
+
+
+@router.post("/generate-goal-plan/batch")
+async def generate_goal_plan_batch(request: BatchPlanRequest = Body(...)):
+    """
+    Generate plans for a whole cohort, streamed as NDJSON.
+
+    One `{"type": "result", ...}` line per request (with its index in the
+    batch) as soon as its plan is ready, then a `{"type": "summary", ...}`
+    line. Identical inputs are generated once; failures are retried and
+    reported per item.
+    """
+    if len(request.requests) > PLAN_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {PLAN_BATCH_MAX_ITEMS} requests per batch")
+    for item in request.requests:
+        if not item.user_id or not item.goal.primary_goal:
+            raise HTTPException(status_code=400, detail="Missing required fields")
+
+    items = []
+    for index, item in enumerate(request.requests):
+        profile_dict, goal_dict = plan_inputs(item)
+        items.append({
+            "index": index,
+            "user_id": item.user_id,
+            "profile": profile_dict,
+            "goal": goal_dict,
+            "force_regenerate": item.force_regenerate
+        })
+
+    return StreamingResponse(
+        generate_plan_batch(items, concurrency=request.concurrency),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.post("/generate-goal-plan/stream")
+async def stream_goal_plan(request: GeneratePlanRequest = Body(...)):
+    """
+    Generate a plan and stream it over SSE, one event per section (overview,
+    habits, milestones, tips) as soon as it is written and validated, then a
+    `done` event with the whole plan.
+    """
+    if not request.user_id or not request.goal.primary_goal:
+        raise HTTPException(status_code=400, detail="Missing required fields")
+
+    profile_dict, goal_dict = plan_inputs(request)
+    return StreamingResponse(
+        stream_plan_sections(request.user_id, profile_dict, goal_dict, request.force_regenerate),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "*",
+        }
+    )
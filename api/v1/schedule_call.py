@@ -1,48 +1,152 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from datetime import datetime
-from apscheduler.schedulers.background import BackgroundScheduler
-from tools.calling_tool import CallingTool  # Assuming this can be instantiated
+from pydantic import BaseModel, Field, field_validator
+from datetime import datetime, time, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from service.call_jobs import ScheduledCallService, to_utc
+from service.call_scheduler import call_scheduler
 
 router = APIRouter()
 
-# Initialize scheduler
-scheduler = BackgroundScheduler()
-scheduler.start()
-
-# Instantiate the calling tool
-calling_tool = CallingTool()
-
 class ScheduleRequest(BaseModel):
     phone_number: str
     schedule_time: datetime
     user_id: str
 
-def make_call(phone_number: str, user_id: str):
-    """Function to be executed by the scheduler to make a call."""
-    try:
-        print(f"Executing call to {phone_number} for user {user_id} at {datetime.now()}")
-        # You might need to adjust how you call this method based on your CallingTool implementation
-        result = calling_tool.call_phone_number(phone_number=phone_number, user_id=user_id)
-        print(f"Call result: {result}")
-    except Exception as e:
-        print(f"Failed to make call to {phone_number}: {e}")
+class CheckinScheduleRequest(BaseModel):
+    user_id: str
+    phone_number: str
+    local_time: time
+    timezone: str = "Asia/Kolkata"
+    window_minutes: int = Field(default=60, ge=1, le=24 * 60)
+
+    @field_validator("timezone")
+    @classmethod
+    def known_timezone(cls, value: str) -> str:
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone: {value}")
+        return value
 
 @router.post("/schedule-call")
 async def schedule_call(request: ScheduleRequest):
     """
     Schedules a call to a specified phone number at a given time.
+
+    The job is stored durably and placed by whichever worker claims it first,
+    so it survives restarts and fires once no matter how many workers run.
     """
-    if request.schedule_time < datetime.now():
+    run_at = to_utc(request.schedule_time)
+    if run_at < datetime.now(timezone.utc):
         raise HTTPException(status_code=400, detail="Scheduled time must be in the future.")
 
+    result = await ScheduledCallService.schedule(request.user_id, request.phone_number, run_at)
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=f"Failed to schedule call: {result['message']}")
+
+    call_scheduler.wake()
+    return {
+        "message": f"Call scheduled for {request.phone_number} at {request.schedule_time}",
+        "job_id": result["data"]["id"],
+        "data": result["data"]
+    }
+
+@router.get("/schedule-call")
+async def list_scheduled_calls(user_id: str, include_finished: bool = True, limit: int = 50):
+    """
+    Lists a user's scheduled calls, latest first.
+    """
+    result = await ScheduledCallService.list_for_user(user_id, include_finished, min(max(limit, 1), 200))
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=result["message"])
+
+    return {
+        "status": "success",
+        "data": result["data"],
+        "message": result["message"]
+    }
+
+@router.delete("/schedule-call/{job_id}")
+async def cancel_scheduled_call(job_id: str, user_id: str):
+    """
+    Cancels a scheduled call that hasn't been placed yet.
+    """
+    result = await ScheduledCallService.cancel(job_id, user_id)
+    if not result["success"]:
+        raise HTTPException(status_code=404, detail=result["message"])
+
+    return {
+        "status": "success",
+        "data": result["data"],
+        "message": result["message"]
+    }
+
+@router.get("/schedule-call/metrics")
+async def scheduled_call_metrics():
+    """
+    Dispatch metrics for this worker: throughput, failures, retries, queue lag
+    and the number of due calls still waiting to be claimed.
+    """
+    data = call_scheduler.metrics_snapshot()
     try:
-        scheduler.add_job(
-            make_call,
-            'date',
-            run_date=request.schedule_time,
-            args=[request.phone_number, request.user_id]
-        )
-        return {"message": f"Call scheduled for {request.phone_number} at {request.schedule_time}"}
+        data["due_backlog"] = await ScheduledCallService.count_due()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to schedule call: {e}")
+        data["due_backlog"] = None
+        print(f"Could not count due calls: {e}")
+
+    return {
+        "status": "success",
+        "data": data,
+        "message": "Dispatch metrics retrieved successfully"
+    }
+
+@router.post("/schedule-call/recurring")
+async def create_checkin_schedule(request: CheckinScheduleRequest):
+    """
+    Calls the user every day at a time spread over
+    [local_time, local_time + window_minutes) in their timezone.
+    """
+    result = await ScheduledCallService.create_schedule(
+        request.user_id, request.phone_number, request.local_time, request.timezone, request.window_minutes
+    )
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=result["message"])
+
+    # Queue today's call right away instead of at the next enqueue round
+    await call_scheduler.enqueue_checkins()
+    call_scheduler.wake()
+    return {
+        "status": "success",
+        "data": result["data"],
+        "message": result["message"]
+    }
+
+@router.get("/schedule-call/recurring")
+async def list_checkin_schedules(user_id: str):
+    """
+    Lists a user's recurring check-in schedules.
+    """
+    result = await ScheduledCallService.list_schedules(user_id)
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=result["message"])
+
+    return {
+        "status": "success",
+        "data": result["data"],
+        "message": result["message"]
+    }
+
+@router.delete("/schedule-call/recurring/{schedule_id}")
+async def delete_checkin_schedule(schedule_id: str, user_id: str):
+    """
+    Stops a recurring check-in and cancels the calls it already queued.
+    """
+    result = await ScheduledCallService.delete_schedule(schedule_id, user_id)
+    if not result["success"]:
+        raise HTTPException(status_code=404, detail=result["message"])
+
+    return {
+        "status": "success",
+        "data": result["data"],
+        "message": result["message"]
+    }
@@ -1,20 +1,36 @@
 """
-VAPI Webhook Handler for Add_todo Tool
+VAPI Webhook Handler for the voice todo tools
 
-Handles incoming webhook requests from VAPI when the Add_todo tool is called.
+Handles incoming webhook requests from VAPI when the Add_todo, Delete_todo,
+Update_todo or Read_todo tools are called.
 """
 
 from fastapi import APIRouter, Request, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+import asyncio
+import json
 import logging
+import time
 import uuid
 from service.todo_crud import TodoService
-from models import TodoCreate
+from service.todo_matcher import TodoMatcher
+from service.vapi_deadline import TOOL_BUDGET_SECONDS, run_within_budget, pop_pending_outcomes
+from service.idempotency import get_idempotency_store
+from service.call_store import CallStore, report_to_record, record_to_call
+from service.transcript_waiter import transcript_waiter
+from service.call_log_service import CallLogService
+from service.call_dispatch import retry_if_unanswered
+from service.call_scheduler import call_scheduler
+from service.call_warmup import CallWarmup, format_todos_for_speech
+from models import TodoCreate, TodoUpdate
 
 router = APIRouter(prefix="/api/v1/vapi", tags=["vapi"])
 logger = logging.getLogger(__name__)
 
+# VAPI retries slow webhooks - each toolCallId is only ever executed once
+idempotency_store = get_idempotency_store()
+
 
 def phone_to_uuid(phone_number: str) -> str:
     """
@@ -33,13 +49,175 @@ class VapiToolRequest(BaseModel):
     call: Optional[Dict[str, Any]] = None
 
 
+def parse_tool_arguments(function_info: Dict[str, Any]) -> Dict[str, Any]:
+    """VAPI can send the arguments as a JSON string or as a dict"""
+    arguments_raw = function_info.get("arguments") or "{}"
+    print("args vapi sent", arguments_raw)
+    if isinstance(arguments_raw, str):
+        return json.loads(arguments_raw)
+    return arguments_raw
+
+
+# =============================================================================
+# TOOL HANDLERS - each returns {"result": ...} or {"error": ...}
+# =============================================================================
+
+def confirmation_question(match: Dict[str, Any]) -> str:
+    """What we ask when several todos match about equally well"""
+    options = [match["todo"]["text"]] + match["alternatives"]
+    quoted = ", ".join(f"'{text}'" for text in options[:-1]) + f" or '{options[-1]}'"
+    return f"I found a few todos that could match: {quoted}. Which one did you mean? Please say its full name."
+
+
+async def handle_add_todo(user_id: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    todo_text = arguments.get("todo")
+    if not todo_text:
+        return {"error": "Missing 'todo' parameter"}
+    
+    todo_data = TodoCreate(
+        text=todo_text,
+        user_id=str(user_id)
+    )
+    result = await TodoService.create_todo(todo_data)
+    
+    if result["success"]:
+        print(f"Successfully created todo: {todo_text} for user: {user_id}")
+        return {"result": f"Successfully added todo: '{todo_text}' to your list!"}
+    
+    logger.error(f"Failed to create todo: {result['message']}")
+    return {"error": f"Failed to add todo: {result['message']}"}
+
+
+async def handle_delete_todo(user_id: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    todo_text = arguments.get("todo")
+    if not todo_text:
+        return {"error": "Missing 'todo' parameter"}
+    
+    # Rank the user's todos against what they said (server-side)
+    match_result = await TodoMatcher.best_match(str(user_id), todo_text)
+    if not match_result["success"]:
+        return {"error": match_result["message"]}
+    
+    if match_result["data"]["ambiguous"]:
+        return {"result": confirmation_question(match_result["data"])}
+    
+    matching_todo = match_result["data"]["todo"]
+    print(f"Matched '{todo_text}' -> '{matching_todo['text']}' (score {match_result['data']['score']})")
+    
+    delete_result = await TodoService.delete_todo(matching_todo["id"])
+    
+    if delete_result["success"]:
+        print(f"Successfully deleted todo: {matching_todo['text']} for user: {user_id}")
+        return {"result": f"Successfully deleted todo: '{matching_todo['text']}'"}
+    
+    logger.error(f"Failed to delete todo: {delete_result['message']}")
+    return {"error": f"Failed to delete todo: {delete_result['message']}"}
+
+
+async def handle_update_todo(user_id: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    todo_text = arguments.get("todo")
+    if not todo_text:
+        return {"error": "Missing 'todo' parameter"}
+    
+    match_result = await TodoMatcher.best_match(str(user_id), todo_text)
+    if not match_result["success"]:
+        return {"error": match_result["message"]}
+    
+    if match_result["data"]["ambiguous"]:
+        return {"result": confirmation_question(match_result["data"])}
+    
+    matching_todo = match_result["data"]["todo"]
+    try:
+        todo_update = TodoUpdate(text=arguments.get("new_text"), completed=arguments.get("completed"))
+    except ValueError as e:
+        return {"error": f"Invalid update: {str(e)}"}
+    
+    update_result = await TodoService.update_todo(matching_todo["id"], todo_update)
+    
+    if update_result["success"]:
+        updated = update_result["data"]
+        status = "done" if updated.get("completed") else "pending"
+        return {"result": f"Updated todo: '{updated['text']}' ({status})"}
+    
+    return {"error": f"Failed to update todo: {update_result['message']}"}
+
+
+async def handle_read_todo(user_id: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    # A specific todo was asked about - look up just that one
+    if arguments.get("todo"):
+        match_result = await TodoMatcher.best_match(str(user_id), arguments["todo"])
+        if not match_result["success"]:
+            return {"error": match_result["message"]}
+        
+        matching_todo = match_result["data"]["todo"]
+        status = "already done" if matching_todo.get("completed") else "still pending"
+        return {"result": f"'{matching_todo['text']}' is {status}."}
+    
+    # Scheduled calls have the list ready before the user picks up
+    summary = CallWarmup.spoken_summary(user_id)
+    if summary is not None:
+        return {"result": summary}
+    
+    todos_result = await TodoService.get_todos(user_id)
+    if not todos_result["success"]:
+        return {"error": f"Failed to retrieve todos: {todos_result['message']}"}
+    
+    todos = todos_result["data"]
+    print(f"Successfully retrieved {len(todos)} todos for user: {user_id}")
+    return {"result": format_todos_for_speech(todos)}
+
+
+# name -> (handler, what we say if it runs over budget)
+TOOL_HANDLERS = {
+    "Add_todo": (handle_add_todo, "Got it, I'm adding that to your list now."),
+    "Delete_todo": (handle_delete_todo, "Okay, I'm removing that from your list now."),
+    "Update_todo": (handle_update_todo, "Okay, I'm updating that todo now."),
+    "Read_todo": (handle_read_todo, "Give me one second, I'm still pulling up your list."),
+}
+
+
+async def _run_tool_call(tool_call: Dict[str, Any], user_id: str, call_id: str, deadline: float) -> Dict[str, Any]:
+    tool_call_id = tool_call.get("id")
+    print(f"Processing tool call ID: {tool_call_id}")
+    
+    function_info = tool_call.get("function", {})
+    function_name = function_info.get("name")
+    
+    if function_name not in TOOL_HANDLERS:
+        return {
+            "toolCallId": tool_call_id,
+            "error": f"Unknown function: {function_name}"
+        }
+    
+    try:
+        arguments = parse_tool_arguments(function_info)
+    except json.JSONDecodeError as e:
+        return {
+            "toolCallId": tool_call_id,
+            "error": f"Invalid arguments: {str(e)}"
+        }
+    
+    handler, acknowledgement = TOOL_HANDLERS[function_name]
+    outcome = await idempotency_store.run(tool_call_id, lambda: run_within_budget(
+        handler_name=function_name,
+        call_id=call_id,
+        handler=handler,
+        args=(user_id, arguments),
+        acknowledgement=acknowledgement,
+        budget=deadline - time.monotonic(),
+    ), pending={"result": acknowledgement}, wait_seconds=deadline - time.monotonic())
+    return {"toolCallId": tool_call_id, **outcome}
+
+
 @router.post("/webhook")
 async def vapi_add_todo_webhook(request: Request):
     """
-    Webhook endpoint to handle VAPI Add_todo tool calls.
+    Webhook endpoint to handle VAPI todo tool calls (Add_todo, Delete_todo, Update_todo, Read_todo).
     
     When a user says something like "add a todo to buy milk" during a VAPI call,
     this endpoint receives the request and saves the todo to the database.
+    The whole request runs under VAPI_TOOL_BUDGET_SECONDS; slower handlers are
+    acknowledged immediately and their outcome is reported on the next turn.
     
     Expected payload from VAPI:
     {
@@ -60,6 +238,7 @@ async def vapi_add_todo_webhook(request: Request):
         }
     }
     """
+    deadline = time.monotonic() + TOOL_BUDGET_SECONDS
     try:
     
         payload = await request.json()
@@ -68,17 +247,9 @@ async def vapi_add_todo_webhook(request: Request):
         
         # Extract the message and call information
         message = payload.get("message", {})
+        call_info = message.get("call") or payload.get("call") or {}
+        call_id = call_info.get("id", "unknown_call")
         
-        # phone_number = (
-        #     payload.get("call", {})
-        #         .get("customer", {})
-        #         .get("number")
-        # ) or (
-        #     payload.get("customer", {})
-        #         .get("number")
-        # ) or call_info.get("id", "unknown_user")
-
-        # print("PHONE NUMBER ---->>>>",phone_number)
         phone_number = (
             payload.get("message", {})
                 .get("call", {})
@@ -92,16 +263,49 @@ async def vapi_add_todo_webhook(request: Request):
         
         print("PHONE NUMBER ---->>>>", phone_number)
         
+        # Check what kind of message this is
+        message_type = message.get("type")
+        
+        # Calls that ended: keep the report so transcript lookups don't hit the VAPI API
+        if message_type == "end-of-call-report":
+            call_scheduler.call_ended(call_id)
+            user_id = None
+            if phone_number != "unknown_user":
+                try:
+                    user_id = await CallWarmup.user_id_for(phone_number)
+                except Exception as db_error:
+                    logger.warning(f"Could not resolve user for call report: {str(db_error)}")
+            
+            store_result, _, _ = await asyncio.gather(
+                CallStore.save_end_of_call_report(message, user_id),
+                CallLogService.update_status(call_id, "ended", message.get("endedReason")),
+                # Scheduled check-ins nobody picked up go back in the queue
+                retry_if_unanswered(call_id, message.get("endedReason")),
+            )
+            print(f"Stored end-of-call report for call {call_id}: {store_result['message']}")
+            # Wake up anyone waiting on this transcript
+            transcript_waiter.notify(call_id, record_to_call(report_to_record(message, user_id)))
+            return {
+                "status": "received",
+                "message": store_result["message"]
+            }
+        
+        # Keep the call log's status in step with VAPI
+        if message_type == "status-update" and message.get("status"):
+            if message["status"] == "ended":
+                call_scheduler.call_ended(call_id)
+            await CallLogService.update_status(call_id, message["status"], message.get("endedReason"))
+            return {
+                "status": "received",
+                "message": f"Call status updated to {message['status']}"
+            }
+        
         # Query users_profile table to get the actual user_id using phone number
         if phone_number and phone_number != "unknown_user":
-            from database.supabaseClient import supabase
-            
             try:
-                # Query users_profile table for user with matching phone number
-                result = supabase.table("users_profile").select("id").eq("phone", phone_number).execute()
+                user_id = await CallWarmup.user_id_for(phone_number)
                 
-                if result.data and len(result.data) > 0:
-                    user_id = result.data[0]["id"]
+                if user_id:
                     print(f"Found user in database - Phone: {phone_number} -> User ID: {user_id}")
                 else:
                     logger.warning(f"No user found with phone number: {phone_number}")
@@ -126,8 +330,6 @@ async def vapi_add_todo_webhook(request: Request):
             }
         
         # Check if this is a tool call
-        message_type = message.get("type")
-        
         if message_type == "tool-calls":
             # Extract tool calls
             tool_calls = message.get("toolCalls", [])
@@ -139,177 +341,20 @@ async def vapi_add_todo_webhook(request: Request):
                     }]
                 }
             
-            # Process each tool call
-            results = []
-            print("all the tools calls vapi did",tool_calls)
-            for tool_call in tool_calls:
-                # Extract tool call ID
-                tool_call_id = tool_call.get("id")
-                print(f"Processing tool call ID: {tool_call_id}")
-                
-                function_info = tool_call.get("function", {})
-                function_name = function_info.get("name")
+            # Process the tool calls concurrently, all sharing the same deadline
+            print("all the tools calls vapi did", tool_calls)
+            results = list(await asyncio.gather(*[
+                _run_tool_call(tool_call, user_id, call_id, deadline)
+                for tool_call in tool_calls
+            ]))
             
-                
-                # Handle Add_todo function
-                if function_name == "Add_todo":
-                    # Parse arguments (VAPI can send as JSON string or dict)
-                    import json
-                    arguments_raw = function_info.get("arguments", "{}")
-                    print("args vapi sent",arguments_raw)
-                    print("type of args vapi sent",type(arguments_raw))
-                    
-                    # Check if arguments is already a dict or needs parsing
-                    if isinstance(arguments_raw, str):
-                        arguments = json.loads(arguments_raw)
-                    else:
-                        arguments = arguments_raw
-                    
-                    todo_text = arguments.get("todo")
-                    
-                    if not todo_text:
-                        results.append({
-                            "toolCallId": tool_call_id,
-                            "error": "Missing 'todo' parameter"
-                        })
-                        continue
-                    
-                    # Create the todo in database
-                    
-                    todo_data = TodoCreate(
-                        text=todo_text,
-                        user_id=str(user_id)
-                    )
-                    # need to add userId somehow in the todo_data !
-                    result = await TodoService.create_todo(todo_data)
-                    
-                    if result["success"]:
-                        print(f"Successfully created todo: {todo_text} for user: {user_id}")
-                        results.append({
-                            "toolCallId": tool_call_id,
-                            "result": f"Successfully added todo: '{todo_text}' to your list!"
-                        })
-                    else:
-                        logger.error(f"Failed to create todo: {result['message']}")
-                        results.append({
-                            "toolCallId": tool_call_id,
-                            "error": f"Failed to add todo: {result['message']}"
-                        })
-                elif function_name == "Delete_todo":
-                    # Parse arguments
-                    import json
-                    arguments_raw = function_info.get("arguments", "{}")
-                    print("Delete_todo args:", arguments_raw)
-                    print("Type of args:", type(arguments_raw))
-                    
-                    # Check if arguments is already a dict or needs parsing
-                    if isinstance(arguments_raw, str):
-                        arguments = json.loads(arguments_raw)
-                    else:
-                        arguments = arguments_raw
-                    
-                    todo_text = arguments.get("todo")
-                    
-                    if not todo_text:
-                        results.append({
-                            "toolCallId": tool_call_id,
-                            "error": "Missing 'todo' parameter"
-                        })
-                        continue
-                    
-                    # Get all user's todos to find the matching one
-                    todos_result = await TodoService.get_todos(user_id)
-                    
-                    if not todos_result["success"]:
-                        results.append({
-                            "toolCallId": tool_call_id,
-                            "error": f"Failed to retrieve todos: {todos_result['message']}"
-                        })
-                        continue
-                    
-                    # Find the todo that matches the text (case-insensitive partial match)
-                    matching_todo = None
-                    todo_text_lower = todo_text.lower()
-                    
-                    for todo in todos_result["data"]:
-                        if todo_text_lower in todo["text"].lower():
-                            matching_todo = todo
-                            break
-                    
-                    if not matching_todo:
-                        results.append({
-                            "toolCallId": tool_call_id,
-                            "error": f"Could not find a todo matching '{todo_text}'"
-                        })
-                        continue
-                    
-                    # Delete the todo using the ID
-                    delete_result = await TodoService.delete_todo(matching_todo["id"])
-                    
-                    if delete_result["success"]:
-                        print(f"Successfully deleted todo: {matching_todo['text']} for user: {user_id}")
-                        results.append({
-                            "toolCallId": tool_call_id,
-                            "result": f"Successfully deleted todo: '{matching_todo['text']}'"
-                        })
-                    else:
-                        logger.error(f"Failed to delete todo: {delete_result['message']}")
-                        results.append({
-                            "toolCallId": tool_call_id,
-                            "error": f"Failed to delete todo: {delete_result['message']}"
-                        })
-                
-                elif function_name == "Read_todo":
-                    # Get all todos for the user
-                    todos_result = await TodoService.get_todos(user_id)
-                    print("todos_result",todos_result)
-                    if not todos_result["success"]:
-                        results.append({
-                            "toolCallId": tool_call_id,
-                            "error": f"Failed to retrieve todos: {todos_result['message']}"
-                        })
-                        continue
-                    
-                    todos = todos_result["data"]
-                    
-                    if not todos or len(todos) == 0:
-                        results.append({
-                            "toolCallId": tool_call_id,
-                            "result": "You don't have any todos yet. Your list is empty!"
-                        })
-                        continue
-                    
-                    # Format todos into a readable string
-                    # Separate completed and pending todos
-                    pending_todos = [t for t in todos if not t.get("completed", False)]
-                    completed_todos = [t for t in todos if t.get("completed", False)]
-                    
-                    response_parts = []
-                    
-                    if pending_todos:
-                        response_parts.append(f"You have {len(pending_todos)} pending todo{'s' if len(pending_todos) != 1 else ''}:")
-                        for idx, todo in enumerate(pending_todos, 1):
-                            response_parts.append(f"{idx}. {todo['text']}")
-                    
-                    if completed_todos:
-                        if pending_todos:
-                            response_parts.append("")  # Add spacing
-                        response_parts.append(f"You have {len(completed_todos)} completed todo{'s' if len(completed_todos) != 1 else ''}:")
-                        for idx, todo in enumerate(completed_todos, 1):
-                            response_parts.append(f"{idx}. {todo['text']} ✓")
-                    
-                    result_text = "\n".join(response_parts)
-                    print(f"Successfully retrieved {len(todos)} todos for user: {user_id}")
-                    results.append({
-                        "toolCallId": tool_call_id,
-                        "result": result_text
-                    })
-                
-                else:
-                    results.append({
-                        "toolCallId": tool_call_id,
-                        "error": f"Unknown function: {function_name}"
-                    })
+            # Tell the caller how earlier acknowledged-but-slow requests went. They ride
+            # on the first result that succeeded; if none did they stay queued for the next turn.
+            spoken = next((result for result in results if "result" in result), None)
+            if spoken is not None:
+                late_outcomes = pop_pending_outcomes(call_id)
+                if late_outcomes:
+                    spoken["result"] = " ".join(late_outcomes + [spoken["result"]])
             
             # Return all results with their corresponding tool call IDs
             return {"results": results}
@@ -0,0 +1,48 @@
+"""
+Workflow API
+Runs the agno pipelines by name and streams their steps over SSE
+"""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from service.workflow_runs import WORKFLOWS, list_workflows, stream_workflow
+router = APIRouter(prefix="/api/v1/workflows", tags=["workflows"])
+
+
+class WorkflowRunRequest(BaseModel):
+    input: str = Field(..., min_length=1, description="Input passed to the first step")
+    use_cache: bool = Field(default=False, description="Replay unchanged steps from the step cache")
+
+
+@router.get("")
+async def get_workflows():
+    """Workflows that can be run"""
+    return {
+        "status": "success",
+        "data": list_workflows(),
+        "message": "Workflows retrieved successfully"
+    }
+
+
+@router.post("/{name}/run")
+async def run_workflow(name: str, request: WorkflowRunRequest):
+    """
+    Run a workflow and stream its progress as Server-Sent Events: step_started,
+    step_output and step_completed (with its duration) for every step, then
+    done with the final content and per-step timings, or error. Every step
+    runs fresh unless use_cache is set.
+    """
+    if name not in WORKFLOWS:
+        raise HTTPException(status_code=404, detail=f"Unknown workflow: {name}")
+
+    return StreamingResponse(
+        stream_workflow(name, request.input, request.use_cache),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "*",
+        }
+    )
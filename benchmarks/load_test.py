@@ -0,0 +1,384 @@
+"""
+Load-test the FastAPI app end to end and write latency percentiles to a JSON file.
+
+    python benchmarks/load_test.py                                  # 200 requests, 10 at a time
+    python benchmarks/load_test.py --concurrency 50 --duration 60
+    python benchmarks/load_test.py --mix chat=1,todos=6,webhook=3,plan=0 --output base.json
+    python benchmarks/load_test.py --url http://localhost:8000      # an already running server
+
+By default the app is started with uvicorn in a subprocess against local
+stand-ins, so nothing leaves the machine:
+
+- Gemini: the fake model (MODEL_PROVIDER=fake) replaying
+  benchmarks/fake_model_script.json with --model-latency
+- Supabase: the in-memory client (SUPABASE_BACKEND=memory), seeded with
+  --users user profiles so webhook callers resolve to a user
+- VAPI: a stub API served by this script (VAPI_BASE_URL) that accepts
+  calls after --vapi-latency seconds
+
+Scenarios, picked at random by the weights in --mix:
+    chat     POST /api/v1/chat/ (streamed, read to the end)
+    todos    POST/GET /api/v1/todos/ and PATCH /api/v1/todos/{id}/toggle
+    webhook  POST /api/v1/vapi/webhook with Add_todo / Read_todo tool calls
+    plan     POST /generate-goal-plan
+
+A request is an error if it fails, returns a non-2xx status, or reports an
+error in its body: SSE error events, a chat reply without a done event or
+with a failed tool result in it, webhook tool errors. Chat prompts only
+trigger todo tools; prompts that would place a call are left out since a
+call is the scheduler's work, not the chat path's. The output file has
+p50/p95/p99 latency, throughput and error rate per scenario and overall,
+plus the settings used, so two runs can be compared. The numbers are only
+comparable between runs on the same machine: run the base and the change
+back to back rather than checking a report in as a reference.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import platform
+import threading
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "benchmarks", "fake_model_script.json")
+
+CHAT_MESSAGES = [
+    "create a todo called {item}",
+    "what are my todos?",
+    "I keep skipping my workouts, any advice?",
+]
+TODO_ITEMS = ["buy milk", "call mom", "water the plants", "book dentist", "pay rent", "stretch for 10 minutes"]
+GOALS = ["Run a 10k", "Sleep 8 hours", "Read 12 books", "Meditate daily", "Learn Spanish"]
+
+
+def phone_for(n: int) -> str:
+    return f"+1555{n:07d}"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(ordered: List[float], q: float) -> Optional[float]:
+    if not ordered:
+        return None
+    index = q * (len(ordered) - 1)
+    low, high = int(index), min(int(index) + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (index - low)
+
+
+# --- VAPI stand-in ---
+
+def vapi_stub(latency: float) -> FastAPI:
+    app = FastAPI()
+    calls: Dict[str, Dict[str, Any]] = {}
+
+    @app.post("/call")
+    async def create_call(body: Dict[str, Any]):
+        await asyncio.sleep(latency)
+        call = {"id": str(uuid.uuid4()), "status": "queued", "customer": body.get("customer"),
+                "createdAt": datetime.now(timezone.utc).isoformat()}
+        calls[call["id"]] = call
+        return call
+
+    @app.get("/call/{call_id}")
+    async def get_call(call_id: str):
+        await asyncio.sleep(latency)
+        call = calls.get(call_id) or {"id": call_id, "customer": {}}
+        return {**call, "status": "ended", "endedReason": "customer-ended-call",
+                "transcript": "AI: Hi! User: Add buy milk to my list.", "messages": []}
+
+    return app
+
+
+class BackgroundServer:
+    """uvicorn serving an app from a thread of this process"""
+
+    def __init__(self, app: FastAPI, port: int):
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+# --- the app under test ---
+
+def start_app(args, port: int, vapi_port: int, workdir: str) -> subprocess.Popen:
+    seed = os.path.join(workdir, "seed.json")
+    with open(seed, "w", encoding="utf-8") as f:
+        json.dump({"users_profile": [{"id": f"loadtest-user-{n}", "phone": phone_for(n)} for n in range(args.users)]}, f)
+
+    env = {
+        **os.environ,
+        "MODEL_PROVIDER": "fake",
+        "FAKE_MODEL_SCRIPT": args.model_script,
+        "FAKE_MODEL_LATENCY": args.model_latency,
+        "FAKE_MODEL_SEED": str(args.seed),
+        "SUPABASE_BACKEND": "memory",
+        "SUPABASE_MEMORY_SEED": seed,
+        "SUPABASE_URL": os.environ.get("SUPABASE_URL", "http://127.0.0.1"),
+        "SUPABASE_KEY": os.environ.get("SUPABASE_KEY", "loadtest"),
+        "VAPI_BASE_URL": f"http://127.0.0.1:{vapi_port}",
+        "VAPI_API_KEY": "loadtest",
+        "VAPI_PHONE_NUMBER_ID": "loadtest-phone",
+        "VAPI_ASSISTANT_ID": "loadtest-assistant",
+        "VAPI_CALL_CACHE_PATH": os.path.join(workdir, "vapi_calls.sqlite3"),
+        "CALL_JOB_STORE": "sqlite",
+        "CALL_JOB_STORE_PATH": os.path.join(workdir, "scheduled_calls.sqlite3"),
+        "WORKFLOW_STEP_CACHE": "off",
+        "POSTGRES_AGNO_DB_URL": "",
+    }
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(args.workers), "--log-level", "warning"]
+    log = open(os.path.join(workdir, "server.log"), "w")
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+async def wait_until_up(url: str, process: Optional[subprocess.Popen], timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError("The app exited during startup, see server.log")
+            try:
+                if (await client.get("/openapi.json")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"The app at {url} didn't come up within {timeout}s")
+
+
+# --- scenarios; each returns an error message or None ---
+
+class Scenarios:
+    def __init__(self, client: httpx.AsyncClient, users: int, rng: random.Random):
+        self.client = client
+        self.users = users
+        self.rng = rng
+        self.todo_ids: Dict[str, List[Any]] = {}
+
+    def user(self) -> int:
+        return self.rng.randrange(self.users)
+
+    async def chat(self) -> Optional[str]:
+        n = self.user()
+        message = self.rng.choice(CHAT_MESSAGES).format(item=self.rng.choice(TODO_ITEMS))
+        async with self.client.stream("POST", "/api/v1/chat/",
+                                      json={"message": message, "user_id": f"loadtest-user-{n}"}) as response:
+            body = (await response.aread()).decode()
+        if response.status_code >= 300:
+            return f"HTTP {response.status_code}"
+        events = [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+        if any(event.get("type") == "error" for event in events):
+            return "error event"
+        if not any(event.get("type") == "done" for event in events):
+            return "no done event"
+        # The agent still answers when a tool fails; the todo tools report it as 'success': False
+        content = " ".join(str(event.get("content", "")) for event in events if event.get("type") == "agui_content")
+        if "'success': False" in content:
+            return "tool error"
+        return None
+
+    async def todos(self) -> Optional[str]:
+        user_id = f"loadtest-user-{self.user()}"
+        action = self.rng.choice(["create", "list", "toggle"])
+        if action == "toggle" and self.todo_ids.get(user_id):
+            response = await self.client.patch(f"/api/v1/todos/{self.rng.choice(self.todo_ids[user_id])}/toggle")
+        elif action == "list":
+            response = await self.client.get("/api/v1/todos/", params={"user_id": user_id})
+        else:
+            response = await self.client.post("/api/v1/todos/", json={"text": self.rng.choice(TODO_ITEMS), "user_id": user_id})
+            if response.status_code < 300:
+                self.todo_ids.setdefault(user_id, []).append(response.json()["data"]["id"])
+        return f"HTTP {response.status_code}" if response.status_code >= 300 else None
+
+    async def webhook(self) -> Optional[str]:
+        name, arguments = self.rng.choice([("Add_todo", {"todo": self.rng.choice(TODO_ITEMS)}), ("Read_todo", {})])
+        payload = {
+            "message": {
+                "type": "tool-calls",
+                "toolCalls": [{"id": str(uuid.uuid4()), "type": "function",
+                               "function": {"name": name, "arguments": json.dumps(arguments)}}],
+                "call": {"id": f"loadtest-call-{uuid.uuid4()}", "customer": {"number": phone_for(self.user())}},
+            }
+        }
+        response = await self.client.post("/api/v1/vapi/webhook", json=payload)
+        if response.status_code >= 300:
+            return f"HTTP {response.status_code}"
+        errors = [result["error"] for result in response.json().get("results", []) if "error" in result]
+        return errors[0] if errors else None
+
+    async def plan(self) -> Optional[str]:
+        n = self.user()
+        body = {
+            "user_id": f"loadtest-user-{n}",
+            "profile": {"age": 20 + n % 40, "schedule": "Office 9-6 on weekdays", "goals": ["Get fit"],
+                        "challenges": ["Low motivation"], "currenthabits": [], "description": "Load test user"},
+            "goal": {"primary_goal": self.rng.choice(GOALS), "goal_duration": self.rng.randint(1, 12), "duration_type": "weeks"},
+        }
+        response = await self.client.post("/generate-goal-plan", json=body)
+        return f"HTTP {response.status_code}" if response.status_code >= 300 else None
+
+
+async def run_load(url: str, args) -> Dict[str, Any]:
+    weights = {}
+    for part in args.mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    unknown = set(weights) - {"chat", "todos", "webhook", "plan"}
+    if unknown:
+        raise SystemExit(f"Unknown scenarios in --mix: {sorted(unknown)}")
+    names = [name for name, weight in weights.items() if weight > 0]
+
+    rng = random.Random(args.seed)
+    samples: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, Dict[str, int]] = {name: {} for name in names}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    stop_at = time.monotonic() + args.duration if args.duration else None
+    remaining = [args.requests]
+
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        scenarios = Scenarios(client, args.users, rng)
+
+        async def worker() -> None:
+            while True:
+                if stop_at is not None:
+                    if time.monotonic() >= stop_at:
+                        return
+                elif remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+                name = rng.choices(names, weights=[weights[n] for n in names])[0]
+                started = time.perf_counter()
+                try:
+                    error = await getattr(scenarios, name)()
+                except Exception as e:
+                    error = type(e).__name__
+                samples[name].append(time.perf_counter() - started)
+                if error:
+                    errors[name][error[:80]] = errors[name].get(error[:80], 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+
+    def summary(durations: List[float], error_counts: Dict[str, int]) -> Dict[str, Any]:
+        ordered = sorted(durations)
+        failed = sum(error_counts.values())
+        ms = lambda value: round(value * 1000, 2) if value is not None else None  # noqa: E731
+        return {
+            "requests": len(ordered),
+            "errors": failed,
+            "error_rate": round(failed / len(ordered), 4) if ordered else 0.0,
+            "throughput_rps": round(len(ordered) / wall, 2),
+            "latency_ms": {
+                "p50": ms(percentile(ordered, 0.50)),
+                "p95": ms(percentile(ordered, 0.95)),
+                "p99": ms(percentile(ordered, 0.99)),
+                "mean": ms(statistics.mean(ordered)) if ordered else None,
+                "max": ms(ordered[-1]) if ordered else None,
+            },
+            "error_kinds": error_counts,
+        }
+
+    all_errors: Dict[str, int] = {}
+    for counts in errors.values():
+        for kind, count in counts.items():
+            all_errors[kind] = all_errors.get(kind, 0) + count
+    return {
+        "duration_seconds": round(wall, 3),
+        "overall": summary([d for values in samples.values() for d in values], all_errors),
+        "scenarios": {name: summary(samples[name], errors[name]) for name in names},
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    rows = [("overall", report["overall"])] + list(report["scenarios"].items())
+    print(f"{'scenario':10}{'requests':>10}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for name, row in rows:
+        latency = row["latency_ms"]
+        print(f"{name:10}{row['requests']:>10}{row['throughput_rps']:>9}{str(latency['p50']):>10}"
+              f"{str(latency['p95']):>10}{str(latency['p99']):>10}{row['error_rate']:>9.2%}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="test a running server instead of starting one with stand-ins")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in flight at once")
+    parser.add_argument("--requests", type=int, default=200, help="total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=None, help="run for this many seconds instead")
+    parser.add_argument("--mix", default="chat=1,todos=4,webhook=3,plan=1", help="scenario weights")
+    parser.add_argument("--users", type=int, default=50, help="distinct simulated users")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the started app")
+    parser.add_argument("--model-latency", default="lognormal:-1.5,0.5", help="FAKE_MODEL_LATENCY for the started app")
+    parser.add_argument("--model-script", default=SCRIPT, help="FAKE_MODEL_SCRIPT for the started app")
+    parser.add_argument("--vapi-latency", type=float, default=0.05, help="seconds the VAPI stub takes per request")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the request mix and the fake model")
+    parser.add_argument("--output", default="load_test_results.json", help="where to write the JSON report")
+    args = parser.parse_args()
+
+    settings = {key: value for key, value in vars(args).items() if key != "output"}
+    process = None
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        if args.url:
+            url = args.url.rstrip("/")
+            await wait_until_up(url, None, timeout=10)
+            report = await run_load(url, args)
+        else:
+            port, vapi_port = free_port(), free_port()
+            url = f"http://127.0.0.1:{port}"
+            with BackgroundServer(vapi_stub(args.vapi_latency), vapi_port):
+                process = start_app(args, port, vapi_port, workdir)
+                try:
+                    await wait_until_up(url, process)
+                    report = await run_load(url, args)
+                except RuntimeError:
+                    with open(os.path.join(workdir, "server.log"), "r", encoding="utf-8") as f:
+                        print(f.read()[-4000:], file=sys.stderr)
+                    raise
+                finally:
+                    process.terminate()
+                    process.wait(timeout=10)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.url or "local app with stand-ins",
+        "python": platform.python_version(),
+        "settings": settings,
+        **report,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
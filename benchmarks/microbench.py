@@ -0,0 +1,388 @@
+"""
+Microbenchmarks for the hot paths of single modules, checked against a recorded baseline.
+
+    python benchmarks/microbench.py --save-baseline     # record a baseline on this machine
+    python benchmarks/microbench.py                     # run all, compare with the baseline
+    python benchmarks/microbench.py --only todo_service webhook
+    python benchmarks/microbench.py --threshold 0.5     # allow 50% slowdown instead of 25%
+
+Each benchmark times one operation in a loop sized to take at least --min-time
+seconds and repeats that --repeat times. The fastest repeat is compared, as
+timeit does: slower repeats mostly measure other load on the machine. A
+benchmark regresses when it is more than its allowed slowdown slower than the
+baseline; the script then exits with status 1, so it can gate CI. The allowed
+slowdown is the threshold (--threshold, or per benchmark under "thresholds" in
+the baseline file), widened to NOISE_FACTOR times the spread between the
+fastest and the median repeat when a benchmark is noisier than that.
+
+Baselines only mean something on the machine that recorded them, so none is
+checked in (benchmarks/microbench_baseline.json is git-ignored). Record one
+with --save-baseline on the CI runner before the change under test, or before
+and after a change locally; without one every benchmark is reported as "new"
+and nothing can regress. The benchmarks run offline against the fake model (MODEL_PROVIDER=fake) and the
+in-memory Supabase client (SUPABASE_BACKEND=memory). Benchmarks whose modules
+can't be imported here are reported as skipped, not failed.
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_workdir = tempfile.mkdtemp(prefix="microbench-")
+os.environ.update({
+    "MODEL_PROVIDER": "fake",
+    "SUPABASE_BACKEND": "memory",
+    "SUPABASE_URL": os.environ.get("SUPABASE_URL", "http://127.0.0.1"),
+    "SUPABASE_KEY": os.environ.get("SUPABASE_KEY", "microbench"),
+    "VAPI_CALL_CACHE_PATH": os.path.join(_workdir, "vapi_calls.sqlite3"),
+    "WORKFLOW_STEP_CACHE": "off",
+})
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "microbench_baseline.json")
+DEFAULT_THRESHOLD = 0.25
+# A benchmark may be this many times its own repeat-to-repeat spread slower before it regresses
+NOISE_FACTOR = 3.0
+USER_ID = "microbench-user"
+PHONE = "+15550000001"
+
+# name -> (description, setup); setup returns the operation to time
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def bench(name: str, description: str):
+    def register(setup: Callable[[], Awaitable[Callable]]):
+        BENCHMARKS[name] = (description, setup)
+        return setup
+    return register
+
+
+def make_todos(count: int, completed_every: int = 3) -> List[Dict[str, Any]]:
+    return [
+        {"id": n, "text": f"Todo number {n}: pick up the dry cleaning", "user_id": USER_ID,
+         "completed": n % completed_every == 0, "created_at": "2026-01-01T00:00:00+00:00"}
+        for n in range(1, count + 1)
+    ]
+
+
+def make_call(turns: int) -> Dict[str, Any]:
+    messages = []
+    for n in range(turns):
+        messages.append({"role": "bot", "message": f"Okay, what else is on your plate for day {n}?"})
+        messages.append({"role": "user", "message": f"I will go for a run at {n % 12 + 1} and then add buy milk to my list."})
+    return {
+        "id": "microbench-call",
+        "status": "ended",
+        "endedReason": "customer-ended-call",
+        "customer": {"number": PHONE},
+        "transcript": "\n".join(f"{m['role']}: {m['message']}" for m in messages),
+        "messages": messages,
+        "analysis": {"summary": "The user planned their week."},
+    }
+
+
+# --- benchmarks ---
+
+@bench("agent.get_agent", "Build the chat agent (fake model, no storage)")
+async def _get_agent():
+    from agent import get_agent
+
+    return lambda: get_agent(user_id=USER_ID, enable_storage=False)
+
+
+@bench("agent.get_additional_context", "Render the per-user context appended to the instructions")
+async def _get_additional_context():
+    from agent import get_additional_context
+
+    preferences = {"tone": "friendly", "reminders": "mornings", "focus": ["fitness", "sleep"]}
+    return lambda: get_additional_context(user_id=USER_ID, user_preferences=preferences,
+                                          session_context="Evening check-in", habit_focus="Running")
+
+
+@bench("todo_service.create_todo", "TodoService.create_todo on the in-memory backend")
+async def _create_todo():
+    from models import TodoCreate
+    from service.todo_crud import TodoService
+
+    todo = TodoCreate(text="Buy milk", user_id=f"{USER_ID}-create")
+    return lambda: TodoService.create_todo(todo)
+
+
+@bench("todo_service.get_todos", "TodoService.get_todos for a user with 200 todos")
+async def _get_todos():
+    from database.supabaseClient import supabase
+    from service.todo_crud import TodoService
+
+    user_id = f"{USER_ID}-list"
+    supabase.table("todos").insert([{**todo, "id": None, "user_id": user_id} for todo in make_todos(200)]).execute()
+    return lambda: TodoService.get_todos(user_id)
+
+
+@bench("todo_service.toggle_todo", "TodoService.toggle_todo on the in-memory backend")
+async def _toggle_todo():
+    from models import TodoCreate
+    from service.todo_crud import TodoService
+
+    created = await TodoService.create_todo(TodoCreate(text="Stretch", user_id=f"{USER_ID}-toggle"))
+    todo_id = str(created["data"]["id"])
+    return lambda: TodoService.toggle_todo(todo_id)
+
+
+def _webhook_setup(function_name: str, arguments: Dict[str, Any], todos: int = 0):
+    async def setup():
+        from starlette.requests import Request
+        from database.supabaseClient import supabase
+        from api.v1.vapi_webhook import vapi_add_todo_webhook
+
+        if not supabase.table("users_profile").select("id").eq("phone", PHONE).execute().data:
+            supabase.table("users_profile").insert({"id": USER_ID, "phone": PHONE}).execute()
+        if todos:
+            supabase.table("todos").insert([{**todo, "id": None} for todo in make_todos(todos)]).execute()
+        calls = iter(range(10 ** 9))
+
+        async def operation():
+            # A new toolCallId every time so the idempotency store doesn't replay
+            body = json.dumps({
+                "message": {
+                    "type": "tool-calls",
+                    "toolCalls": [{"id": f"microbench-{next(calls)}", "type": "function",
+                                   "function": {"name": function_name, "arguments": json.dumps(arguments)}}],
+                    "call": {"id": "microbench-call", "customer": {"number": PHONE}},
+                }
+            }).encode()
+
+            async def receive():
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            request = Request({"type": "http", "method": "POST", "path": "/api/v1/vapi/webhook",
+                               "headers": [(b"content-type", b"application/json")]}, receive)
+            response = await vapi_add_todo_webhook(request)
+            if "error" in response["results"][0]:
+                raise RuntimeError(response["results"][0]["error"])
+
+        return operation
+    return setup
+
+
+bench("webhook.add_todo", "Parse a VAPI tool-calls payload and dispatch Add_todo")(
+    _webhook_setup("Add_todo", {"todo": "buy milk"}))
+bench("webhook.read_todo", "Parse a VAPI tool-calls payload and dispatch Read_todo (50 todos)")(
+    _webhook_setup("Read_todo", {}, todos=50))
+
+
+@bench("read_todo.format_1000", "Format a 1000-todo list for Read_todo")
+async def _format_todos():
+    from service.call_warmup import format_todos_for_speech
+
+    todos = make_todos(1000)
+    return lambda: format_todos_for_speech(todos)
+
+
+def _transcript_setup(full: bool):
+    async def setup():
+        from service import vapi_client
+        from tools.getcalltranscript_tool import GetCallTranscriptTool
+
+        tool = GetCallTranscriptTool()
+        await vapi_client.call_cache.put(make_call(turns=200))
+        return lambda: tool.get_call_transcript("microbench-call", full=full)
+    return setup
+
+
+@bench("transcript.condensed", "condense_call on a 400-message call")
+async def _condense_call():
+    from service import transcript_condenser
+
+    call = make_call(turns=200)
+
+    def operation():
+        # condense_call memoizes ended calls; clear it so the condensing itself is timed
+        transcript_condenser._cache.clear()
+        return transcript_condenser.condense_call(call)
+
+    return operation
+
+
+bench("transcript.tool_condensed", "GetCallTranscriptTool.get_call_transcript, condensed, from the call cache")(
+    _transcript_setup(full=False))
+bench("transcript.full", "GetCallTranscriptTool.get_call_transcript, full, 400 messages")(
+    _transcript_setup(full=True))
+
+
+@bench("chat_service.sse_frames", "Encode the SSE frames of one chat reply (4 KB of markdown)")
+async def _sse_frames():
+    from service import chat_service
+
+    class Reply:
+        content = "## Your plan for today\n\n" + "- **Run** 5k at 7am, then stretch for ten minutes\n" * 80
+
+    class StubAgent:
+        async def arun(self, message):
+            return Reply()
+
+    chat_service.get_user_agent = lambda user_id: StubAgent()
+
+    async def operation():
+        async for _ in chat_service.generate_agui_streaming_response("What's my plan?", USER_ID):
+            pass
+
+    return operation
+
+
+# --- runner ---
+
+async def measure(operation: Callable, min_time: float, repeat: int) -> Dict[str, Any]:
+    is_async = asyncio.iscoroutinefunction(operation)
+
+    async def run(loops: int) -> float:
+        started = time.perf_counter()
+        if is_async:
+            for _ in range(loops):
+                await operation()
+        else:
+            for _ in range(loops):
+                result = operation()
+                if asyncio.iscoroutine(result):
+                    await result
+        return time.perf_counter() - started
+
+    # Warm up, then size the loop so one repeat takes at least min_time
+    await run(1)
+    loops = 1
+    while True:
+        elapsed = await run(loops)
+        if elapsed >= min_time or loops >= 10 ** 6:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9)))
+    per_op = [elapsed / loops] + [await run(loops) / loops for _ in range(repeat - 1)]
+    best, median = min(per_op), statistics.median(per_op)
+    return {
+        "median_us": round(median * 1e6, 3),
+        "min_us": round(best * 1e6, 3),
+        # How far the typical repeat is from the best one, as a fraction of the best
+        "spread": round(median / best - 1, 4),
+        "loops": loops,
+    }
+
+
+def fresh_database() -> None:
+    """Empty the in-memory tables so rows written by one benchmark don't slow down the next"""
+    from database.supabaseClient import supabase
+
+    with supabase.lock:
+        supabase.tables.clear()
+        supabase._next_ids.clear()
+
+
+async def run_benchmarks(names: List[str], min_time: float, repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for name in names:
+        description, setup = BENCHMARKS[name]
+        try:
+            # Several of the measured paths print; keep that cost but not the output
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                fresh_database()
+                gc.collect()
+                operation = await setup()
+                results[name] = {"description": description, **await measure(operation, min_time, repeat)}
+        except ImportError as e:
+            results[name] = {"description": description, "skipped": f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            results[name] = {"description": description, "error": f"{type(e).__name__}: {e}"}
+    return results
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"benchmarks": {}, "thresholds": {}}
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print one row per benchmark and return the names that regressed or failed"""
+    failed = []
+    print(f"{'benchmark':28}{'best us':>12}{'baseline':>12}{'change':>9}  status")
+    for name, result in results.items():
+        if "skipped" in result or "error" in result:
+            status = f"skipped ({result['skipped']})" if "skipped" in result else f"ERROR ({result['error']})"
+            if "error" in result:
+                failed.append(name)
+            print(f"{name:28}{'-':>12}{'-':>12}{'-':>9}  {status}")
+            continue
+        recorded = baseline["benchmarks"].get(name, {})
+        reference = recorded.get("min_us")
+        if reference is None:
+            print(f"{name:28}{result['min_us']:>12}{'-':>12}{'-':>9}  new")
+            continue
+        change = result["min_us"] / reference - 1
+        noise = NOISE_FACTOR * max(result["spread"], recorded.get("spread", 0.0))
+        allowed = max(baseline.get("thresholds", {}).get(name, threshold), noise)
+        status = "ok"
+        if change > allowed:
+            status = f"REGRESSION (> {allowed:+.0%})"
+            failed.append(name)
+        elif change < -allowed:
+            status = "faster"
+        print(f"{name:28}{result['min_us']:>12}{reference:>12}{change:>+9.1%}  {status}")
+    return failed
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="*", default=None, help="run benchmarks whose name starts with one of these")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of the baseline (default 0.25)")
+    parser.add_argument("--min-time", type=float, default=0.3, help="minimum seconds per repeat")
+    parser.add_argument("--repeat", type=int, default=9, help="repeats per benchmark")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if not args.only or any(name.startswith(prefix) for prefix in args.only)]
+    results = await run_benchmarks(names, args.min_time, args.repeat)
+    baseline = load_baseline(args.baseline)
+    if not baseline["benchmarks"] and not args.save_baseline:
+        print(f"No baseline at {args.baseline}: record one on this machine with --save-baseline\n")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        measured = {name: {"min_us": r["min_us"], "median_us": r["median_us"], "spread": r["spread"]}
+                    for name, r in results.items() if "min_us" in r}
+        baseline["benchmarks"] = {**baseline.get("benchmarks", {}), **measured}
+        baseline.setdefault("thresholds", {})
+        baseline["recorded"] = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"Baseline for {len(measured)} benchmarks written to {args.baseline}")
+
+    failed = compare(results, baseline, args.threshold)
+    if failed and not args.save_baseline:
+        print(f"\n{len(failed)} benchmark(s) regressed or failed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,116 @@
+"""
+Benchmark goal-plan generation: the old path (full user agent) vs the plan agent.
+
+    python benchmarks/plan_agent_benchmark.py            # prompt/tool sizes + live runs
+    python benchmarks/plan_agent_benchmark.py --static   # sizes only, no model calls
+    python benchmarks/plan_agent_benchmark.py --runs 5 --json
+
+Static numbers are estimates (~4 characters per token) of what each agent
+sends: instructions, tool schemas, output schema and the prompt. The old path
+additionally loads up to 10 runs of chat history and the user's memories from
+Postgres, which depends on the user and isn't counted here. Live runs need
+GOOGLE_API_KEY (and POSTGRES_AGNO_DB_URL for the old path) and report wall
+time and the token counts Gemini returns.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import get_user_agent, get_plan_agent  # noqa: E402
+from service.goals_service import build_plan_prompt  # noqa: E402
+
+CHARS_PER_TOKEN = 4
+USER_ID = "benchmark-user"
+PROFILE = {
+    "age": 29,
+    "schedule": "Office 9-6 on weekdays, free evenings and weekends",
+    "goals": ["Get fit", "Sleep better"],
+    "challenges": ["Low motivation after work", "Late-night phone use"],
+    "currenthabits": ["Walks the dog every morning"],
+    "description": "Software engineer who wants to run a 10k",
+    "goal": {"primary_goal": "Run a 10k", "goal_duration": 8, "duration_type": "weeks"},
+}
+
+
+def static_profile(agent, prompt: str) -> dict:
+    tool_schemas = []
+    for toolkit in agent.tools or []:
+        functions = {**toolkit.get_functions(), **toolkit.get_async_functions()}
+        for function in functions.values():
+            # Parameters are only filled in once agno processes the entrypoint
+            function = function.model_copy(deep=True)
+            function.process_entrypoint()
+            tool_schemas.append(function.to_dict())
+    instructions = agent.instructions if isinstance(agent.instructions, str) else "\n".join(agent.instructions or [])
+    schema = agent.output_schema.model_json_schema() if agent.output_schema else None
+    chars = len(instructions) + len(json.dumps(tool_schemas)) + len(json.dumps(schema) if schema else "") + len(prompt)
+    return {
+        "instruction_chars": len(instructions),
+        "tools": len(tool_schemas),
+        "tool_schema_chars": len(json.dumps(tool_schemas)),
+        "history_runs": agent.num_history_runs if agent.add_history_to_context else 0,
+        "user_memories": bool(agent.enable_user_memories),
+        "storage": agent.db is not None,
+        "estimated_prompt_tokens": chars // CHARS_PER_TOKEN,
+    }
+
+
+async def live_profile(agent, prompt: str, runs: int) -> dict:
+    durations, input_tokens, output_tokens = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = await agent.arun(prompt)
+        durations.append(time.perf_counter() - started)
+        metrics = response.metrics
+        if metrics is not None:
+            input_tokens.append(metrics.input_tokens or 0)
+            output_tokens.append(metrics.output_tokens or 0)
+    return {
+        "runs": runs,
+        "latency_median_s": round(statistics.median(durations), 3),
+        "latency_max_s": round(max(durations), 3),
+        "input_tokens_median": statistics.median(input_tokens) if input_tokens else None,
+        "output_tokens_median": statistics.median(output_tokens) if output_tokens else None,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="live runs per path")
+    parser.add_argument("--static", action="store_true", help="only compare prompt and tool sizes")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    paths = {
+        "user_agent": (get_user_agent(USER_ID), f"Generate a goal plan for the user {USER_ID} with profile {PROFILE}"),
+        "plan_agent": (get_plan_agent(), build_plan_prompt(PROFILE)),
+    }
+
+    results = {name: static_profile(agent, prompt) for name, (agent, prompt) in paths.items()}
+    if not args.static:
+        if not os.getenv("GOOGLE_API_KEY"):
+            print("GOOGLE_API_KEY not set, skipping live runs (use --static to silence this)", file=sys.stderr)
+        else:
+            for name, (agent, prompt) in paths.items():
+                results[name].update(await live_profile(agent, prompt, args.runs))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    keys = list(dict.fromkeys(key for result in results.values() for key in result))
+    print(f"{'':28}{'user_agent':>14}{'plan_agent':>14}")
+    for key in keys:
+        row = [results[name].get(key) for name in ("user_agent", "plan_agent")]
+        print(f"{key:28}" + "".join(f"{str(value):>14}" for value in row))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Benchmark workflowv2's research pipeline: agno's sequential basic_workflow vs
+dag_workflow, where summarize and fact_check run side by side.
+
+    python benchmarks/workflow_dag_benchmark.py                  # simulated model, 5 runs each
+    python benchmarks/workflow_dag_benchmark.py --latency 1.5 --runs 10
+    python benchmarks/workflow_dag_benchmark.py --live --runs 2  # real Gemini calls
+    python benchmarks/workflow_dag_benchmark.py --json
+
+By default every agent call is replaced by a sleep of --latency seconds and
+returns text that triggers the fact-check condition, so both workflows run all
+four steps and the difference is down to scheduling alone. --live needs
+GOOGLE_API_KEY; model latency then varies per step and per run.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Replayed steps would make every run after the first meaningless
+os.environ["WORKFLOW_STEP_CACHE"] = "off"
+
+from agno.agent import Agent  # noqa: E402
+from agno.run.agent import RunOutput  # noqa: E402
+
+from workflowv2 import basic_workflow, dag_workflow  # noqa: E402
+
+TOPIC = "Recent breakthroughs in quantum computing"
+SIMULATED_CONTENT = "Research indicates qubit error rates fell by 40 percent according to a 2024 report."
+
+
+def simulate_model(latency: float) -> None:
+    async def arun(self, input, **kwargs):
+        await asyncio.sleep(latency)
+        return RunOutput(content=SIMULATED_CONTENT)
+
+    Agent.arun = arun
+
+
+def summary(durations: list) -> dict:
+    return {
+        "runs": len(durations),
+        "median_s": round(statistics.median(durations), 3),
+        "min_s": round(min(durations), 3),
+        "max_s": round(max(durations), 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="runs per workflow")
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated seconds per agent call")
+    parser.add_argument("--live", action="store_true", help="call Gemini instead of simulating it")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if args.live:
+        if not os.getenv("GOOGLE_API_KEY"):
+            sys.exit("--live needs GOOGLE_API_KEY")
+    else:
+        simulate_model(args.latency)
+
+    sequential, dag, step_durations = [], [], {}
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        await basic_workflow.arun(input=TOPIC)
+        sequential.append(time.perf_counter() - started)
+
+        result = await dag_workflow.arun(TOPIC)
+        dag.append(result.duration)
+        for timing in result.timings:
+            step_durations.setdefault(timing.name, []).append(timing.duration)
+
+    results = {
+        "sequential": summary(sequential),
+        "dag": summary(dag),
+        "dag_steps_median_s": {name: round(statistics.median(values), 3) for name, values in step_durations.items()},
+        "speedup": round(statistics.median(sequential) / statistics.median(dag), 2),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'':12}{'median':>10}{'min':>10}{'max':>10}")
+    for name in ("sequential", "dag"):
+        row = results[name]
+        print(f"{name:12}{row['median_s']:>9.2f}s{row['min_s']:>9.2f}s{row['max_s']:>9.2f}s")
+    print("dag steps (median): " + ", ".join(f"{name} {value:.2f}s" for name, value in results["dag_steps_median_s"].items()))
+    print(f"speedup: {results['speedup']}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,162 @@
+"""
+Benchmark the three-step workflow in workflow.py: the old steps (a new Agent
+per step call, blocking agent.run) vs the current ones (cached step agents,
+awaited agent.arun).
+
+    python benchmarks/workflow_throughput_benchmark.py                 # simulated model, 50 runs
+    python benchmarks/workflow_throughput_benchmark.py --runs 200 --concurrency 20
+    python benchmarks/workflow_throughput_benchmark.py --live --runs 5 # real Gemini calls
+    python benchmarks/workflow_throughput_benchmark.py --json
+
+By default model calls are replaced by a sleep of --latency seconds (blocking
+time.sleep for agent.run, asyncio.sleep for agent.arun), so the numbers show
+what the workflow itself costs: agent construction and how long the event
+loop is blocked. --live needs GOOGLE_API_KEY and calls Gemini for real.
+
+Reported per variant: wall time, runs per second, total time spent building
+agents, and event-loop lag (how late a 10ms ticker fires while the runs are in
+flight; a blocked loop can't serve any other request in the meantime).
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agno.agent import Agent  # noqa: E402
+from agno.run.agent import RunOutput  # noqa: E402
+from agno.workflow import Workflow, StepOutput  # noqa: E402
+
+import workflow as current  # noqa: E402
+
+PROMPT = "Analyze the competitive landscape for fintech startups"
+TICK_SECONDS = 0.01
+
+build_seconds = []
+
+
+def timed_agent(**kwargs) -> Agent:
+    started = time.perf_counter()
+    agent = Agent(**kwargs)
+    build_seconds.append(time.perf_counter() - started)
+    return agent
+
+
+def _build_agent(kind: str) -> Agent:
+    return timed_agent(
+        model=current.model,
+        name="HabitElevate AI Assistant",
+        instructions=current.STEP_INSTRUCTIONS[kind],
+        markdown=True,
+        stream_events=False,
+        num_history_runs=10,
+    )
+
+
+# The steps as they were before: an Agent per call and a blocking run
+def legacy_data_preprocessor(step_input):
+    response = _build_agent("roast").run(step_input.input)
+    return StepOutput(content=f"Processed: {current._content(response)}")
+
+
+def legacy_howitworks(step_input):
+    response = _build_agent("bold").run(step_input.input)
+    return StepOutput(content=f"Processed: {current._content(response)}")
+
+
+def legacy_workflow() -> Workflow:
+    return Workflow(name="Legacy Pipeline", steps=[legacy_data_preprocessor, legacy_howitworks, current.step2])
+
+
+def simulate_model(latency: float) -> None:
+    def run(self, input, **kwargs):
+        time.sleep(latency)
+        return RunOutput(content=str(input))
+
+    async def arun(self, input, **kwargs):
+        await asyncio.sleep(latency)
+        return RunOutput(content=str(input))
+
+    Agent.run = run
+    Agent.arun = arun
+
+
+async def loop_lag(stop: asyncio.Event, samples: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        samples.append(max(0.0, time.perf_counter() - started - TICK_SECONDS))
+
+
+async def measure(name: str, workflow: Workflow, runs: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    lag: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(loop_lag(stop, lag))
+    builds_before = len(build_seconds)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            await workflow.arun(f"{PROMPT} #{i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(runs)))
+    wall = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    builds = build_seconds[builds_before:]
+    return {
+        "variant": name,
+        "runs": runs,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "runs_per_s": round(runs / wall, 2),
+        "agents_built": len(builds),
+        "agent_build_s": round(sum(builds), 4),
+        "loop_lag_median_ms": round(statistics.median(lag) * 1000, 2) if lag else None,
+        "loop_lag_max_ms": round(max(lag) * 1000, 2) if lag else None,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=50, help="pipeline runs per variant")
+    parser.add_argument("--concurrency", type=int, default=10, help="runs in flight at once")
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated seconds per model call")
+    parser.add_argument("--live", action="store_true", help="call Gemini instead of simulating it")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if args.live:
+        if not os.getenv("GOOGLE_API_KEY"):
+            sys.exit("--live needs GOOGLE_API_KEY")
+    else:
+        simulate_model(args.latency)
+
+    # Cached agents are built once, on the first run; count that against them too
+    current._step_agents.clear()
+    current.Agent = timed_agent
+
+    results = [
+        await measure("per_call_agents_sync", legacy_workflow(), args.runs, args.concurrency),
+        await measure("cached_agents_async", current.workflow, args.runs, args.concurrency),
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    keys = [key for key in results[0] if key != "variant"]
+    print(f"{'':22}" + "".join(f"{result['variant']:>24}" for result in results))
+    for key in keys:
+        print(f"{key:22}" + "".join(f"{str(result[key]):>24}" for result in results))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
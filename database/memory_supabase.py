@@ -0,0 +1,263 @@
+"""
+In-memory stand-in for the Supabase client, for load tests and offline runs.
+
+Set SUPABASE_BACKEND=memory and database/supabaseClient.py hands out a
+MemorySupabaseClient instead of a real client. It covers the part of the
+supabase-py query builder this app uses: select/insert/update/upsert/delete,
+the eq/neq/gt/gte/lt/lte/in_/is_/like/ilike filters, order, limit, range and
+single, plus `count="exact"`. Rows live in per-table lists in this process,
+so every uvicorn worker has its own copy.
+
+SUPABASE_MEMORY_SEED can point to a JSON file of {"table": [rows]} loaded at
+startup (e.g. users_profile rows so webhook callers resolve to a user).
+Database functions aren't emulated: rpc() fails the way a missing function
+does, and callers with an in-memory fallback (TodoMatcher) use it.
+"""
+
+import re
+import copy
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+class MemorySupabaseError(Exception):
+    """Raised where PostgREST would answer with an error"""
+
+
+@dataclass
+class MemoryResponse:
+    data: Any
+    count: Optional[int] = None
+
+
+def _same(a: Any, b: Any) -> bool:
+    # Ids arrive as strings from the API but are stored as ints
+    return a == b or (a is not None and b is not None and str(a) == str(b))
+
+
+def _compare(a: Any, b: Any) -> Optional[int]:
+    if a is None or b is None:
+        return None
+    try:
+        return (a > b) - (a < b)
+    except TypeError:
+        a, b = str(a), str(b)
+        return (a > b) - (a < b)
+
+
+def _sort_key(value: Any) -> tuple:
+    # Postgres puts NULLs last in ascending order
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (value is None, value, "")
+    return (value is None, 0, "" if value is None else str(value))
+
+
+def _like(pattern: str, flags: int = 0) -> "re.Pattern":
+    return re.compile("^" + ".*".join(re.escape(part) for part in pattern.split("%")) + "$", flags | re.DOTALL)
+
+
+class MemoryQuery:
+    def __init__(self, store: "MemorySupabaseClient", table: str):
+        self.store = store
+        self.table = table
+        self.action = "select"
+        self.columns: Optional[List[str]] = None
+        self.values: Any = None
+        self.on_conflict: Optional[List[str]] = None
+        self.filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self.ordering: List[tuple] = []
+        self.offset = 0
+        self.max_rows: Optional[int] = None
+        self.count: Optional[str] = None
+        self.head = False
+        self.single_row: Optional[str] = None
+
+    # --- actions ---
+
+    def select(self, columns: str = "*", count: Optional[str] = None, head: bool = False) -> "MemoryQuery":
+        self.columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",") if c.strip()]
+        self.count = count
+        self.head = head
+        return self
+
+    def insert(self, values: Union[Dict[str, Any], List[Dict[str, Any]]], **kwargs) -> "MemoryQuery":
+        self.action, self.values = "insert", values
+        return self
+
+    def upsert(self, values: Union[Dict[str, Any], List[Dict[str, Any]]], on_conflict: str = "id", **kwargs) -> "MemoryQuery":
+        self.action, self.values = "upsert", values
+        self.on_conflict = [c.strip() for c in on_conflict.split(",")]
+        return self
+
+    def update(self, values: Dict[str, Any], **kwargs) -> "MemoryQuery":
+        self.action, self.values = "update", values
+        return self
+
+    def delete(self, **kwargs) -> "MemoryQuery":
+        self.action = "delete"
+        return self
+
+    # --- filters ---
+
+    def _where(self, check: Callable[[Dict[str, Any]], bool]) -> "MemoryQuery":
+        self.filters.append(check)
+        return self
+
+    def eq(self, column: str, value: Any) -> "MemoryQuery":
+        return self._where(lambda row: _same(row.get(column), value))
+
+    def neq(self, column: str, value: Any) -> "MemoryQuery":
+        return self._where(lambda row: not _same(row.get(column), value))
+
+    def gt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._where(lambda row: (_compare(row.get(column), value) or 0) > 0)
+
+    def gte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._where(lambda row: _compare(row.get(column), value) in (0, 1))
+
+    def lt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._where(lambda row: (_compare(row.get(column), value) or 0) < 0)
+
+    def lte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._where(lambda row: _compare(row.get(column), value) in (0, -1))
+
+    def in_(self, column: str, values: List[Any]) -> "MemoryQuery":
+        return self._where(lambda row: any(_same(row.get(column), value) for value in values))
+
+    def is_(self, column: str, value: Any) -> "MemoryQuery":
+        expected = None if value in (None, "null") else value
+        return self._where(lambda row: row.get(column) is expected or _same(row.get(column), expected))
+
+    def like(self, column: str, pattern: str) -> "MemoryQuery":
+        regex = _like(pattern)
+        return self._where(lambda row: bool(regex.match(str(row.get(column) or ""))))
+
+    def ilike(self, column: str, pattern: str) -> "MemoryQuery":
+        regex = _like(pattern, re.IGNORECASE)
+        return self._where(lambda row: bool(regex.match(str(row.get(column) or ""))))
+
+    # --- modifiers ---
+
+    def order(self, column: str, desc: bool = False, **kwargs) -> "MemoryQuery":
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, size: int, **kwargs) -> "MemoryQuery":
+        self.max_rows = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs) -> "MemoryQuery":
+        self.offset, self.max_rows = start, end - start + 1
+        return self
+
+    def single(self) -> "MemoryQuery":
+        self.single_row = "single"
+        return self
+
+    def maybe_single(self) -> "MemoryQuery":
+        self.single_row = "maybe"
+        return self
+
+    # --- execution ---
+
+    def _matches(self, row: Dict[str, Any]) -> bool:
+        return all(check(row) for check in self.filters)
+
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if self.columns is None:
+            return copy.deepcopy(row)
+        return {column: copy.deepcopy(row.get(column)) for column in self.columns}
+
+    def execute(self) -> MemoryResponse:
+        with self.store.lock:
+            rows = self.store.tables.setdefault(self.table, [])
+            if self.action == "insert":
+                data = [self.store.new_row(self.table, values) for values in self._value_list()]
+                rows.extend(data)
+            elif self.action == "upsert":
+                data = []
+                for values in self._value_list():
+                    existing = next((row for row in rows
+                                     if all(_same(row.get(c), values.get(c)) for c in self.on_conflict)), None)
+                    if existing is not None:
+                        existing.update(copy.deepcopy(values))
+                        data.append(existing)
+                    else:
+                        row = self.store.new_row(self.table, values)
+                        rows.append(row)
+                        data.append(row)
+            elif self.action == "update":
+                data = [row for row in rows if self._matches(row)]
+                for row in data:
+                    row.update(copy.deepcopy(self.values))
+            elif self.action == "delete":
+                data = [row for row in rows if self._matches(row)]
+                self.store.tables[self.table] = [row for row in rows if not self._matches(row)]
+            else:
+                data = [row for row in rows if self._matches(row)]
+                for column, desc in reversed(self.ordering):
+                    data.sort(key=lambda row: _sort_key(row.get(column)), reverse=desc)
+
+            total = len(data)
+            data = data[self.offset:]
+            if self.max_rows is not None:
+                data = data[:self.max_rows]
+            data = [self._project(row) for row in data]
+
+        count = total if self.count else None
+        if self.head:
+            return MemoryResponse(data=[], count=count)
+        if self.single_row:
+            if len(data) != 1 and not (self.single_row == "maybe" and not data):
+                raise MemorySupabaseError(f"Expected a single row from {self.table}, got {len(data)}")
+            return MemoryResponse(data=data[0] if data else None, count=count)
+        return MemoryResponse(data=data, count=count)
+
+    def _value_list(self) -> List[Dict[str, Any]]:
+        return self.values if isinstance(self.values, list) else [self.values]
+
+
+class _MissingRpc:
+    def __init__(self, name: str):
+        self.name = name
+
+    def execute(self):
+        raise MemorySupabaseError(f"Could not find the function public.{self.name} in the schema cache")
+
+
+class MemorySupabaseClient:
+    """Just enough of supabase.Client for the app, kept in process memory"""
+
+    def __init__(self, seed: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        self.lock = threading.RLock()
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self._next_ids: Dict[str, int] = {}
+        for table, rows in (seed or {}).items():
+            for row in rows:
+                self.tables.setdefault(table, []).append(self.new_row(table, row))
+
+    @classmethod
+    def from_seed_file(cls, path: Optional[str]) -> "MemorySupabaseClient":
+        if not path:
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def new_row(self, table: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        row = copy.deepcopy(values)
+        if row.get("id") is None:
+            self._next_ids[table] = self._next_ids.get(table, 0) + 1
+            row["id"] = self._next_ids[table]
+        elif isinstance(row["id"], int):
+            self._next_ids[table] = max(self._next_ids.get(table, 0), row["id"])
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        return row
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> _MissingRpc:
+        return _MissingRpc(name)
@@ -0,0 +1,20 @@
+
+-- Registry of outbound calls per user (service/call_log_service.py)
+CREATE TABLE call_logs (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  call_id TEXT NOT NULL UNIQUE,
+  user_id UUID NOT NULL,
+  phone_number TEXT,
+  status TEXT NOT NULL DEFAULT 'queued',   -- queued | ringing | in-progress | ended | failed
+  ended_reason TEXT,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- "Last call for user" is a single index probe
+CREATE INDEX call_logs_user_created_idx ON call_logs (user_id, created_at DESC);
+
+CREATE TRIGGER call_logs_updated_at
+  BEFORE UPDATE ON call_logs
+  FOR EACH ROW
+  EXECUTE FUNCTION update_updated_at();
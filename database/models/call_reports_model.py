@@ -0,0 +1,51 @@
+
+-- End-of-call reports posted by VAPI to /api/v1/vapi/webhook (service/call_store.py)
+CREATE TABLE call_reports (
+  call_id TEXT PRIMARY KEY,
+  user_id UUID,
+  status TEXT NOT NULL DEFAULT 'ended',
+  transcript TEXT,
+  messages JSONB DEFAULT '[]'::jsonb,
+  summary TEXT,
+  cost NUMERIC,
+  cost_breakdown JSONB,
+  ended_reason TEXT,
+  started_at TIMESTAMPTZ,
+  ended_at TIMESTAMPTZ,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- "Calls of this user, newest first"
+CREATE INDEX call_reports_user_ended_idx ON call_reports (user_id, ended_at DESC);
+
+-- Full-text search over a user's past calls (CallStore.search_transcripts)
+-- The generated column keeps the index current as each report is upserted
+ALTER TABLE call_reports ADD COLUMN search_tsv TSVECTOR
+  GENERATED ALWAYS AS (
+    to_tsvector('english', coalesce(summary, '') || ' ' || coalesce(transcript, ''))
+  ) STORED;
+
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+CREATE INDEX call_reports_user_search_idx ON call_reports USING gin (user_id, search_tsv);
+
+CREATE OR REPLACE FUNCTION search_call_transcripts(
+  p_user_id UUID,
+  p_query TEXT,
+  p_limit INT DEFAULT 5
+)
+RETURNS TABLE (call_id TEXT, started_at TIMESTAMPTZ, ended_at TIMESTAMPTZ, rank REAL, snippet TEXT) AS $$
+  -- Rank first, then build headlines only for the rows we return
+  SELECT top.call_id, top.started_at, top.ended_at, top.rank,
+         ts_headline('english', coalesce(top.transcript, top.summary, ''), top.query,
+                     'MaxFragments=2, MaxWords=25, MinWords=8, StartSel=**, StopSel=**') AS snippet
+  FROM (
+    SELECT c.call_id, c.started_at, c.ended_at, c.transcript, c.summary, q.query,
+           ts_rank_cd(c.search_tsv, q.query) AS rank
+    FROM call_reports c, websearch_to_tsquery('english', p_query) AS q(query)
+    WHERE c.user_id = p_user_id
+      AND c.search_tsv @@ q.query
+    ORDER BY rank DESC, c.ended_at DESC
+    LIMIT p_limit
+  ) top
+  ORDER BY top.rank DESC, top.ended_at DESC;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,16 @@
+
+-- Shared status of goal-plan jobs (service/plan_jobs.py, PLAN_JOB_BACKEND=supabase)
+CREATE TABLE plan_jobs (
+  id UUID PRIMARY KEY,
+  user_id TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'queued',   -- queued | running | succeeded | failed
+  result JSONB,
+  cached BOOLEAN NOT NULL DEFAULT FALSE,
+  error TEXT,
+  created_at TIMESTAMPTZ NOT NULL,
+  started_at TIMESTAMPTZ,
+  finished_at TIMESTAMPTZ,
+  expires_at TIMESTAMPTZ NOT NULL          -- finished jobs are kept until then
+);
+
+CREATE INDEX plan_jobs_expires_at_idx ON plan_jobs (expires_at);
@@ -0,0 +1,135 @@
+
+-- Durable job store for scheduled calls (service/call_jobs.py)
+CREATE TABLE scheduled_calls (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  user_id UUID NOT NULL,
+  phone_number TEXT NOT NULL,
+  run_at TIMESTAMPTZ NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending',   -- pending | running | done | failed | cancelled
+  attempts INT NOT NULL DEFAULT 0,
+  lease_owner TEXT,                         -- worker that claimed the job
+  lease_expires_at TIMESTAMPTZ,             -- another worker may reclaim it after this
+  call_id TEXT,
+  last_error TEXT,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Due-job scans only look at unfinished jobs
+CREATE INDEX scheduled_calls_due_idx ON scheduled_calls (run_at) WHERE status IN ('pending', 'running');
+CREATE INDEX scheduled_calls_user_idx ON scheduled_calls (user_id, run_at DESC);
+
+CREATE TRIGGER scheduled_calls_updated_at
+  BEFORE UPDATE ON scheduled_calls
+  FOR EACH ROW
+  EXECUTE FUNCTION update_updated_at();
+
+-- Claim due jobs for one worker. SKIP LOCKED lets every worker poll at once
+-- without two of them getting the same row; a job whose lease ran out
+-- (its worker died mid-run) becomes claimable again, unless its call was
+-- already placed (closed as done) or it has used up p_max_attempts (failed).
+DROP FUNCTION IF EXISTS claim_scheduled_calls(TEXT, INT, INT);
+CREATE OR REPLACE FUNCTION claim_scheduled_calls(p_worker TEXT, p_lease_seconds INT, p_limit INT, p_max_attempts INT)
+RETURNS SETOF scheduled_calls
+LANGUAGE sql
+AS $$
+  UPDATE scheduled_calls
+  SET status = 'done', lease_owner = NULL, lease_expires_at = NULL
+  WHERE status = 'running' AND lease_expires_at < NOW() AND call_id IS NOT NULL;
+
+  UPDATE scheduled_calls
+  SET status = 'failed',
+      last_error = 'Lease expired after ' || attempts || ' attempts',
+      lease_owner = NULL,
+      lease_expires_at = NULL
+  WHERE status = 'running' AND lease_expires_at < NOW() AND attempts >= p_max_attempts;
+
+  UPDATE scheduled_calls s
+  SET status = 'running',
+      lease_owner = p_worker,
+      lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+      attempts = s.attempts + 1
+  WHERE s.id IN (
+    SELECT id FROM scheduled_calls
+    WHERE (status = 'pending' AND run_at <= NOW())
+       OR (status = 'running' AND lease_expires_at < NOW())
+    ORDER BY run_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING s.*;
+$$;
+
+-- Recurring daily check-in calls (service/call_dispatch.py)
+CREATE TABLE call_schedules (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  user_id UUID NOT NULL,
+  phone_number TEXT NOT NULL,
+  local_time TIME NOT NULL,                    -- start of the user's call window
+  timezone TEXT NOT NULL DEFAULT 'Asia/Kolkata',
+  window_minutes INT NOT NULL DEFAULT 60,      -- calls are spread over this window
+  active BOOLEAN NOT NULL DEFAULT TRUE,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX call_schedules_user_idx ON call_schedules (user_id);
+
+CREATE TRIGGER call_schedules_updated_at
+  BEFORE UPDATE ON call_schedules
+  FOR EACH ROW
+  EXECUTE FUNCTION update_updated_at();
+
+-- One job per schedule per local day, however many workers enqueue
+ALTER TABLE scheduled_calls ADD COLUMN schedule_id UUID REFERENCES call_schedules (id) ON DELETE SET NULL;
+ALTER TABLE scheduled_calls ADD COLUMN scheduled_for DATE;
+CREATE UNIQUE INDEX scheduled_calls_schedule_day_idx ON scheduled_calls (schedule_id, scheduled_for);
+-- No-answer retries look the job up by the call it placed
+CREATE INDEX scheduled_calls_call_id_idx ON scheduled_calls (call_id);
+
+-- Turn active schedules into jobs for today and tomorrow (local time).
+-- Each call gets a stable offset inside its window so a popular start time
+-- doesn't put every call in the same second. Windows that are already over
+-- are skipped, so a schedule created in the evening starts the next day.
+CREATE OR REPLACE FUNCTION enqueue_daily_checkins()
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  inserted INT;
+BEGIN
+  INSERT INTO scheduled_calls (user_id, phone_number, run_at, schedule_id, scheduled_for)
+  SELECT s.user_id,
+         s.phone_number,
+         ((d.day + s.local_time) AT TIME ZONE s.timezone)
+           + make_interval(secs => abs(hashtext(s.id::text || d.day::text)::bigint) % greatest(s.window_minutes * 60, 1)),
+         s.id,
+         d.day
+  FROM call_schedules s
+  CROSS JOIN LATERAL (
+    VALUES ((NOW() AT TIME ZONE s.timezone)::date), ((NOW() AT TIME ZONE s.timezone)::date + 1)
+  ) AS d(day)
+  WHERE s.active
+    AND ((d.day + s.local_time) AT TIME ZONE s.timezone) + make_interval(mins => s.window_minutes) > NOW()
+  ON CONFLICT (schedule_id, scheduled_for) DO NOTHING;
+
+  GET DIAGNOSTICS inserted = ROW_COUNT;
+  RETURN inserted;
+END;
+$$;
+
+-- Put a check-in that wasn't answered back in the queue, up to p_max_attempts dials
+CREATE OR REPLACE FUNCTION retry_unanswered_call(p_call_id TEXT, p_ended_reason TEXT, p_max_attempts INT, p_base_seconds INT)
+RETURNS SETOF scheduled_calls
+LANGUAGE sql
+AS $$
+  UPDATE scheduled_calls
+  SET status = 'pending',
+      run_at = NOW() + make_interval(secs => p_base_seconds * power(2, attempts - 1)),
+      last_error = p_ended_reason,
+      call_id = NULL
+  WHERE call_id = p_call_id
+    AND status = 'done'
+    AND attempts < p_max_attempts
+  RETURNING *;
+$$;
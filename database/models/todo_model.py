@@ -28,3 +28,27 @@ CREATE TRIGGER todos_updated_at
   BEFORE UPDATE ON todos
   FOR EACH ROW
   EXECUTE FUNCTION update_updated_at();
+
+-- Per-user lookups (every todo query filters on user_id)
+CREATE INDEX IF NOT EXISTS todos_user_id_idx ON todos (user_id);
+
+-- Fuzzy matching of spoken todo references (used by service/todo_matcher.py)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION match_todos(
+  p_user_id UUID,
+  p_query TEXT,
+  p_limit INT DEFAULT 3,
+  p_min_score REAL DEFAULT 0.3
+)
+RETURNS TABLE (id UUID, user_id UUID, text TEXT, completed BOOLEAN, created_at TIMESTAMP, score REAL) AS $$
+  SELECT * FROM (
+    SELECT t.id, t.user_id, t.text, t.completed, t.created_at,
+           GREATEST(similarity(p_query, t.text), word_similarity(p_query, t.text)) AS score
+    FROM todos t
+    WHERE t.user_id = p_user_id
+  ) ranked
+  WHERE ranked.score >= p_min_score
+  ORDER BY ranked.score DESC, ranked.created_at DESC
+  LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
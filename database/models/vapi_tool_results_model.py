@@ -0,0 +1,11 @@
+
+-- Shared idempotency store for VAPI tool calls (service/idempotency.py)
+CREATE TABLE vapi_tool_results (
+  tool_call_id TEXT PRIMARY KEY,
+  status TEXT NOT NULL DEFAULT 'pending',   -- pending | done
+  result JSONB,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX vapi_tool_results_expires_at_idx ON vapi_tool_results (expires_at);
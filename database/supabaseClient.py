@@ -9,7 +9,13 @@ url: str = os.environ.get("SUPABASE_URL")
 # Use service role key for server-side operations (bypasses RLS)
 key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or os.environ.get("SUPABASE_KEY")
 
-supabase: Client = create_client(url, key)
+# SUPABASE_BACKEND=memory keeps everything in process memory (load tests, offline runs)
+if os.environ.get("SUPABASE_BACKEND", "supabase") == "memory":
+    from database.memory_supabase import MemorySupabaseClient
+
+    supabase: Client = MemorySupabaseClient.from_seed_file(os.environ.get("SUPABASE_MEMORY_SEED"))
+else:
+    supabase: Client = create_client(url, key)
 # results=supabase.table("Todo").select("*").execute()
 # print(results)
 
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -6,13 +7,32 @@ from api.v1.chat_interaction import router as chat_router
 from api.v1.vapi_webhook import router as vapi_router
 from api.v1.goal_plan_generation import router as goal_plan_router
 from api.v1.schedule_call import router as schedule_call_router
+from api.v1.call_history import router as call_history_router
+from api.v1.workflows import router as workflows_router
 from agent import  get_user_agent
+from service.call_scheduler import call_scheduler
+from service.vapi_client import close_http_client
+from service.plan_jobs import plan_job_queue
 
 load_dotenv()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Every worker polls the scheduled call store; leases keep each call to one worker
+    call_scheduler.start()
+    plan_job_queue.start()
+    yield
+    await plan_job_queue.stop()
+    await call_scheduler.stop()
+    await close_http_client()
+
+
 app = FastAPI(
     title="HabitElevate AI Agent Server",
     description="AI-powered habit tracking with voice integration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -33,6 +53,8 @@ app.include_router(chat_router)
 app.include_router(vapi_router)
 app.include_router(goal_plan_router)
 app.include_router(schedule_call_router)
+app.include_router(call_history_router)
+app.include_router(workflows_router)
 
 
 @app.post("/testChat")
@@ -0,0 +1,317 @@
+"""
+Model factory for every agent in the app, plus an offline stand-in for Gemini.
+
+agent.py and the workflow modules used to construct `Gemini(id=...)` directly,
+so nothing could run (or be benchmarked) without network access and an API
+key. They now call `get_model()`, which returns Gemini unless
+MODEL_PROVIDER=fake, in which case a FakeModel answers every request locally:
+
+- scripted replies come from a JSON file (FAKE_MODEL_SCRIPT):
+
+    {
+      "recorded": [{"prompt": "exact user message", "response": "reply"}],
+      "rules": [
+        {"match": "create a todo (?:called|for) (.+)",
+         "tool_calls": [{"name": "create_todo", "arguments": {"text": "\\\\1", "user_id": "{user_id}"}}],
+         "then": "Added it to your list."},
+        {"match": "plan", "response": {"title": "..."}, "output_tokens": 900}
+      ],
+      "default": "Sure."
+    }
+
+  `recorded` entries replay a captured reply for an exact prompt, `rules` are
+  regexes tried in order against the last user message (optionally only for
+  agents whose instructions match `system`). A rule with
+  `tool_calls` (or several rounds of them in `rounds`) makes real calls into
+  the agent's tools, e.g. crud_todos_tool; once the tool results are back the
+  model answers with `then`, where {tool_result} is the last tool output.
+  Argument strings can use regex groups (\\\\1) and {user_id} (taken from the
+  "CURRENT USER" line agent.py adds to the instructions).
+- without a matching rule an agent with an output schema gets a minimal valid
+  instance of it, anything else gets FAKE_MODEL_DEFAULT_RESPONSE
+- every call waits for a latency drawn from FAKE_MODEL_LATENCY
+  ("fixed:0.8", "uniform:0.3,1.2", "normal:0.8,0.2" or "lognormal:-0.3,0.4";
+  mu and sigma of the underlying normal), seeded by FAKE_MODEL_SEED so runs
+  are repeatable; streamed replies additionally wait
+  FAKE_MODEL_CHUNK_SECONDS between chunks
+- token counts are ~4 characters per token unless a rule sets input_tokens
+  or output_tokens
+"""
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+import typing
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+from agno.models.base import Model
+from agno.models.google import Gemini
+from agno.models.message import Message
+from agno.models.metrics import Metrics
+from agno.models.response import ModelResponse
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+MODEL_PROVIDER = os.getenv("MODEL_PROVIDER", "gemini")
+DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "gemini-flash-latest")
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+FAKE_MODEL_SCRIPT = os.getenv("FAKE_MODEL_SCRIPT")
+FAKE_MODEL_LATENCY = os.getenv("FAKE_MODEL_LATENCY", "fixed:0")
+FAKE_MODEL_CHUNK_SECONDS = float(os.getenv("FAKE_MODEL_CHUNK_SECONDS", "0"))
+FAKE_MODEL_SEED = int(os.getenv("FAKE_MODEL_SEED", "0"))
+FAKE_MODEL_DEFAULT_RESPONSE = os.getenv("FAKE_MODEL_DEFAULT_RESPONSE", "Sure, done.")
+CHARS_PER_TOKEN = 4
+
+USER_ID_PATTERN = re.compile(r"CURRENT USER: (\S+)")
+
+
+def get_model(model_id: Optional[str] = None) -> Model:
+    """The model agents run on: Gemini, or FakeModel when MODEL_PROVIDER=fake"""
+    model_id = model_id or DEFAULT_MODEL
+    if MODEL_PROVIDER == "fake":
+        return FakeModel(id=model_id)
+    return Gemini(id=model_id, api_key=GOOGLE_API_KEY)
+
+
+class LatencyModel:
+    """Seconds to wait per model call, drawn from a configured distribution"""
+
+    def __init__(self, spec: str = FAKE_MODEL_LATENCY, seed: int = FAKE_MODEL_SEED):
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(value) for value in params.split(",") if value.strip()]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if expected.get(self.kind) != len(self.params):
+            raise ValueError(f"Invalid FAKE_MODEL_LATENCY {spec!r}: use fixed:s, uniform:a,b, normal:mu,sigma or lognormal:mu,sigma")
+        self.random = random.Random(seed)
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self.random.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, self.random.gauss(*self.params))
+        return self.random.lognormvariate(*self.params)
+
+
+def load_script(path: Optional[str]) -> Dict[str, Any]:
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def placeholder(annotation: Any) -> Any:
+    """Smallest value that validates against a type (used for output schemas)"""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is Union:
+        options = [arg for arg in args if arg is not type(None)]
+        return placeholder(options[0]) if options else None
+    if origin in (list, List, tuple, set):
+        return [placeholder(args[0])] if args else []
+    if origin in (dict, Dict):
+        return {}
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return {name: placeholder(info.annotation) for name, info in annotation.model_fields.items()}
+        if issubclass(annotation, Enum):
+            return next(iter(annotation)).value
+        if issubclass(annotation, bool):
+            return False
+        if issubclass(annotation, (int, float)):
+            return 1
+    return "placeholder"
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def _text(message: Message) -> str:
+    content = message.content
+    if content is None:
+        return ""
+    return content if isinstance(content, str) else json.dumps(content, default=str)
+
+
+@dataclass
+class _Reply:
+    content: Optional[str] = None
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+@dataclass
+class FakeModel(Model):
+    """Offline model that replays scripted replies and tool calls with simulated latency"""
+
+    id: str = "fake-gemini"
+    name: str = "FakeModel"
+    provider: str = "Fake"
+    # Output schemas arrive as response_format, so placeholders can match them
+    supports_native_structured_outputs: bool = True
+    script: Optional[Dict[str, Any]] = None
+    latency: Optional[LatencyModel] = None
+    chunk_seconds: float = FAKE_MODEL_CHUNK_SECONDS
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.script is None:
+            self.script = load_script(FAKE_MODEL_SCRIPT)
+        if self.latency is None:
+            self.latency = LatencyModel()
+        self._calls = 0
+
+    # --- choosing a reply ---
+
+    def _rule_for(self, prompt: str, system: str) -> Tuple[Optional[Dict[str, Any]], Optional[re.Match]]:
+        for recorded in self.script.get("recorded", []):
+            if recorded.get("prompt") == prompt:
+                return recorded, None
+        for rule in self.script.get("rules", []):
+            if rule.get("system") and not re.search(rule["system"], system, re.IGNORECASE):
+                continue
+            match = re.search(rule["match"], prompt, re.IGNORECASE | re.DOTALL)
+            if match:
+                return rule, match
+        return None, None
+
+    @staticmethod
+    def _fill(value: Any, match: Optional[re.Match], user_id: Optional[str]) -> Any:
+        if isinstance(value, str):
+            if match is not None and "\\" in value:
+                value = match.expand(value)
+            return value.replace("{user_id}", user_id or "")
+        if isinstance(value, dict):
+            return {key: FakeModel._fill(item, match, user_id) for key, item in value.items()}
+        if isinstance(value, list):
+            return [FakeModel._fill(item, match, user_id) for item in value]
+        return value
+
+    def _reply(self, messages: List[Message], response_format: Any, tools: Optional[List[Dict[str, Any]]]) -> _Reply:
+        user_index = max((i for i, message in enumerate(messages) if message.role == "user"), default=None)
+        prompt = _text(messages[user_index]) if user_index is not None else ""
+        since_prompt = messages[user_index + 1:] if user_index is not None else []
+        rounds_done = sum(1 for message in since_prompt if message.role == "assistant" and message.tool_calls)
+        tool_results = [_text(message) for message in since_prompt if message.role == "tool"]
+
+        system = " ".join(_text(message) for message in messages if message.role == "system")
+        found = USER_ID_PATTERN.search(system)
+        user_id = found.group(1) if found else None
+
+        rule, match = self._rule_for(prompt, system)
+        rule = rule or {}
+        available = {tool.get("function", {}).get("name") for tool in tools or []}
+        rounds = rule.get("rounds") or ([rule["tool_calls"]] if rule.get("tool_calls") else [])
+
+        reply = _Reply(input_tokens=rule.get("input_tokens") or _tokens(" ".join(_text(m) for m in messages)))
+        if rounds_done < len(rounds):
+            calls = [call for call in rounds[rounds_done] if call["name"] in available]
+            if calls:
+                for i, call in enumerate(calls):
+                    self._calls += 1
+                    reply.tool_calls.append({
+                        "id": f"fake_call_{self._calls}_{i}",
+                        "type": "function",
+                        "function": {
+                            "name": call["name"],
+                            "arguments": json.dumps(self._fill(call.get("arguments", {}), match, user_id)),
+                        },
+                    })
+                reply.output_tokens = rule.get("output_tokens") or _tokens(json.dumps(reply.tool_calls))
+                return reply
+
+        if rounds and tool_results:
+            content = self._fill(rule.get("then", FAKE_MODEL_DEFAULT_RESPONSE), match, user_id)
+            content = content.replace("{tool_result}", tool_results[-1])
+        elif "response" in rule:
+            content = self._fill(rule["response"], match, user_id)
+        elif isinstance(response_format, type) and issubclass(response_format, BaseModel):
+            content = placeholder(response_format)
+        else:
+            content = self._fill(self.script.get("default", FAKE_MODEL_DEFAULT_RESPONSE), match, user_id)
+
+        reply.content = content if isinstance(content, str) else json.dumps(content)
+        reply.output_tokens = rule.get("output_tokens") or _tokens(reply.content)
+        return reply
+
+    def _response(self, reply: _Reply, content: Optional[str], tool_calls: List[Dict[str, Any]], last: bool) -> ModelResponse:
+        response = ModelResponse(role="assistant", content=content, tool_calls=list(tool_calls))
+        if last:
+            response.response_usage = Metrics(
+                input_tokens=reply.input_tokens,
+                output_tokens=reply.output_tokens,
+                total_tokens=reply.input_tokens + reply.output_tokens,
+            )
+        return response
+
+    @staticmethod
+    def _chunks(content: Optional[str]) -> List[str]:
+        return re.findall(r"\S+\s*|\s+", content) if content else []
+
+    # --- agno Model interface ---
+
+    def invoke(self, messages: List[Message], assistant_message: Message,
+               response_format: Optional[Union[Dict, Type[BaseModel]]] = None,
+               tools: Optional[List[Dict[str, Any]]] = None, **kwargs) -> ModelResponse:
+        assistant_message.metrics.start_timer()
+        reply = self._reply(messages, response_format, tools)
+        time.sleep(self.latency.sample())
+        assistant_message.metrics.stop_timer()
+        return self._response(reply, reply.content, reply.tool_calls, last=True)
+
+    async def ainvoke(self, messages: List[Message], assistant_message: Message,
+                      response_format: Optional[Union[Dict, Type[BaseModel]]] = None,
+                      tools: Optional[List[Dict[str, Any]]] = None, **kwargs) -> ModelResponse:
+        assistant_message.metrics.start_timer()
+        reply = self._reply(messages, response_format, tools)
+        await asyncio.sleep(self.latency.sample())
+        assistant_message.metrics.stop_timer()
+        return self._response(reply, reply.content, reply.tool_calls, last=True)
+
+    def invoke_stream(self, messages: List[Message], assistant_message: Message,
+                      response_format: Optional[Union[Dict, Type[BaseModel]]] = None,
+                      tools: Optional[List[Dict[str, Any]]] = None, **kwargs) -> Iterator[ModelResponse]:
+        assistant_message.metrics.start_timer()
+        reply = self._reply(messages, response_format, tools)
+        time.sleep(self.latency.sample())
+        chunks = self._chunks(reply.content)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(self.chunk_seconds)
+            yield self._response(reply, chunk, [], last=False)
+        yield self._response(reply, None, reply.tool_calls, last=True)
+        assistant_message.metrics.stop_timer()
+
+    async def ainvoke_stream(self, messages: List[Message], assistant_message: Message,
+                             response_format: Optional[Union[Dict, Type[BaseModel]]] = None,
+                             tools: Optional[List[Dict[str, Any]]] = None, **kwargs) -> AsyncIterator[ModelResponse]:
+        assistant_message.metrics.start_timer()
+        reply = self._reply(messages, response_format, tools)
+        await asyncio.sleep(self.latency.sample())
+        chunks = self._chunks(reply.content)
+        for i, chunk in enumerate(chunks):
+            if i:
+                await asyncio.sleep(self.chunk_seconds)
+            yield self._response(reply, chunk, [], last=False)
+        yield self._response(reply, None, reply.tool_calls, last=True)
+        assistant_message.metrics.stop_timer()
+
+    def _parse_provider_response(self, response: Any, **kwargs) -> ModelResponse:
+        return response
+
+    def _parse_provider_response_delta(self, response: Any) -> ModelResponse:
+        return response
@@ -19,6 +19,11 @@ from .base_models import (
     HabitBase,
     HabitCreate,
     HabitResponse,
+    
+    # Goal plan models
+    GoalPlan,
+    PlanHabit,
+    PlanMilestone,
 )
 
 __all__ = [
@@ -41,4 +46,9 @@ __all__ = [
     "HabitBase",
     "HabitCreate",
     "HabitResponse",
+    
+    # Goal plan models
+    "GoalPlan",
+    "PlanHabit",
+    "PlanMilestone",
 ]
@@ -200,6 +200,32 @@ class HabitResponse(HabitBase):
         }
     )
 
+# =============================================================================
+# GOAL PLAN MODELS
+# =============================================================================
+
+class PlanHabit(BaseModel):
+    """A habit the plan asks the user to build"""
+    name: str = Field(..., description="Short habit name")
+    description: str = Field(..., description="What to do, concretely")
+    frequency: HabitFrequency = Field(default=HabitFrequency.DAILY, description="How often")
+    time_of_day: Optional[str] = Field(None, description="When it fits the user's schedule, e.g. '7:00 AM'")
+
+class PlanMilestone(BaseModel):
+    """One phase of the plan"""
+    period: str = Field(..., description="When, e.g. 'Week 1' or 'Days 1-10'")
+    focus: str = Field(..., description="What this phase is about")
+    actions: List[str] = Field(default_factory=list, description="Concrete steps for this phase")
+
+class GoalPlan(BaseModel):
+    """Structured goal plan returned by the plan agent"""
+    title: str = Field(..., description="Plan title")
+    summary: str = Field(..., description="Two or three sentences on the approach")
+    duration: str = Field(..., description="Total duration, e.g. '8 weeks'")
+    habits: List[PlanHabit] = Field(default_factory=list, description="Habits to build")
+    milestones: List[PlanMilestone] = Field(default_factory=list, description="Phases in order")
+    tips: List[str] = Field(default_factory=list, description="Tips addressing the user's challenges")
+
 # =============================================================================
 # PAGINATION MODELS
 # =============================================================================
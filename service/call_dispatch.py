@@ -0,0 +1,187 @@
+"""
+Pacing and bookkeeping for mass outbound check-in calls.
+
+Daily check-ins for tens of thousands of users go through the same job store
+as one-off scheduled calls (service/call_jobs.py). What this module adds:
+
+- spreading: each recurring schedule's call lands at a stable offset inside
+  the user's window instead of all at e.g. 09:00:00 (done at enqueue time)
+- pacing: `CallRateLimiter` caps calls in flight and calls per minute; the
+  scheduler only claims as many jobs as it may start right now, so jobs it
+  can't start stay in the queue for other workers. "In flight" means the
+  phone is ringing or the call is going on: a placed call keeps its slot until
+  VAPI reports it ended (end-of-call-report or an `ended` status update), or
+  until CALL_SLOT_TTL_SECONDS pass if that report never reaches this worker
+- retries: a check-in that ends unanswered (busy, no answer, voicemail) is
+  requeued with exponential backoff, up to CALL_MAX_ATTEMPTS dials
+- metrics: throughput, failures, retries and queue lag (how late a call
+  started relative to its run_at), exposed at GET /schedule-call/metrics
+
+Limits apply per worker process; with N workers set them to VAPI's limits / N.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Deque, List, Tuple
+
+from service.call_jobs import ScheduledCallService
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_CALLS = int(os.getenv("CALL_MAX_CONCURRENT", "10"))
+CALLS_PER_MINUTE = float(os.getenv("CALLS_PER_MINUTE", "60"))
+CALL_BURST = int(os.getenv("CALL_BURST", "5"))
+# Longest a placed call holds a concurrency slot without hearing that it ended
+CALL_SLOT_TTL_SECONDS = float(os.getenv("CALL_SLOT_TTL_SECONDS", "1800"))
+
+CALL_MAX_ATTEMPTS = int(os.getenv("CALL_MAX_ATTEMPTS", "3"))
+CALL_RETRY_BASE_SECONDS = int(os.getenv("CALL_RETRY_BASE_SECONDS", "600"))
+NO_ANSWER_REASONS = set(
+    os.getenv("CALL_NO_ANSWER_REASONS", "customer-did-not-answer,customer-busy,voicemail").split(",")
+)
+
+METRICS_WINDOW_SECONDS = 300
+LAG_SAMPLES = 1000
+
+
+class CallRateLimiter:
+    """Concurrency cap plus a token bucket refilled at `per_minute` / 60 per second"""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_CALLS, per_minute: float = CALLS_PER_MINUTE, burst: int = CALL_BURST,
+                 slot_ttl_seconds: float = CALL_SLOT_TTL_SECONDS):
+        self.max_concurrent = max_concurrent
+        self.rate = per_minute / 60.0
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.in_flight = 0
+        self.slot_ttl_seconds = slot_ttl_seconds
+        # call_id -> when its slot is given back even if we never hear the call ended
+        self._held: Dict[str, float] = {}
+        self._updated = time.monotonic()
+        self._released: Optional[asyncio.Event] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self) -> int:
+        """How many calls may start right now"""
+        self._expire_held()
+        self._refill()
+        return max(0, min(self.max_concurrent - self.in_flight, int(self.tokens)))
+
+    def acquire(self) -> None:
+        """Take a slot and a token; only call after `available()` said so"""
+        self._refill()
+        self.tokens -= 1
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        if self._released is not None:
+            self._released.set()
+
+    def hold(self, call_id: str) -> None:
+        """Keep an acquired slot for the placed call until `release_call(call_id)`"""
+        self._held[call_id] = time.monotonic() + self.slot_ttl_seconds
+
+    def release_call(self, call_id: str) -> bool:
+        """Give back the slot of a call that ended; False if this limiter wasn't holding it"""
+        if self._held.pop(call_id, None) is None:
+            return False
+        self.release()
+        return True
+
+    def held_calls(self) -> List[str]:
+        return list(self._held)
+
+    def _expire_held(self) -> None:
+        now = time.monotonic()
+        for call_id in [c for c, expires_at in self._held.items() if expires_at <= now]:
+            logger.warning(f"No end of call report for {call_id} after {self.slot_ttl_seconds:.0f}s, freeing its slot")
+            self.release_call(call_id)
+
+    async def wait_available(self, timeout: float) -> None:
+        """Sleep until a call may start, or at most `timeout` seconds"""
+        deadline = time.monotonic() + timeout
+        while self.available() == 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if self.in_flight >= self.max_concurrent:
+                if self._released is None:
+                    self._released = asyncio.Event()
+                self._released.clear()
+                try:
+                    await asyncio.wait_for(self._released.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return
+            else:
+                await asyncio.sleep(min(remaining, (1 - self.tokens) / self.rate if self.rate > 0 else remaining))
+
+
+class DispatchMetrics:
+    def __init__(self, window_seconds: int = METRICS_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self.started_at = time.time()
+        self.counters: Dict[str, int] = {"claimed": 0, "placed": 0, "failed": 0, "retried": 0, "enqueued": 0}
+        # (finished at, succeeded) for throughput over the window
+        self._finished: Deque[Tuple[float, bool]] = deque()
+        self._lags: Deque[float] = deque(maxlen=LAG_SAMPLES)
+
+    def record_start(self, job: Dict[str, Any]) -> None:
+        self.counters["claimed"] += 1
+        try:
+            run_at = datetime.fromisoformat(str(job["run_at"]).replace("Z", "+00:00"))
+            self._lags.append(max(0.0, (datetime.now(timezone.utc) - run_at).total_seconds()))
+        except (KeyError, ValueError):
+            pass
+
+    def record_result(self, succeeded: bool) -> None:
+        self.counters["placed" if succeeded else "failed"] += 1
+        now = time.time()
+        self._finished.append((now, succeeded))
+        while self._finished and self._finished[0][0] < now - self.window_seconds:
+            self._finished.popleft()
+
+    def record(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        recent = [ok for finished_at, ok in self._finished if finished_at >= now - self.window_seconds]
+        window_minutes = min(self.window_seconds, now - self.started_at) / 60 or 1
+        lags = sorted(self._lags)
+        return {
+            **self.counters,
+            "calls_per_minute": round(sum(recent) / window_minutes, 2),
+            "failures_per_minute": round((len(recent) - sum(recent)) / window_minutes, 2),
+            "queue_lag_seconds": {
+                "avg": round(sum(lags) / len(lags), 2) if lags else None,
+                "p95": round(lags[int(0.95 * (len(lags) - 1))], 2) if lags else None,
+                "max": round(lags[-1], 2) if lags else None,
+            },
+        }
+
+
+dispatch_metrics = DispatchMetrics()
+
+
+async def retry_if_unanswered(call_id: str, ended_reason: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Requeue the scheduled call behind `call_id` if nobody picked up"""
+    if not call_id or ended_reason not in NO_ANSWER_REASONS:
+        return None
+    try:
+        job = await ScheduledCallService.retry_unanswered(call_id, ended_reason, CALL_MAX_ATTEMPTS, CALL_RETRY_BASE_SECONDS)
+    except Exception as e:
+        logger.error(f"Could not requeue unanswered call {call_id}: {str(e)}")
+        return None
+    if job is not None:
+        dispatch_metrics.record("retried")
+        print(f"Call {call_id} ended with {ended_reason}; retrying job {job['id']} at {job['run_at']}")
+    return job
@@ -0,0 +1,582 @@
+"""
+Durable job store for scheduled calls.
+
+Scheduled calls used to live in an in-process APScheduler: they were lost on
+restart and every uvicorn worker ran its own scheduler. Jobs are now rows in
+`scheduled_calls` (Postgres via Supabase, or a local SQLite file when
+CALL_JOB_STORE=sqlite) and a worker has to claim a job before running it.
+
+A claim is a lease: the job is marked `running` for LEASE seconds under the
+worker's id. Claims are atomic (FOR UPDATE SKIP LOCKED in Postgres, a write
+transaction in SQLite) so no two workers ever get the same job, and a job
+whose worker died mid-run is picked up again once its lease expires.
+Finishing a job only succeeds for the worker still holding the lease.
+
+The VAPI call id is written to the job as soon as VAPI accepts the call, so
+an expired lease on a job that already has a call id is closed as `done`
+instead of dialling the user again. Reclaiming is bounded too: an expired job
+that has used up `max_attempts` claims is marked `failed`.
+
+Recurring daily check-ins live in `call_schedules`; `enqueue_daily` turns
+them into one job per schedule per local day (see service/call_dispatch.py).
+"""
+
+import os
+import uuid
+import zlib
+import asyncio
+import sqlite3
+import logging
+import threading
+from datetime import datetime, date, time, timezone, timedelta
+from typing import Optional, Dict, Any, List
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SQLITE_PATH = os.path.join(".cache", "scheduled_calls.sqlite3")
+UNFINISHED_STATUSES = ("pending", "running")
+
+
+def to_utc(value: datetime) -> datetime:
+    """Naive datetimes are taken as server local time"""
+    return value.astimezone(timezone.utc)
+
+
+def _iso(value: datetime) -> str:
+    # Fixed width so SQLite can compare timestamps as text
+    return to_utc(value).strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+
+def window_offset_seconds(schedule_id: str, day: date, window_minutes: int) -> int:
+    """Stable spot for a schedule's call inside its window on a given day"""
+    return zlib.crc32(f"{schedule_id}{day.isoformat()}".encode()) % max(window_minutes * 60, 1)
+
+
+class SupabaseCallJobBackend:
+    """Jobs in the shared Postgres table, claimed through claim_scheduled_calls"""
+
+    def __init__(self):
+        from database.supabaseClient import supabase
+        self.supabase = supabase
+
+    def add(self, user_id: str, phone_number: str, run_at: datetime) -> Dict[str, Any]:
+        result = self.supabase.table("scheduled_calls").insert({
+            "user_id": user_id,
+            "phone_number": phone_number,
+            "run_at": _iso(run_at),
+        }).execute()
+        return result.data[0]
+
+    def claim_due(self, worker_id: str, lease_seconds: int, limit: int, max_attempts: int) -> List[Dict[str, Any]]:
+        result = self.supabase.rpc("claim_scheduled_calls", {
+            "p_worker": worker_id,
+            "p_lease_seconds": lease_seconds,
+            "p_limit": limit,
+            "p_max_attempts": max_attempts,
+        }).execute()
+        return result.data or []
+
+    def finish(self, job_id: str, worker_id: str, values: Dict[str, Any]) -> bool:
+        result = self.supabase.table("scheduled_calls").update(values) \
+            .eq("id", job_id).eq("lease_owner", worker_id).eq("status", "running").execute()
+        return bool(result.data)
+
+    def list_for_user(self, user_id: str, include_finished: bool, limit: int) -> List[Dict[str, Any]]:
+        query = self.supabase.table("scheduled_calls").select("*").eq("user_id", user_id)
+        if not include_finished:
+            query = query.in_("status", list(UNFINISHED_STATUSES))
+        result = query.order("run_at", desc=True).limit(limit).execute()
+        return result.data or []
+
+    def cancel(self, job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        result = self.supabase.table("scheduled_calls").update({"status": "cancelled"}) \
+            .eq("id", job_id).eq("user_id", user_id).eq("status", "pending").execute()
+        return result.data[0] if result.data else None
+
+    def count_due(self) -> int:
+        result = self.supabase.table("scheduled_calls").select("id", count="exact", head=True) \
+            .eq("status", "pending").lte("run_at", _iso(datetime.now(timezone.utc))).execute()
+        return result.count or 0
+
+    def retry_unanswered(self, call_id: str, ended_reason: str, max_attempts: int, base_seconds: int) -> Optional[Dict[str, Any]]:
+        result = self.supabase.rpc("retry_unanswered_call", {
+            "p_call_id": call_id,
+            "p_ended_reason": ended_reason,
+            "p_max_attempts": max_attempts,
+            "p_base_seconds": base_seconds,
+        }).execute()
+        return result.data[0] if result.data else None
+
+    def add_schedule(self, schedule: Dict[str, Any]) -> Dict[str, Any]:
+        result = self.supabase.table("call_schedules").insert(schedule).execute()
+        return result.data[0]
+
+    def list_schedules(self, user_id: str) -> List[Dict[str, Any]]:
+        result = self.supabase.table("call_schedules").select("*").eq("user_id", user_id).order("local_time").execute()
+        return result.data or []
+
+    def delete_schedule(self, schedule_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        # Calls already queued from this schedule go with it
+        self.supabase.table("scheduled_calls").update({"status": "cancelled"}) \
+            .eq("schedule_id", schedule_id).eq("user_id", user_id).eq("status", "pending").execute()
+        result = self.supabase.table("call_schedules").delete().eq("id", schedule_id).eq("user_id", user_id).execute()
+        return result.data[0] if result.data else None
+
+    def enqueue_daily(self) -> int:
+        result = self.supabase.rpc("enqueue_daily_checkins", {}).execute()
+        return int(result.data or 0)
+
+
+class SQLiteCallJobBackend:
+    """Same job store in a local SQLite file; safe across processes on one machine"""
+
+    COLUMNS = ("id", "user_id", "phone_number", "run_at", "status", "attempts", "lease_owner",
+               "lease_expires_at", "call_id", "last_error", "created_at", "updated_at",
+               "schedule_id", "scheduled_for")
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scheduled_calls ("
+                " id TEXT PRIMARY KEY, user_id TEXT NOT NULL, phone_number TEXT NOT NULL,"
+                " run_at TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending',"
+                " attempts INTEGER NOT NULL DEFAULT 0, lease_owner TEXT, lease_expires_at TEXT,"
+                " call_id TEXT, last_error TEXT, created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS scheduled_calls_due_idx ON scheduled_calls (status, run_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS scheduled_calls_user_idx ON scheduled_calls (user_id, run_at)")
+            # Files created before recurring check-ins existed
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(scheduled_calls)")}
+            for column in ("schedule_id", "scheduled_for"):
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE scheduled_calls ADD COLUMN {column} TEXT")
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS scheduled_calls_schedule_day_idx"
+                " ON scheduled_calls (schedule_id, scheduled_for)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS scheduled_calls_call_id_idx ON scheduled_calls (call_id)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS call_schedules ("
+                " id TEXT PRIMARY KEY, user_id TEXT NOT NULL, phone_number TEXT NOT NULL,"
+                " local_time TEXT NOT NULL, timezone TEXT NOT NULL, window_minutes INTEGER NOT NULL,"
+                " active INTEGER NOT NULL DEFAULT 1, created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; writes that must be atomic open BEGIN IMMEDIATE themselves
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _get(self, conn: sqlite3.Connection, job_id: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute("SELECT * FROM scheduled_calls WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def add(self, user_id: str, phone_number: str, run_at: datetime) -> Dict[str, Any]:
+        job_id = str(uuid.uuid4())
+        now = _iso(datetime.now(timezone.utc))
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT INTO scheduled_calls (id, user_id, phone_number, run_at, created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, user_id, phone_number, _iso(run_at), now, now),
+                )
+                return self._get(conn, job_id)
+            finally:
+                conn.close()
+
+    def claim_due(self, worker_id: str, lease_seconds: int, limit: int, max_attempts: int) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            conn = self._connect()
+            try:
+                # BEGIN IMMEDIATE takes the write lock up front, so a claim in
+                # another process can't interleave between our SELECT and UPDATE
+                conn.execute("BEGIN IMMEDIATE")
+                # Expired leases whose call was already placed: the worker died before complete()
+                conn.execute(
+                    "UPDATE scheduled_calls SET status = 'done', lease_owner = NULL, lease_expires_at = NULL,"
+                    " updated_at = ? WHERE status = 'running' AND lease_expires_at < ? AND call_id IS NOT NULL",
+                    (_iso(now), _iso(now)),
+                )
+                # Expired leases that keep dying or timing out: stop redialling them
+                conn.execute(
+                    "UPDATE scheduled_calls SET status = 'failed', last_error = 'Lease expired after ' || attempts || ' attempts',"
+                    " lease_owner = NULL, lease_expires_at = NULL, updated_at = ?"
+                    " WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?",
+                    (_iso(now), _iso(now), max_attempts),
+                )
+                rows = conn.execute(
+                    "SELECT id FROM scheduled_calls"
+                    " WHERE (status = 'pending' AND run_at <= ?)"
+                    " OR (status = 'running' AND lease_expires_at < ?)"
+                    " ORDER BY run_at LIMIT ?",
+                    (_iso(now), _iso(now), limit),
+                ).fetchall()
+                ids = [row["id"] for row in rows]
+                conn.executemany(
+                    "UPDATE scheduled_calls SET status = 'running', lease_owner = ?, lease_expires_at = ?,"
+                    " attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    [(worker_id, _iso(now + timedelta(seconds=lease_seconds)), _iso(now), job_id) for job_id in ids],
+                )
+                conn.execute("COMMIT")
+                return [self._get(conn, job_id) for job_id in ids]
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+
+    def finish(self, job_id: str, worker_id: str, values: Dict[str, Any]) -> bool:
+        values = {**values, "updated_at": _iso(datetime.now(timezone.utc))}
+        assignments = ", ".join(f"{column} = ?" for column in values if column in self.COLUMNS)
+        params = [value for column, value in values.items() if column in self.COLUMNS]
+        with self._lock:
+            conn = self._connect()
+            try:
+                cursor = conn.execute(
+                    f"UPDATE scheduled_calls SET {assignments}"
+                    " WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                    (*params, job_id, worker_id),
+                )
+                return cursor.rowcount > 0
+            finally:
+                conn.close()
+
+    def list_for_user(self, user_id: str, include_finished: bool, limit: int) -> List[Dict[str, Any]]:
+        sql = "SELECT * FROM scheduled_calls WHERE user_id = ?"
+        params: List[Any] = [user_id]
+        if not include_finished:
+            sql += " AND status IN (?, ?)"
+            params.extend(UNFINISHED_STATUSES)
+        sql += " ORDER BY run_at DESC LIMIT ?"
+        params.append(limit)
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+
+    def cancel(self, job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connect()
+            try:
+                cursor = conn.execute(
+                    "UPDATE scheduled_calls SET status = 'cancelled', updated_at = ?"
+                    " WHERE id = ? AND user_id = ? AND status = 'pending'",
+                    (_iso(datetime.now(timezone.utc)), job_id, user_id),
+                )
+                return self._get(conn, job_id) if cursor.rowcount else None
+            finally:
+                conn.close()
+
+    def count_due(self) -> int:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM scheduled_calls WHERE status = 'pending' AND run_at <= ?",
+                (_iso(datetime.now(timezone.utc)),),
+            ).fetchone()
+            return row[0]
+        finally:
+            conn.close()
+
+    def retry_unanswered(self, call_id: str, ended_reason: str, max_attempts: int, base_seconds: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT id, attempts FROM scheduled_calls WHERE call_id = ? AND status = 'done' AND attempts < ?",
+                    (call_id, max_attempts),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                now = datetime.now(timezone.utc)
+                run_at = now + timedelta(seconds=base_seconds * 2 ** (row["attempts"] - 1))
+                conn.execute(
+                    "UPDATE scheduled_calls SET status = 'pending', run_at = ?, last_error = ?, call_id = NULL,"
+                    " updated_at = ? WHERE id = ?",
+                    (_iso(run_at), ended_reason, _iso(now), row["id"]),
+                )
+                conn.execute("COMMIT")
+                return self._get(conn, row["id"])
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+
+    def add_schedule(self, schedule: Dict[str, Any]) -> Dict[str, Any]:
+        now = _iso(datetime.now(timezone.utc))
+        row = {"id": str(uuid.uuid4()), "active": 1, "created_at": now, "updated_at": now, **schedule}
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    f"INSERT INTO call_schedules ({', '.join(row)}) VALUES ({', '.join('?' for _ in row)})",
+                    tuple(row.values()),
+                )
+                return dict(conn.execute("SELECT * FROM call_schedules WHERE id = ?", (row["id"],)).fetchone())
+            finally:
+                conn.close()
+
+    def list_schedules(self, user_id: str) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT * FROM call_schedules WHERE user_id = ? ORDER BY local_time", (user_id,))
+            return [dict(row) for row in rows.fetchall()]
+        finally:
+            conn.close()
+
+    def delete_schedule(self, schedule_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT * FROM call_schedules WHERE id = ? AND user_id = ?", (schedule_id, user_id)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE scheduled_calls SET status = 'cancelled', updated_at = ?"
+                        " WHERE schedule_id = ? AND status = 'pending'",
+                        (_iso(datetime.now(timezone.utc)), schedule_id),
+                    )
+                    conn.execute("DELETE FROM call_schedules WHERE id = ?", (schedule_id,))
+                conn.execute("COMMIT")
+                return dict(row) if row else None
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+
+    def enqueue_daily(self) -> int:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                inserted = 0
+                for schedule in conn.execute("SELECT * FROM call_schedules WHERE active = 1").fetchall():
+                    tz = ZoneInfo(schedule["timezone"])
+                    today = now.astimezone(tz).date()
+                    for day in (today, today + timedelta(days=1)):
+                        window_start = datetime.combine(day, time.fromisoformat(schedule["local_time"]), tzinfo=tz)
+                        if window_start + timedelta(minutes=schedule["window_minutes"]) <= now:
+                            continue
+                        run_at = window_start + timedelta(
+                            seconds=window_offset_seconds(schedule["id"], day, schedule["window_minutes"])
+                        )
+                        cursor = conn.execute(
+                            "INSERT OR IGNORE INTO scheduled_calls (id, user_id, phone_number, run_at, schedule_id,"
+                            " scheduled_for, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (str(uuid.uuid4()), schedule["user_id"], schedule["phone_number"], _iso(run_at),
+                             schedule["id"], day.isoformat(), _iso(now), _iso(now)),
+                        )
+                        inserted += cursor.rowcount
+                conn.execute("COMMIT")
+                return inserted
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+
+
+_backend = None
+
+
+def get_call_job_backend():
+    """Backend picked by CALL_JOB_STORE (supabase, the default, or sqlite)"""
+    global _backend
+    if _backend is None:
+        if os.getenv("CALL_JOB_STORE", "supabase").lower() == "sqlite":
+            _backend = SQLiteCallJobBackend(os.getenv("CALL_JOB_STORE_PATH", DEFAULT_SQLITE_PATH))
+        else:
+            _backend = SupabaseCallJobBackend()
+    return _backend
+
+
+class ScheduledCallService:
+    @staticmethod
+    async def schedule(user_id: str, phone_number: str, run_at: datetime) -> Dict[str, Any]:
+        """Store a call to be placed at `run_at`"""
+        try:
+            job = await asyncio.to_thread(get_call_job_backend().add, user_id, phone_number, run_at)
+            return {
+                "success": True,
+                "data": job,
+                "message": "Call scheduled successfully"
+            }
+        except Exception as e:
+            logger.error(f"Error scheduling call for user {user_id}: {str(e)}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Error scheduling call: {str(e)}"
+            }
+
+    @staticmethod
+    async def claim_due(worker_id: str, lease_seconds: int, limit: int, max_attempts: int) -> List[Dict[str, Any]]:
+        """Lease up to `limit` due jobs to this worker; expired jobs are reclaimed up to `max_attempts` times"""
+        return await asyncio.to_thread(get_call_job_backend().claim_due, worker_id, lease_seconds, limit, max_attempts)
+
+    @staticmethod
+    async def record_call(job_id: str, worker_id: str, call_id: str) -> bool:
+        """Note the placed call on the job right away, so a reclaimed job never dials it again"""
+        return await asyncio.to_thread(get_call_job_backend().finish, job_id, worker_id, {"call_id": call_id})
+
+    @staticmethod
+    async def complete(job_id: str, worker_id: str, call_id: Optional[str]) -> bool:
+        return await asyncio.to_thread(get_call_job_backend().finish, job_id, worker_id, {
+            "status": "done",
+            "call_id": call_id,
+            "lease_owner": None,
+            "lease_expires_at": None,
+        })
+
+    @staticmethod
+    async def fail(job_id: str, worker_id: str, error: str) -> bool:
+        return await asyncio.to_thread(get_call_job_backend().finish, job_id, worker_id, {
+            "status": "failed",
+            "last_error": error,
+            "lease_owner": None,
+            "lease_expires_at": None,
+        })
+
+    @staticmethod
+    async def list_for_user(user_id: str, include_finished: bool = True, limit: int = 50) -> Dict[str, Any]:
+        """A user's scheduled calls, latest first"""
+        try:
+            jobs = await asyncio.to_thread(get_call_job_backend().list_for_user, user_id, include_finished, limit)
+            return {
+                "success": True,
+                "data": jobs,
+                "message": "Scheduled calls retrieved successfully"
+            }
+        except Exception as e:
+            logger.error(f"Error listing scheduled calls for user {user_id}: {str(e)}")
+            return {
+                "success": False,
+                "data": [],
+                "message": f"Error retrieving scheduled calls: {str(e)}"
+            }
+
+    @staticmethod
+    async def cancel(job_id: str, user_id: str) -> Dict[str, Any]:
+        """Cancel a call that hasn't started yet"""
+        try:
+            job = await asyncio.to_thread(get_call_job_backend().cancel, job_id, user_id)
+            if job is None:
+                return {
+                    "success": False,
+                    "data": None,
+                    "message": "Scheduled call not found or already started"
+                }
+            return {
+                "success": True,
+                "data": job,
+                "message": "Scheduled call cancelled successfully"
+            }
+        except Exception as e:
+            logger.error(f"Error cancelling scheduled call {job_id}: {str(e)}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Error cancelling scheduled call: {str(e)}"
+            }
+
+    @staticmethod
+    async def count_due() -> int:
+        """Jobs that are due but not claimed yet (dispatch backlog)"""
+        return await asyncio.to_thread(get_call_job_backend().count_due)
+
+    @staticmethod
+    async def retry_unanswered(call_id: str, ended_reason: str, max_attempts: int, base_seconds: int) -> Optional[Dict[str, Any]]:
+        """Requeue the job that placed `call_id` with exponential backoff; None if it's out of attempts"""
+        return await asyncio.to_thread(get_call_job_backend().retry_unanswered, call_id, ended_reason, max_attempts, base_seconds)
+
+    @staticmethod
+    async def enqueue_daily() -> int:
+        """Create today's and tomorrow's jobs for all active check-in schedules"""
+        return await asyncio.to_thread(get_call_job_backend().enqueue_daily)
+
+    @staticmethod
+    async def create_schedule(user_id: str, phone_number: str, local_time: time, tz: str, window_minutes: int) -> Dict[str, Any]:
+        """Call a user every day somewhere in [local_time, local_time + window_minutes)"""
+        try:
+            schedule = await asyncio.to_thread(get_call_job_backend().add_schedule, {
+                "user_id": user_id,
+                "phone_number": phone_number,
+                "local_time": local_time.strftime("%H:%M:%S"),
+                "timezone": tz,
+                "window_minutes": window_minutes,
+            })
+            return {
+                "success": True,
+                "data": schedule,
+                "message": "Check-in schedule created successfully"
+            }
+        except Exception as e:
+            logger.error(f"Error creating check-in schedule for user {user_id}: {str(e)}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Error creating check-in schedule: {str(e)}"
+            }
+
+    @staticmethod
+    async def list_schedules(user_id: str) -> Dict[str, Any]:
+        try:
+            schedules = await asyncio.to_thread(get_call_job_backend().list_schedules, user_id)
+            return {
+                "success": True,
+                "data": schedules,
+                "message": "Check-in schedules retrieved successfully"
+            }
+        except Exception as e:
+            logger.error(f"Error listing check-in schedules for user {user_id}: {str(e)}")
+            return {
+                "success": False,
+                "data": [],
+                "message": f"Error retrieving check-in schedules: {str(e)}"
+            }
+
+    @staticmethod
+    async def delete_schedule(schedule_id: str, user_id: str) -> Dict[str, Any]:
+        """Stop a recurring check-in and cancel its queued calls"""
+        try:
+            schedule = await asyncio.to_thread(get_call_job_backend().delete_schedule, schedule_id, user_id)
+            if schedule is None:
+                return {
+                    "success": False,
+                    "data": None,
+                    "message": "Check-in schedule not found"
+                }
+            return {
+                "success": True,
+                "data": schedule,
+                "message": "Check-in schedule deleted successfully"
+            }
+        except Exception as e:
+            logger.error(f"Error deleting check-in schedule {schedule_id}: {str(e)}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Error deleting check-in schedule: {str(e)}"
+            }
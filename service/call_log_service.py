@@ -0,0 +1,114 @@
+"""
+Registry of the calls we place, per user.
+
+Replaces the single shared tools/last_call_id.txt: every outbound call is
+recorded in the `call_logs` table with its user, VAPI call id, status and
+timestamps. Because it lives in Postgres it is shared by all workers, and
+"last call for this user" is one probe of the (user_id, created_at) index.
+"""
+
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List
+
+from database.supabaseClient import supabase
+
+logger = logging.getLogger(__name__)
+
+
+class CallLogService:
+    @staticmethod
+    async def record_call(call_id: str, user_id: str, phone_number: Optional[str] = None, status: str = "queued") -> Dict[str, Any]:
+        """Register a call we just placed"""
+        try:
+            query = supabase.table("call_logs").upsert({
+                "call_id": call_id,
+                "user_id": user_id,
+                "phone_number": phone_number,
+                "status": status,
+            }, on_conflict="call_id")
+            result = await asyncio.to_thread(query.execute)
+
+            return {
+                "success": True,
+                "data": result.data[0] if result.data else None,
+                "message": "Call logged successfully"
+            }
+        except Exception as e:
+            logger.error(f"Error logging call {call_id}: {str(e)}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Error logging call: {str(e)}"
+            }
+
+    @staticmethod
+    async def get_last_call(user_id: str) -> Dict[str, Any]:
+        """Get the most recent call placed for a user"""
+        try:
+            query = (
+                supabase.table("call_logs")
+                .select("*")
+                .eq("user_id", user_id)
+                .order("created_at", desc=True)
+                .limit(1)
+            )
+            result = await asyncio.to_thread(query.execute)
+
+            if result.data:
+                return {
+                    "success": True,
+                    "data": result.data[0],
+                    "message": "Last call retrieved successfully"
+                }
+            return {
+                "success": False,
+                "data": None,
+                "message": "No calls found for this user"
+            }
+        except Exception as e:
+            logger.error(f"Error retrieving last call for user {user_id}: {str(e)}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Error retrieving last call: {str(e)}"
+            }
+
+    @staticmethod
+    async def get_statuses(call_ids: List[str]) -> Dict[str, str]:
+        """call_id -> status for the logged calls among `call_ids`"""
+        if not call_ids:
+            return {}
+        query = supabase.table("call_logs").select("call_id,status").in_("call_id", call_ids)
+        result = await asyncio.to_thread(query.execute)
+        return {row["call_id"]: row["status"] for row in result.data or []}
+
+    @staticmethod
+    async def update_status(call_id: str, status: str, ended_reason: Optional[str] = None) -> Dict[str, Any]:
+        """Update the status of a logged call (from VAPI status/end-of-call webhooks)"""
+        try:
+            update_dict = {"status": status}
+            if ended_reason:
+                update_dict["ended_reason"] = ended_reason
+
+            query = supabase.table("call_logs").update(update_dict).eq("call_id", call_id)
+            result = await asyncio.to_thread(query.execute)
+
+            if result.data:
+                return {
+                    "success": True,
+                    "data": result.data[0],
+                    "message": "Call status updated successfully"
+                }
+            return {
+                "success": False,
+                "data": None,
+                "message": "Call not found in call log"
+            }
+        except Exception as e:
+            logger.error(f"Error updating status of call {call_id}: {str(e)}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Error updating call status: {str(e)}"
+            }
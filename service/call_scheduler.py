@@ -0,0 +1,191 @@
+"""
+Runs scheduled calls from the durable job store (service/call_jobs.py).
+
+One CallScheduler per worker process, running as a task on the app's event
+loop (started from main.py's lifespan). Every few seconds it claims the due
+jobs and places the calls; because claims are leases, running several
+workers means more throughput, not duplicate calls.
+
+It never claims more jobs than the rate limiter lets it start (see
+service/call_dispatch.py), and every few minutes it turns recurring check-in
+schedules into jobs. A placed call keeps its concurrency slot until the VAPI
+webhook reports it ended (`call_ended`); when that webhook lands on another
+worker, the next poll sees the ended status in the shared call log. While a
+call rings, the caller's context is warmed up for the webhook
+(service/call_warmup.py).
+"""
+
+import os
+import time
+import socket
+import asyncio
+import logging
+from typing import Optional, Dict, Any, Set
+
+from service.call_jobs import ScheduledCallService
+from service.call_dispatch import CALL_MAX_ATTEMPTS, CallRateLimiter, DispatchMetrics, dispatch_metrics
+from service.outbound_calls import OutboundCallService
+from service.call_warmup import CallWarmup
+from service.call_log_service import CallLogService
+
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = float(os.getenv("CALL_SCHEDULER_POLL_SECONDS", "5"))
+# Must comfortably cover placing one call including VAPI retries
+LEASE_SECONDS = int(os.getenv("CALL_SCHEDULER_LEASE_SECONDS", "120"))
+BATCH_SIZE = int(os.getenv("CALL_SCHEDULER_BATCH_SIZE", "20"))
+CHECKIN_ENQUEUE_SECONDS = float(os.getenv("CHECKIN_ENQUEUE_SECONDS", "300"))
+
+
+class CallScheduler:
+    def __init__(self, poll_seconds: float = POLL_SECONDS, lease_seconds: int = LEASE_SECONDS, batch_size: int = BATCH_SIZE,
+                 limiter: Optional[CallRateLimiter] = None, metrics: Optional[DispatchMetrics] = None):
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.batch_size = batch_size
+        self.limiter = limiter or CallRateLimiter()
+        self.metrics = metrics or dispatch_metrics
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._next_enqueue = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._running: Set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start polling on the running event loop"""
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Call scheduler started as {self.worker_id}")
+
+    async def stop(self) -> None:
+        """Stop polling; calls being placed are cancelled and their leases expire"""
+        tasks = [t for t in (self._task, *self._running) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._running.clear()
+
+    def wake(self) -> None:
+        """Poll now instead of at the next interval (e.g. a job was just added)"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _loop(self) -> None:
+        while True:
+            if time.monotonic() >= self._next_enqueue:
+                await self.enqueue_checkins()
+            await self.reconcile_held_calls()
+            try:
+                limit = min(self.batch_size, self.limiter.available())
+                claimed = await self.run_due(limit) if limit else 0
+            except Exception as e:
+                logger.error(f"Call scheduler poll failed: {str(e)}")
+                claimed, limit = 0, 1
+
+            if limit == 0 or claimed == limit:
+                # At the rate limit or probably more due: go again as soon as the limiter allows
+                await self.limiter.wait_available(self.poll_seconds)
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def enqueue_checkins(self) -> None:
+        """Queue recurring check-ins; safe to run on every worker"""
+        self._next_enqueue = time.monotonic() + CHECKIN_ENQUEUE_SECONDS
+        try:
+            enqueued = await ScheduledCallService.enqueue_daily()
+            self.metrics.record("enqueued", enqueued)
+            if enqueued:
+                logger.info(f"Queued {enqueued} check-in calls")
+        except Exception as e:
+            logger.error(f"Queueing check-in calls failed: {str(e)}")
+
+    async def run_due(self, limit: Optional[int] = None) -> int:
+        """Claim up to `limit` due jobs and start placing their calls"""
+        jobs = await ScheduledCallService.claim_due(self.worker_id, self.lease_seconds, limit or self.batch_size,
+                                                    CALL_MAX_ATTEMPTS)
+        for job in jobs:
+            self.limiter.acquire()
+            self.metrics.record_start(job)
+            task = asyncio.create_task(self._run_job(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+        return len(jobs)
+
+    def call_ended(self, call_id: str) -> None:
+        """Free the concurrency slot of a call VAPI reported as ended"""
+        if self.limiter.release_call(call_id):
+            logger.info(f"Call {call_id} ended, freed its dispatch slot")
+            self.wake()
+
+    async def reconcile_held_calls(self) -> None:
+        """Free slots of calls whose end was reported to another worker"""
+        held = self.limiter.held_calls()
+        if not held:
+            return
+        try:
+            statuses = await CallLogService.get_statuses(held)
+        except Exception as e:
+            logger.warning(f"Could not check the status of held calls: {str(e)}")
+            return
+        for call_id, status in statuses.items():
+            if status == "ended":
+                self.call_ended(call_id)
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        print(f"Executing scheduled call {job['id']} to {job['phone_number']} for user {job['user_id']}")
+        placed: Optional[str] = None
+
+        async def on_created(call_id: str) -> None:
+            nonlocal placed
+            # From here the slot belongs to the call, until VAPI says it ended
+            placed = call_id
+            self.limiter.hold(call_id)
+            await ScheduledCallService.record_call(job["id"], self.worker_id, call_id)
+
+        try:
+            # Warm-up runs while the phone rings so the first Read_todo is instant
+            result, _ = await asyncio.gather(
+                OutboundCallService.place_call(job["phone_number"], job["user_id"], on_created=on_created),
+                CallWarmup.warm(job["phone_number"]),
+            )
+        except Exception as e:
+            result = {"success": False, "data": None, "message": f"Failed to create call: {str(e)}"}
+        finally:
+            if placed is None:
+                self.limiter.release()
+        self.metrics.record_result(result["success"])
+
+        try:
+            if result["success"]:
+                finished = await ScheduledCallService.complete(job["id"], self.worker_id, (result["data"] or {}).get("id"))
+            else:
+                finished = await ScheduledCallService.fail(job["id"], self.worker_id, result["message"])
+        except Exception as e:
+            logger.error(f"Could not record outcome of scheduled call {job['id']}: {str(e)}")
+            return
+        if not finished:
+            logger.warning(f"Lease on scheduled call {job['id']} was lost before it finished")
+        print(f"Scheduled call {job['id']} result: {result['message']}")
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "in_flight": self.limiter.in_flight,
+            "max_concurrent": self.limiter.max_concurrent,
+            "calls_per_minute_limit": self.limiter.rate * 60,
+            **self.metrics.snapshot(),
+        }
+
+
+call_scheduler = CallScheduler()
@@ -0,0 +1,146 @@
+"""
+Local store of finished VAPI calls.
+
+VAPI posts an `end-of-call-report` to our webhook when a call ends. We keep
+that report (transcript, messages, cost, timestamps) in the `call_reports`
+table so the transcript tools can answer from our own database instead of
+polling api.vapi.ai for the same data.
+
+Records are stored and returned in the same shape as VAPI's call object
+(`transcript`, `messages`, `costBreakdown`, `startedAt`, ...) so callers can
+treat a store hit and an API response the same way.
+"""
+
+import asyncio
+import logging
+from typing import Optional, Dict, Any
+
+from database.supabaseClient import supabase
+
+logger = logging.getLogger(__name__)
+
+# Everything except the search vector, which is only useful inside Postgres
+CALL_COLUMNS = "call_id,user_id,status,transcript,messages,summary,cost,cost_breakdown,ended_reason,started_at,ended_at"
+
+
+def report_to_record(message: Dict[str, Any], user_id: Optional[str] = None) -> Dict[str, Any]:
+    """Build a call_reports row from an end-of-call-report webhook message"""
+    call = message.get("call") or {}
+    artifact = message.get("artifact") or {}
+    analysis = message.get("analysis") or {}
+
+    return {
+        "call_id": call.get("id"),
+        "user_id": user_id,
+        "status": "ended",
+        "transcript": message.get("transcript") or artifact.get("transcript"),
+        "messages": message.get("messages") or artifact.get("messages") or [],
+        "summary": message.get("summary") or analysis.get("summary"),
+        "cost": message.get("cost", call.get("cost")),
+        "cost_breakdown": message.get("costBreakdown") or call.get("costBreakdown"),
+        "ended_reason": message.get("endedReason") or call.get("endedReason"),
+        "started_at": message.get("startedAt") or call.get("startedAt"),
+        "ended_at": message.get("endedAt") or call.get("endedAt"),
+    }
+
+
+def record_to_call(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a call_reports row back into VAPI's call object shape"""
+    call = {
+        "id": record["call_id"],
+        "status": record.get("status") or "ended",
+        "transcript": record.get("transcript"),
+        "messages": record.get("messages") or [],
+        "summary": record.get("summary"),
+        "endedReason": record.get("ended_reason"),
+    }
+    # Only include the optional fields VAPI would have sent
+    if record.get("started_at"):
+        call["startedAt"] = record["started_at"]
+    if record.get("ended_at"):
+        call["endedAt"] = record["ended_at"]
+    if record.get("cost") is not None:
+        call["cost"] = record["cost"]
+    if record.get("cost_breakdown"):
+        call["costBreakdown"] = record["cost_breakdown"]
+    return call
+
+
+class CallStore:
+    @staticmethod
+    async def save_end_of_call_report(message: Dict[str, Any], user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Persist an end-of-call-report (upsert, VAPI may deliver it more than once)"""
+        try:
+            record = report_to_record(message, user_id)
+            if not record["call_id"]:
+                return {
+                    "success": False,
+                    "data": None,
+                    "message": "End-of-call report has no call id"
+                }
+
+            query = supabase.table("call_reports").upsert(record, on_conflict="call_id")
+            result = await asyncio.to_thread(query.execute)
+
+            return {
+                "success": True,
+                "data": result.data[0] if result.data else record,
+                "message": "Call report stored successfully"
+            }
+        except Exception as e:
+            logger.error(f"Error storing call report: {str(e)}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Error storing call report: {str(e)}"
+            }
+
+    @staticmethod
+    async def get_call(call_id: str) -> Dict[str, Any]:
+        """Get a stored call in VAPI call-object shape; data is None on a miss"""
+        try:
+            query = supabase.table("call_reports").select(CALL_COLUMNS).eq("call_id", call_id)
+            result = await asyncio.to_thread(query.execute)
+
+            if result.data:
+                return {
+                    "success": True,
+                    "data": record_to_call(result.data[0]),
+                    "message": "Call retrieved successfully"
+                }
+            return {
+                "success": False,
+                "data": None,
+                "message": "Call not found"
+            }
+        except Exception as e:
+            logger.error(f"Error reading call {call_id} from store: {str(e)}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Error retrieving call: {str(e)}"
+            }
+
+    @staticmethod
+    async def search_transcripts(user_id: str, query: str, limit: int = 5) -> Dict[str, Any]:
+        """Full-text search over a user's stored calls, best matches first with snippets"""
+        try:
+            rpc = supabase.rpc("search_call_transcripts", {
+                "p_user_id": user_id,
+                "p_query": query,
+                "p_limit": limit,
+            })
+            result = await asyncio.to_thread(rpc.execute)
+
+            return {
+                "success": True,
+                "data": result.data or [],
+                "message": "Call transcripts searched successfully"
+            }
+        except Exception as e:
+            logger.error(f"Error searching call transcripts for user {user_id}: {str(e)}")
+            return {
+                "success": False,
+                "data": [],
+                "message": f"Error searching call transcripts: {str(e)}"
+            }
@@ -0,0 +1,172 @@
+"""
+Warm caller context for the VAPI webhook.
+
+The first tool call of a call used to start cold: a `users_profile` lookup to
+map the caller's number to a user, then a full `get_todos` fetch, while the
+user waited in silence. Now:
+
+- the call scheduler warms the context (user id, todo snapshot, spoken
+  summary) while it places a scheduled call, so it is ready by the time the
+  user picks up and asks for their list
+- the webhook resolves callers through `CallWarmup.user_id_for` and reads
+  the list from the snapshot, falling back to the database on a miss
+- TodoService keeps snapshots current on every write, like the TodoMatcher
+  index, so a todo added mid-call shows up in the next Read_todo
+
+Entries live for CALL_WARMUP_TTL_SECONDS. The cache is per process: with
+several workers a webhook that lands on another worker than the scheduler
+does one cold lookup and then is warm for the rest of the call.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List, Tuple
+
+from database.supabaseClient import supabase
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TTL_SECONDS = float(os.getenv("CALL_WARMUP_TTL_SECONDS", "300"))
+
+
+def format_todos_for_speech(todos: List[Dict[str, Any]]) -> str:
+    """Render a todo list the way the assistant reads it out"""
+    if not todos:
+        return "You don't have any todos yet. Your list is empty!"
+
+    # Separate completed and pending todos
+    pending_todos = [t for t in todos if not t.get("completed", False)]
+    completed_todos = [t for t in todos if t.get("completed", False)]
+
+    response_parts = []
+
+    if pending_todos:
+        response_parts.append(f"You have {len(pending_todos)} pending todo{'s' if len(pending_todos) != 1 else ''}:")
+        for idx, todo in enumerate(pending_todos, 1):
+            response_parts.append(f"{idx}. {todo['text']}")
+
+    if completed_todos:
+        if pending_todos:
+            response_parts.append("")  # Add spacing
+        response_parts.append(f"You have {len(completed_todos)} completed todo{'s' if len(completed_todos) != 1 else ''}:")
+        for idx, todo in enumerate(completed_todos, 1):
+            response_parts.append(f"{idx}. {todo['text']} ✓")
+
+    return "\n".join(response_parts)
+
+
+def lookup_user_id(phone_number: str) -> Optional[str]:
+    """Map a caller's phone number to their users_profile id (blocking)"""
+    result = supabase.table("users_profile").select("id").eq("phone", phone_number).execute()
+    if result.data and len(result.data) > 0:
+        return result.data[0]["id"]
+    return None
+
+
+def load_todos(user_id: str) -> List[Dict[str, Any]]:
+    """A user's todos, newest first, as TodoService.get_todos returns them (blocking)"""
+    result = supabase.table("todos").select("*").order("created_at", desc=True).eq("user_id", user_id).execute()
+    return result.data or []
+
+
+class _WarmTodos:
+    """One user's todos, newest first, plus the summary rendered from them"""
+
+    def __init__(self, todos: List[Dict[str, Any]]):
+        self.todos = {todo["id"]: todo for todo in todos}
+        self.expires_at = time.monotonic() + WARMUP_TTL_SECONDS
+        self._summary: Optional[str] = None
+
+    def expired(self) -> bool:
+        return time.monotonic() > self.expires_at
+
+    def changed(self) -> None:
+        self._summary = None
+
+    @property
+    def summary(self) -> str:
+        if self._summary is None:
+            ordered = sorted(self.todos.values(), key=lambda t: t.get("created_at") or "", reverse=True)
+            self._summary = format_todos_for_speech(ordered)
+        return self._summary
+
+
+class CallWarmup:
+    # phone number -> (user id, expires at)
+    _users: Dict[str, Tuple[str, float]] = {}
+    _todos: Dict[str, _WarmTodos] = {}
+
+    @staticmethod
+    async def warm(phone_number: str) -> Dict[str, Any]:
+        """Prefetch everything the first turns of a call to this number need"""
+        try:
+            user_id = await CallWarmup.user_id_for(phone_number)
+            if not user_id:
+                return {
+                    "success": False,
+                    "data": None,
+                    "message": f"No user found with phone number {phone_number}"
+                }
+
+            # Off the loop: this runs next to place_call on the scheduler's event loop
+            warm = _WarmTodos(await asyncio.to_thread(load_todos, user_id))
+            CallWarmup._todos[user_id] = warm
+            return {
+                "success": True,
+                "data": {"user_id": user_id, "todos": len(warm.todos), "summary": warm.summary},
+                "message": "Call context warmed up"
+            }
+        except Exception as e:
+            logger.warning(f"Warming call context for {phone_number} failed: {str(e)}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Error warming call context: {str(e)}"
+            }
+
+    @staticmethod
+    async def user_id_for(phone_number: str) -> Optional[str]:
+        """Cached phone -> user id; looks it up (and caches it) on a miss"""
+        cached = CallWarmup._users.get(phone_number)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        user_id = await asyncio.to_thread(lookup_user_id, phone_number)
+        if user_id:
+            CallWarmup._users[phone_number] = (user_id, time.monotonic() + WARMUP_TTL_SECONDS)
+        return user_id
+
+    @staticmethod
+    def spoken_summary(user_id: str) -> Optional[str]:
+        """The pre-rendered todo list, or None if this user isn't warm"""
+        warm = CallWarmup._todos.get(str(user_id))
+        if warm is None or warm.expired():
+            CallWarmup._todos.pop(str(user_id), None)
+            return None
+        return warm.summary
+
+    # ------------------------------------------------------------------
+    # Snapshot maintenance (called by TodoService after writes)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def remember(todo: Dict[str, Any]) -> None:
+        warm = CallWarmup._todos.get(str(todo.get("user_id")))
+        if warm is not None:
+            warm.todos[todo["id"]] = todo
+            warm.changed()
+
+    @staticmethod
+    def discard(todo_id: str) -> None:
+        for warm in CallWarmup._todos.values():
+            if warm.todos.pop(todo_id, None) is not None:
+                warm.changed()
+
+    @staticmethod
+    def invalidate(user_id: Optional[str] = None) -> None:
+        if user_id is None:
+            CallWarmup._todos.clear()
+        else:
+            CallWarmup._todos.pop(user_id, None)
@@ -1,11 +1,40 @@
-from agent import get_user_agent
+import json
+
+from agent import get_plan_agent
+from service.plan_cache import plan_cache, plan_cache_key
+
+
+def build_plan_prompt(profile: dict) -> str:
+    goal = profile.get("goal") or {}
+    details = {key: value for key, value in profile.items() if key != "goal" and value not in (None, [], "")}
+    return (
+        f"Goal: {goal.get('primary_goal')} in {goal.get('goal_duration')} {goal.get('duration_type')}\n"
+        f"Profile: {json.dumps(details, ensure_ascii=False)}"
+    )
+
+
 async def generate_plan(user_id:str,profile:dict)->dict:
     try:
         # logger.info(f"Generating goals for user {user_id} with profile {profile}")
-        agent = get_user_agent(user_id)
-        response = await agent.arun(f"Generate a goal plan for the user {user_id} with profile {profile}")
+        # The plan agent has no tools, history or memories: the profile is all it needs
+        agent = get_plan_agent()
+        response = await agent.arun(build_plan_prompt(profile))
         print(response.content)
-        return response.content
+        content = response.content
+        return content.model_dump() if hasattr(content, "model_dump") else content
     except Exception as e:
         # logger.error(f"Error generating goals: {e}")
-        raise e
\ No newline at end of file
+        raise e
+
+
+async def get_or_generate_plan(user_id: str, profile: dict, goal: dict, force_regenerate: bool = False):
+    """Plan for this profile + goal, from the plan cache when the same inputs were seen before.
+
+    Returns (plan, served_from_cache).
+    """
+    key = plan_cache_key(profile, goal)
+    return await plan_cache.get_or_generate(
+        key,
+        lambda: generate_plan(user_id=user_id, profile={**profile, "goal": goal}),
+        force=force_regenerate,
+    )
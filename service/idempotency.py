@@ -0,0 +1,197 @@
+"""
+Idempotent processing of VAPI tool calls.
+
+VAPI retries a webhook when it doesn't hear back in time, which used to create
+the same todo twice. Every tool call carries a `toolCallId`, so we key on it:
+
+- a replay of a finished call gets the cached result back
+- a duplicate that arrives while the first one is still running waits for it
+- results expire after a TTL
+
+A tool call runs at most once. If another worker still owns it after
+SHARED_WAIT_SECONDS (or whatever is left of the caller's deadline, if that is
+sooner), the duplicate answers with the caller's "still working"
+acknowledgement instead of running it too, and VAPI's next retry looks again.
+
+The in-memory backend covers a single worker. With several uvicorn workers set
+IDEMPOTENCY_BACKEND=supabase so the claim/result lives in the shared
+`vapi_tool_results` table (see database/models/vapi_tool_results_model.py).
+"""
+
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("VAPI_IDEMPOTENCY_TTL_SECONDS", "600"))
+IDEMPOTENCY_BACKEND = os.getenv("IDEMPOTENCY_BACKEND", "memory")
+# How long a duplicate waits on another worker before answering "still working"
+SHARED_WAIT_SECONDS = 10.0
+SHARED_POLL_SECONDS = 0.2
+
+
+class SupabaseIdempotencyBackend:
+    """Claims and results shared by all workers through Postgres"""
+
+    table = "vapi_tool_results"
+
+    def _claim(self, key: str, ttl: float) -> bool:
+        from database.supabaseClient import supabase
+
+        now = datetime.now(timezone.utc)
+        # Clear out an expired claim for this key so it can be taken again
+        supabase.table(self.table).delete().eq("tool_call_id", key).lt("expires_at", now.isoformat()).execute()
+        try:
+            supabase.table(self.table).insert({
+                "tool_call_id": key,
+                "status": "pending",
+                "expires_at": (now + timedelta(seconds=ttl)).isoformat(),
+            }).execute()
+            return True
+        except Exception as e:
+            # 23505 = unique_violation: someone else already owns this tool call
+            if "23505" in str(e) or "duplicate" in str(e).lower():
+                return False
+            raise
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        from database.supabaseClient import supabase
+
+        result = supabase.table(self.table).select("status,result").eq("tool_call_id", key).execute()
+        return result.data[0] if result.data else None
+
+    def _complete(self, key: str, value: Dict[str, Any]) -> None:
+        from database.supabaseClient import supabase
+
+        supabase.table(self.table).update({"status": "done", "result": value}).eq("tool_call_id", key).execute()
+
+    def _release(self, key: str) -> None:
+        from database.supabaseClient import supabase
+
+        supabase.table(self.table).delete().eq("tool_call_id", key).eq("status", "pending").execute()
+
+    async def claim(self, key: str, ttl: float) -> bool:
+        return await asyncio.to_thread(self._claim, key, ttl)
+
+    async def complete(self, key: str, value: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._complete, key, value)
+
+    async def release(self, key: str) -> None:
+        await asyncio.to_thread(self._release, key)
+
+    async def wait_for_result(self, key: str, timeout: float) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        ("done", result) once the owner finishes, ("released", None) if it gave up
+        on the call, or ("pending", None) if it is still running after `timeout`.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            row = await asyncio.to_thread(self._get, key)
+            if row is None:
+                return "released", None
+            if row["status"] == "done":
+                return "done", row["result"]
+            await asyncio.sleep(SHARED_POLL_SECONDS)
+        return "pending", None
+
+
+class IdempotencyStore:
+    def __init__(self, ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS, shared_backend: Optional[SupabaseIdempotencyBackend] = None):
+        self.ttl_seconds = ttl_seconds
+        self.shared_backend = shared_backend
+        self._results: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._results.pop(key, None)
+            return None
+        return value
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        # Cheap sweep so the dict doesn't grow for the life of the process
+        for stale in [k for k, (exp, _) in self._results.items() if exp < now]:
+            self._results.pop(stale, None)
+        self._results[key] = (now + self.ttl_seconds, value)
+
+    async def _run_owned(self, key: str, fn: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        try:
+            value = await fn()
+        except BaseException:
+            if self.shared_backend is not None:
+                await self.shared_backend.release(key)
+            raise
+        if self.shared_backend is not None:
+            await self.shared_backend.complete(key, value)
+        return value
+
+    async def run(
+        self,
+        key: Optional[str],
+        fn: Callable[[], Awaitable[Dict[str, Any]]],
+        pending: Optional[Dict[str, Any]] = None,
+        wait_seconds: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run `fn` once per key; replays and concurrent duplicates share its result.
+
+        `pending` is returned (and not cached) when another worker still owns the
+        key after min(SHARED_WAIT_SECONDS, wait_seconds), so the tool call never
+        runs twice and the caller's deadline is kept.
+        """
+        if not key:
+            return await fn()
+
+        cached = self._cached(key)
+        if cached is not None:
+            logger.info(f"Replayed tool call {key} served from idempotency cache")
+            return cached
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            logger.info(f"Duplicate tool call {key} waiting on in-flight execution")
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            if self.shared_backend is not None and not await self.shared_backend.claim(key, self.ttl_seconds):
+                logger.info(f"Tool call {key} owned by another worker, waiting for its result")
+                wait = SHARED_WAIT_SECONDS if wait_seconds is None else max(min(SHARED_WAIT_SECONDS, wait_seconds), 0.0)
+                state, value = await self.shared_backend.wait_for_result(key, wait)
+                # The owner failed and dropped its claim: take it over, unless a third worker beat us to it
+                if state == "released" and await self.shared_backend.claim(key, self.ttl_seconds):
+                    state, value = "done", await self._run_owned(key, fn)
+                if state != "done":
+                    logger.warning(f"Tool call {key} still running on another worker, acknowledging without running it")
+                    value = pending if pending is not None else {"result": "Still working on that, one moment."}
+                    future.set_result(value)
+                    return value
+            else:
+                value = await self._run_owned(key, fn)
+
+            self._remember(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+                # Mark retrieved so a failure nobody waited on doesn't warn at GC
+                future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    shared = SupabaseIdempotencyBackend() if IDEMPOTENCY_BACKEND == "supabase" else None
+    return IdempotencyStore(shared_backend=shared)
@@ -0,0 +1,66 @@
+"""
+Placing outbound calls.
+
+Shared by the agent's CallingTool and the call scheduler: start the call
+through the async VAPI client and register it in the call log.
+"""
+
+import logging
+from typing import Awaitable, Callable, Dict, Any, Optional
+
+import httpx
+
+from service import vapi_client
+from service.call_log_service import CallLogService
+
+logger = logging.getLogger(__name__)
+
+
+class OutboundCallService:
+    @staticmethod
+    async def place_call(phone_number: str, user_id: str,
+                         on_created: Optional[Callable[[str], Awaitable[Any]]] = None) -> Dict[str, Any]:
+        """
+        Call a user and log the call; data is VAPI's call object.
+        `on_created(call_id)` runs as soon as VAPI has accepted the call.
+        """
+        try:
+            call = await vapi_client.create_call(phone_number)
+        except vapi_client.VapiError as e:
+            logger.error(f"VAPI rejected call to {phone_number}: {e.detail}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Failed to create call: {e.detail}"
+            }
+        except httpx.HTTPError as e:
+            logger.error(f"Could not reach VAPI to call {phone_number}: {e!r}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Failed to create call: {str(e) or type(e).__name__}"
+            }
+
+        call_id = call.get("id")
+        if call_id and on_created is not None:
+            try:
+                await on_created(str(call_id))
+            except Exception as e:
+                logger.error(f"Could not record call {call_id} to {phone_number}: {str(e)}")
+        if call_id:
+            # Register the call for this user so transcript tools can find it later
+            log_result = await CallLogService.record_call(
+                call_id=str(call_id),
+                user_id=user_id,
+                phone_number=phone_number,
+                status=str(call.get("status") or "queued"),
+            )
+            print(f"Call ID {call_id} logged for user {user_id}: {log_result['message']}")
+        else:
+            logger.warning("Call object does not have an 'id' attribute.")
+
+        return {
+            "success": True,
+            "data": call,
+            "message": f"Call created: {call_id}"
+        }
@@ -0,0 +1,110 @@
+"""
+Batch goal-plan generation for onboarding cohorts.
+
+Takes many plan requests at once and streams one NDJSON line per user as
+their plan is ready, followed by a summary line:
+
+- requests with the same normalized profile + goal (see plan_cache_key) are
+  generated once and the plan is sent to every user in the group
+- at most `concurrency` generations run at a time (PLAN_BATCH_CONCURRENCY
+  by default, capped at PLAN_BATCH_MAX_CONCURRENCY)
+- a failed generation is retried with exponential backoff up to
+  PLAN_BATCH_ATTEMPTS times; items that still fail are reported with their
+  error instead of failing the whole batch
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from service.goals_service import get_or_generate_plan
+from service.plan_cache import plan_cache_key
+
+logger = logging.getLogger(__name__)
+
+PLAN_BATCH_CONCURRENCY = int(os.getenv("PLAN_BATCH_CONCURRENCY", "4"))
+PLAN_BATCH_MAX_CONCURRENCY = int(os.getenv("PLAN_BATCH_MAX_CONCURRENCY", "16"))
+PLAN_BATCH_ATTEMPTS = int(os.getenv("PLAN_BATCH_ATTEMPTS", "3"))
+PLAN_BATCH_MAX_ITEMS = int(os.getenv("PLAN_BATCH_MAX_ITEMS", "500"))
+RETRY_BASE_SECONDS = 2.0
+
+
+def _line(data: Dict[str, Any]) -> str:
+    return json.dumps(data, default=str) + "\n"
+
+
+async def _generate_group(key: str, items: List[Dict[str, Any]], semaphore: asyncio.Semaphore, attempts: int) -> Dict[str, Any]:
+    first = items[0]
+    force = any(item["force_regenerate"] for item in items)
+    error: Optional[str] = None
+    for attempt in range(1, attempts + 1):
+        try:
+            async with semaphore:
+                plan, cached = await get_or_generate_plan(
+                    user_id=first["user_id"],
+                    profile=first["profile"],
+                    goal=first["goal"],
+                    force_regenerate=force and attempt == 1,
+                )
+            return {"key": key, "items": items, "plan": plan, "cached": cached, "attempts": attempt, "error": None}
+        except Exception as e:
+            error = str(e)
+            if attempt < attempts:
+                delay = RETRY_BASE_SECONDS * (2 ** (attempt - 1)) * (1 + random.random())
+                logger.warning(f"Batch plan {key[:12]} failed ({error}), retry {attempt}/{attempts - 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    return {"key": key, "items": items, "plan": None, "cached": False, "attempts": attempts, "error": error}
+
+
+async def generate_plan_batch(items: List[Dict[str, Any]], concurrency: Optional[int] = None,
+                              attempts: int = PLAN_BATCH_ATTEMPTS) -> AsyncGenerator[str, None]:
+    """
+    Stream NDJSON results for `items` (dicts with index, user_id, profile, goal,
+    force_regenerate) in the order their plans finish.
+    """
+    started = time.monotonic()
+    concurrency = max(1, min(concurrency or PLAN_BATCH_CONCURRENCY, PLAN_BATCH_MAX_CONCURRENCY))
+
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items:
+        groups.setdefault(plan_cache_key(item["profile"], item["goal"]), []).append(item)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [asyncio.create_task(_generate_group(key, group, semaphore, attempts)) for key, group in groups.items()]
+    counts = {"succeeded": 0, "failed": 0, "retried": 0}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            outcome = await next_done
+            if outcome["attempts"] > 1:
+                counts["retried"] += len(outcome["items"])
+            status = "failed" if outcome["error"] else "succeeded"
+            for item in outcome["items"]:
+                counts[status] += 1
+                yield _line({
+                    "type": "result",
+                    "index": item["index"],
+                    "user_id": item["user_id"],
+                    "status": status,
+                    "plan": outcome["plan"],
+                    "cached": outcome["cached"],
+                    "shared": len(outcome["items"]) > 1,
+                    "attempts": outcome["attempts"],
+                    "error": outcome["error"],
+                })
+    finally:
+        # Client went away: don't keep generating plans nobody reads
+        for task in tasks:
+            task.cancel()
+
+    yield _line({
+        "type": "summary",
+        "total": len(items),
+        "unique_inputs": len(groups),
+        **counts,
+        "concurrency": concurrency,
+        "duration_seconds": round(time.monotonic() - started, 3),
+    })
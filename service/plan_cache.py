@@ -0,0 +1,113 @@
+"""
+Cache for generated goal plans.
+
+Onboarding resubmits the same profile and goal again and again, and every
+submission used to cost a full agent turn. Plans are cached under a hash of
+the normalized profile + goal (case, whitespace, list order and empty vs
+missing fields don't matter), so identical inputs get the same plan back,
+also across users.
+
+Bounded by PLAN_CACHE_MAX_ENTRIES (least recently used entries are evicted)
+and PLAN_CACHE_TTL_SECONDS. Concurrent requests for the same key share one
+generation. Hit/miss counters are served at GET /generate-goal-plan/cache-stats.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+PLAN_CACHE_MAX_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "1000"))
+PLAN_CACHE_TTL_SECONDS = float(os.getenv("PLAN_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.lower().split()) or None
+    if isinstance(value, dict):
+        normalized = {key: _normalize(item) for key, item in value.items()}
+        return {key: item for key, item in normalized.items() if item not in (None, [], {})}
+    if isinstance(value, (list, tuple, set)):
+        items = {json.dumps(_normalize(item), sort_keys=True) for item in value}
+        items.discard("null")
+        return sorted(items)
+    return value
+
+
+def plan_cache_key(profile: Dict[str, Any], goal: Dict[str, Any]) -> str:
+    """Stable hash of the inputs that shape a plan"""
+    goal = dict(goal)
+    if goal.get("duration_type"):
+        # "week" and "weeks" ask for the same plan
+        goal["duration_type"] = goal["duration_type"].strip().lower().rstrip("s") + "s"
+    canonical = json.dumps({"profile": _normalize(profile), "goal": _normalize(goal)}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class PlanCache:
+    def __init__(self, max_entries: int = PLAN_CACHE_MAX_ENTRIES, ttl_seconds: float = PLAN_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "forced": 0, "shared": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            self.stats["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, plan: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, plan)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def get_or_generate(self, key: str, generate: Callable[[], Awaitable[Any]], force: bool = False) -> Tuple[Any, bool]:
+        """Return (plan, served_from_cache); `force` skips the lookup and replaces the entry"""
+        if force:
+            self.stats["forced"] += 1
+        else:
+            plan = self.get(key)
+            if plan is not None:
+                self.stats["hits"] += 1
+                return plan, True
+            pending = self._in_flight.get(key)
+            if pending is not None:
+                self.stats["shared"] += 1
+                return await asyncio.shield(pending), True
+            self.stats["misses"] += 1
+
+        task = asyncio.ensure_future(generate())
+        self._in_flight[key] = task
+        try:
+            plan = await task
+        finally:
+            if self._in_flight.get(key) is task:
+                self._in_flight.pop(key, None)
+        if plan:
+            self.put(key, plan)
+        return plan, False
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["shared"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round((self.stats["hits"] + self.stats["shared"]) / lookups, 4) if lookups else None,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+plan_cache = PlanCache()
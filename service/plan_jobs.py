@@ -0,0 +1,242 @@
+"""
+Background jobs for goal-plan generation.
+
+A plan takes a full Gemini turn, and holding the HTTP request open for it
+tied up connections and ran into client and proxy timeouts. Submitting a plan
+job returns a job id straight away; a bounded pool of asyncio workers
+(PLAN_JOB_WORKERS) generates the plans and clients poll for the result.
+
+- the queue is bounded (PLAN_JOB_MAX_QUEUE); a full queue rejects new jobs
+  instead of growing without limit
+- finished jobs are kept for PLAN_JOB_RETENTION_SECONDS, then dropped
+- queue depth, wait time and run time are exposed via `metrics()`
+
+Jobs are tracked in memory by the worker process that runs them. With several
+uvicorn workers set PLAN_JOB_BACKEND=supabase so job status is also written to
+the shared `plan_jobs` table (database/models/plan_jobs_model.py) and a poll
+that lands on another worker still finds it.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PLAN_JOB_WORKERS = int(os.getenv("PLAN_JOB_WORKERS", "4"))
+PLAN_JOB_MAX_QUEUE = int(os.getenv("PLAN_JOB_MAX_QUEUE", "100"))
+PLAN_JOB_RETENTION_SECONDS = float(os.getenv("PLAN_JOB_RETENTION_SECONDS", "3600"))
+PLAN_JOB_BACKEND = os.getenv("PLAN_JOB_BACKEND", "memory")
+DURATION_SAMPLES = 500
+
+FINISHED_STATUSES = {"succeeded", "failed"}
+
+
+class PlanQueueFull(Exception):
+    """More plan jobs are waiting than PLAN_JOB_MAX_QUEUE allows"""
+
+
+class SupabasePlanJobBackend:
+    """Mirror of job status in Postgres so every worker can answer polls"""
+
+    table = "plan_jobs"
+
+    def save(self, job: Dict[str, Any], retention_seconds: float) -> None:
+        from database.supabaseClient import supabase
+
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=retention_seconds)
+        supabase.table(self.table).upsert({**job, "expires_at": expires_at.isoformat()}, on_conflict="id").execute()
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        from database.supabaseClient import supabase
+
+        now = datetime.now(timezone.utc).isoformat()
+        result = supabase.table(self.table).select("*").eq("id", job_id).gt("expires_at", now).execute()
+        if not result.data:
+            return None
+        job = dict(result.data[0])
+        job.pop("expires_at", None)
+        return job
+
+    def purge(self) -> None:
+        from database.supabaseClient import supabase
+
+        supabase.table(self.table).delete().lt("expires_at", datetime.now(timezone.utc).isoformat()).execute()
+
+
+class _Job:
+    def __init__(self, job_id: str, user_id: str, run: Callable[[], Awaitable[Any]]):
+        self.id = job_id
+        self.user_id = user_id
+        self.run = run
+        self.status = "queued"
+        self.result: Any = None
+        self.cached = False
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.expires_at: Optional[float] = None
+        self.done = asyncio.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "status": self.status,
+            "result": self.result,
+            "cached": self.cached,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class PlanJobQueue:
+    def __init__(self, workers: int = PLAN_JOB_WORKERS, max_queue: int = PLAN_JOB_MAX_QUEUE,
+                 retention_seconds: float = PLAN_JOB_RETENTION_SECONDS, shared_backend: Optional[SupabasePlanJobBackend] = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retention_seconds = retention_seconds
+        self.shared = shared_backend
+        self._jobs: Dict[str, _Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self.counters = {"submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0}
+        self._waits: Deque[float] = deque(maxlen=DURATION_SAMPLES)
+        self._runs: Deque[float] = deque(maxlen=DURATION_SAMPLES)
+        self._last_purge = time.monotonic()
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._workers)
+
+    def start(self) -> None:
+        """Start the worker pool on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, user_id: str, run: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        """
+        Queue `run` (returns (plan, cached)) and return the job record.
+
+        Raises:
+            PlanQueueFull: If the queue is at PLAN_JOB_MAX_QUEUE.
+        """
+        self.start()
+        self._sweep()
+        job = _Job(str(uuid.uuid4()), user_id, run)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            raise PlanQueueFull(f"Plan queue is full ({self.max_queue} jobs waiting)")
+        self._jobs[job.id] = job
+        self.counters["submitted"] += 1
+        await self._share(job)
+        return job.to_dict()
+
+    async def get(self, job_id: str, wait_seconds: float = 0) -> Optional[Dict[str, Any]]:
+        """Job status (and result once finished); optionally wait up to `wait_seconds` for it to finish"""
+        self._sweep()
+        job = self._jobs.get(job_id)
+        if job is None:
+            if self.shared is None:
+                return None
+            return await asyncio.to_thread(self.shared.load, job_id)
+
+        if wait_seconds > 0 and job.status not in FINISHED_STATUSES:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=wait_seconds)
+            except asyncio.TimeoutError:
+                pass
+        return job.to_dict()
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = datetime.now(timezone.utc)
+            self._waits.append((job.started_at - job.created_at).total_seconds())
+            await self._share(job)
+
+            started = time.monotonic()
+            try:
+                job.result, job.cached = await job.run()
+                job.status = "succeeded"
+            except Exception as e:
+                logger.error(f"Plan job {job.id} failed: {str(e)}")
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                self._runs.append(time.monotonic() - started)
+                job.finished_at = datetime.now(timezone.utc)
+                job.expires_at = time.monotonic() + self.retention_seconds
+                self.counters[job.status] = self.counters.get(job.status, 0) + 1
+                job.done.set()
+                self._queue.task_done()
+            await self._share(job)
+            await self._purge_shared()
+
+    async def _share(self, job: _Job) -> None:
+        if self.shared is None:
+            return
+        try:
+            await asyncio.to_thread(self.shared.save, job.to_dict(), self.retention_seconds)
+        except Exception as e:
+            logger.warning(f"Could not write plan job {job.id} to the shared store: {str(e)}")
+
+    async def _purge_shared(self) -> None:
+        # Expired rows are already invisible to load(); delete them now and then
+        if self.shared is None or time.monotonic() - self._last_purge < self.retention_seconds:
+            return
+        self._last_purge = time.monotonic()
+        try:
+            await asyncio.to_thread(self.shared.purge)
+        except Exception as e:
+            logger.warning(f"Could not purge expired plan jobs: {str(e)}")
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        expired = [job_id for job_id, job in self._jobs.items() if job.expires_at is not None and job.expires_at < now]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def metrics(self) -> Dict[str, Any]:
+        def summary(samples: Deque[float]) -> Dict[str, Optional[float]]:
+            ordered = sorted(samples)
+            if not ordered:
+                return {"avg": None, "p95": None, "max": None}
+            return {
+                "avg": round(sum(ordered) / len(ordered), 3),
+                "p95": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+                "max": round(ordered[-1], 3),
+            }
+
+        return {
+            **self.counters,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "running": sum(1 for job in self._jobs.values() if job.status == "running"),
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "retained_jobs": len(self._jobs),
+            "wait_seconds": summary(self._waits),
+            "run_seconds": summary(self._runs),
+        }
+
+
+plan_job_queue = PlanJobQueue(shared_backend=SupabasePlanJobBackend() if PLAN_JOB_BACKEND == "supabase" else None)
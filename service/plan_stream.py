@@ -0,0 +1,181 @@
+"""
+Stream a goal plan section by section over SSE.
+
+The plan stream agent writes one JSON object per line (overview, then each
+habit, milestone and tip). As model output arrives we cut it into lines,
+validate each one against the GoalPlan models and send it as soon as it is
+valid, so the UI can render the plan while the rest is still being written.
+
+Events use the same framing as chat_service (`data: {json}\\n\\n` with a
+`type` field):
+    {"type": "plan_section", "section": "overview" | "habit" | "milestone" | "tip", "index": n, "data": {...}}
+    {"type": "done", "plan": {...}, "cached": bool}
+    {"type": "error", "error": "..."}
+
+Plans already in the plan cache are replayed as the same events; freshly
+streamed plans are added to the cache once the whole plan validates.
+"""
+
+import json
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+
+from agent import get_plan_stream_agent
+from models import GoalPlan, PlanHabit, PlanMilestone
+from service.goals_service import build_plan_prompt
+from service.plan_cache import plan_cache, plan_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+class _Overview(BaseModel):
+    title: str
+    summary: str
+    duration: str
+
+
+class _Tip(BaseModel):
+    text: str
+
+
+SECTION_MODELS = {
+    "overview": _Overview,
+    "habit": PlanHabit,
+    "milestone": PlanMilestone,
+    "tip": _Tip,
+}
+
+
+def _event(data: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(data)}\n\n"
+
+
+def parse_section(line: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """(section, validated data) for one output line, None if it isn't a valid section"""
+    line = line.strip().rstrip(",")
+    if not line.startswith("{"):
+        return None
+    try:
+        raw = json.loads(line)
+        section = raw.pop("section", None)
+        model = SECTION_MODELS.get(section)
+        if model is None:
+            return None
+        return section, model(**raw).model_dump(mode="json")
+    except (ValueError, TypeError, ValidationError) as e:
+        logger.warning(f"Skipping invalid plan line: {str(e)[:200]}")
+        return None
+
+
+class _PlanBuilder:
+    def __init__(self):
+        self.overview: Optional[Dict[str, Any]] = None
+        self.sections: Dict[str, List[Dict[str, Any]]] = {"habit": [], "milestone": [], "tip": []}
+
+    def add(self, section: str, data: Dict[str, Any]) -> int:
+        if section == "overview":
+            self.overview = data
+            return 0
+        self.sections[section].append(data)
+        return len(self.sections[section]) - 1
+
+    def build(self) -> Dict[str, Any]:
+        if self.overview is None:
+            raise ValueError("The plan has no overview")
+        plan = GoalPlan(
+            **self.overview,
+            habits=self.sections["habit"],
+            milestones=self.sections["milestone"],
+            tips=[tip["text"] for tip in self.sections["tip"]],
+        )
+        return plan.model_dump(mode="json")
+
+
+def _replay(plan: Dict[str, Any]) -> List[str]:
+    events = [_event({"type": "plan_section", "section": "overview", "index": 0, "data": {
+        "title": plan["title"], "summary": plan["summary"], "duration": plan["duration"],
+    }})]
+    for section, items in (("habit", plan.get("habits") or []), ("milestone", plan.get("milestones") or []),
+                           ("tip", [{"text": tip} for tip in plan.get("tips") or []])):
+        for index, item in enumerate(items):
+            events.append(_event({"type": "plan_section", "section": section, "index": index, "data": item}))
+    return events
+
+
+async def stream_plan_sections(user_id: str, profile: Dict[str, Any], goal: Dict[str, Any],
+                               force_regenerate: bool = False) -> AsyncGenerator[str, None]:
+    """SSE events for a plan, one per validated section"""
+    key = plan_cache_key(profile, goal)
+    cached = None if force_regenerate else plan_cache.get(key)
+    # Plans from the non-streaming agent are cached in the same shape
+    if isinstance(cached, dict) and cached.get("title"):
+        plan_cache.stats["hits"] += 1
+        for event in _replay(cached):
+            yield event
+        yield _event({"type": "done", "plan": cached, "cached": True})
+        return
+
+    max_retries = 3
+    retry_delay = 2
+    prompt = build_plan_prompt({**profile, "goal": goal})
+
+    for attempt in range(max_retries):
+        builder = _PlanBuilder()
+        sent = 0
+        buffer = ""
+
+        def section_event(line: str) -> Optional[str]:
+            # Every section that goes out is counted, so a failure after it is never retried
+            nonlocal sent
+            parsed = parse_section(line)
+            if parsed is None:
+                return None
+            index = builder.add(*parsed)
+            sent += 1
+            return _event({"type": "plan_section", "section": parsed[0], "index": index, "data": parsed[1]})
+
+        try:
+            print(f"Streaming goal plan for user {user_id} (attempt {attempt + 1})")
+            async for chunk in get_plan_stream_agent().arun(prompt, stream=True):
+                if getattr(chunk, "event", None) != "RunContent" or not isinstance(chunk.content, str):
+                    continue
+                buffer += chunk.content
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    event = section_event(line)
+                    if event is not None:
+                        yield event
+
+            # The last section may not end with a newline
+            event = section_event(buffer)
+            if event is not None:
+                yield event
+
+            plan = builder.build()
+            plan_cache.stats["misses"] += 1
+            plan_cache.put(key, plan)
+            yield _event({"type": "done", "plan": plan, "cached": False})
+            return
+
+        except Exception as e:
+            error_str = str(e)
+            logger.error(f"Error streaming goal plan (attempt {attempt + 1}): {error_str}")
+
+            # Rate limits are retried, but only before anything reached the client
+            rate_limited = "429" in error_str or "Too Many Requests" in error_str or "quota" in error_str.lower()
+            if rate_limited and sent == 0 and attempt < max_retries - 1:
+                logger.info(f"Rate limit hit, waiting {retry_delay} seconds before retry...")
+                await asyncio.sleep(retry_delay)
+                retry_delay *= 2
+                continue
+
+            error_data = {
+                "type": "error",
+                "error": "The AI service is currently experiencing high traffic. Please try again in a moment."
+                if rate_limited else f"An error occurred: {error_str}"
+            }
+            yield _event(error_data)
+            return
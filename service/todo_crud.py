@@ -1,7 +1,10 @@
+import asyncio
 from typing import Optional, Dict, Any
 from datetime import datetime
 from database.supabaseClient import supabase
 from models import TodoCreate, TodoUpdate
+from service.todo_matcher import TodoMatcher
+from service.call_warmup import CallWarmup
 
 class TodoService:
     @staticmethod
@@ -14,9 +17,12 @@ class TodoService:
                 "created_at": datetime.utcnow().isoformat(),
                 "user_id": todo_data.user_id
             }
-            result = supabase.table("todos").insert(todo_dict).execute()
+            query = supabase.table("todos").insert(todo_dict)
+            result = await asyncio.to_thread(query.execute)
             
             if result.data:
+                TodoMatcher.remember(result.data[0])
+                CallWarmup.remember(result.data[0])
                 return {
                     "success": True,
                     "data": result.data[0],
@@ -44,7 +50,7 @@ class TodoService:
             if user_id:
                 query = query.eq("user_id", user_id)
             
-            result = query.execute()
+            result = await asyncio.to_thread(query.execute)
             
             return {
                 "success": True,
@@ -62,7 +68,8 @@ class TodoService:
     async def get_todo_by_id(todo_id: str) -> Dict[str, Any]:
         """Get a specific todo by ID"""
         try:
-            result = supabase.table("todos").select("*").eq("id", todo_id).execute()
+            query = supabase.table("todos").select("*").eq("id", todo_id)
+            result = await asyncio.to_thread(query.execute)
             
             if result.data:
                 return {
@@ -100,9 +107,12 @@ class TodoService:
                     "message": "No fields to update"
                 }
             
-            result = supabase.table("todos").update(update_dict).eq("id", todo_id).execute()
+            query = supabase.table("todos").update(update_dict).eq("id", todo_id)
+            result = await asyncio.to_thread(query.execute)
             
             if result.data:
+                TodoMatcher.remember(result.data[0])
+                CallWarmup.remember(result.data[0])
                 return {
                     "success": True,
                     "data": result.data[0],
@@ -125,7 +135,10 @@ class TodoService:
     async def delete_todo(todo_id: str) -> Dict[str, Any]:
         """Delete a todo"""
         try:
-            result = supabase.table("todos").delete().eq("id", todo_id).execute()
+            query = supabase.table("todos").delete().eq("id", todo_id)
+            result = await asyncio.to_thread(query.execute)
+            TodoMatcher.discard(todo_id)
+            CallWarmup.discard(todo_id)
             
             return {
                 "success": True,
@@ -151,11 +164,14 @@ class TodoService:
             # Toggle the completed status
             new_completed = not current_todo["data"]["completed"]
             
-            result = supabase.table("todos").update({
+            query = supabase.table("todos").update({
                 "completed": new_completed
-            }).eq("id", todo_id).execute()
+            }).eq("id", todo_id)
+            result = await asyncio.to_thread(query.execute)
             
             if result.data:
+                TodoMatcher.remember(result.data[0])
+                CallWarmup.remember(result.data[0])
                 return {
                     "success": True,
                     "data": result.data[0],
@@ -183,7 +199,9 @@ class TodoService:
             if user_id:
                 query = query.eq("user_id", user_id)
             
-            result = query.execute()
+            result = await asyncio.to_thread(query.execute)
+            TodoMatcher.invalidate(user_id)
+            CallWarmup.invalidate(user_id)
             
             return {
                 "success": True,
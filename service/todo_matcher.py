@@ -0,0 +1,195 @@
+"""
+Fuzzy matching of spoken todo references.
+
+Callers rarely repeat a todo word for word ("the milk one", "call mom thing"),
+so instead of pulling the whole list and doing a substring scan we rank the
+user's todos by trigram similarity and hand back the best candidate with a
+confidence score.
+
+The ranking runs in Postgres through the `match_todos` function (pg_trgm, see
+database/models/todo_model.py) so the list never leaves the database. If that
+function isn't installed we fall back to a per-user in-memory trigram index
+that TodoService keeps in sync on every write. A failed RPC call (missing
+function or a network blip) only switches to the fallback for
+TODO_MATCH_RPC_RETRY_SECONDS; after that the RPC is tried again.
+
+When the two best candidates score within TODO_MATCH_AMBIGUITY_MARGIN of each
+other the match is flagged `ambiguous`, so destructive callers can ask which
+one was meant instead of picking one.
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List
+
+from database.supabaseClient import supabase
+
+logger = logging.getLogger(__name__)
+
+# Minimum score a candidate needs before we act on it
+MATCH_THRESHOLD = float(os.getenv("TODO_MATCH_THRESHOLD", "0.3"))
+# How long a per-user fallback index is trusted before it is rebuilt
+INDEX_TTL_SECONDS = float(os.getenv("TODO_MATCH_INDEX_TTL", "300"))
+# How long the in-memory matcher is used after a failed match_todos call
+RPC_RETRY_SECONDS = float(os.getenv("TODO_MATCH_RPC_RETRY_SECONDS", "60"))
+# Top two scores closer than this need the user to confirm which todo they meant
+AMBIGUITY_MARGIN = float(os.getenv("TODO_MATCH_AMBIGUITY_MARGIN", "0.1"))
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def _trigrams(words: List[str]) -> set:
+    """Trigram set the way pg_trgm builds it (each word padded '  w ')"""
+    grams = set()
+    for word in words:
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def similarity_score(query: str, text: str) -> float:
+    """
+    Mirror of GREATEST(similarity(q, t), word_similarity(q, t)) from pg_trgm.
+
+    word_similarity is approximated by the best match of the query against any
+    contiguous run of words in the todo, which is what makes "milk" score high
+    against "buy milk from the store".
+    """
+    query_grams = _trigrams(_words(query))
+    text_words = _words(text)
+    if not query_grams or not text_words:
+        return 0.0
+
+    best = _jaccard(query_grams, _trigrams(text_words))
+    for start in range(len(text_words)):
+        for end in range(start + 1, len(text_words) + 1):
+            best = max(best, _jaccard(query_grams, _trigrams(text_words[start:end])))
+    return round(best, 4)
+
+
+class _UserIndex:
+    """In-memory todos of one user, used only when the SQL matcher is missing"""
+
+    def __init__(self, todos: List[Dict[str, Any]]):
+        self.todos = {todo["id"]: todo for todo in todos}
+        self.built_at = time.monotonic()
+
+    def expired(self) -> bool:
+        return time.monotonic() - self.built_at > INDEX_TTL_SECONDS
+
+
+class TodoMatcher:
+    # monotonic time before which the match_todos RPC isn't tried (0 = try it)
+    _rpc_retry_at: float = 0.0
+    _indexes: Dict[str, _UserIndex] = {}
+
+    @staticmethod
+    async def find_matches(user_id: str, spoken_text: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """Return up to `limit` todos ranked by score, best first"""
+        if time.monotonic() >= TodoMatcher._rpc_retry_at:
+            try:
+                rpc = supabase.rpc("match_todos", {
+                    "p_user_id": user_id,
+                    "p_query": spoken_text,
+                    "p_limit": limit,
+                    "p_min_score": MATCH_THRESHOLD,
+                })
+                result = await asyncio.to_thread(rpc.execute)
+                TodoMatcher._rpc_retry_at = 0.0
+                return result.data or []
+            except Exception as e:
+                logger.warning(f"match_todos RPC failed, using in-memory matcher for {RPC_RETRY_SECONDS:.0f}s: {str(e)}")
+                TodoMatcher._rpc_retry_at = time.monotonic() + RPC_RETRY_SECONDS
+
+        index = TodoMatcher._indexes.get(user_id)
+        if index is None or index.expired():
+            query = supabase.table("todos").select("id,text,completed,created_at").eq("user_id", user_id)
+            result = await asyncio.to_thread(query.execute)
+            index = _UserIndex(result.data or [])
+            TodoMatcher._indexes[user_id] = index
+
+        ranked = []
+        for todo in index.todos.values():
+            score = similarity_score(spoken_text, todo["text"])
+            if score >= MATCH_THRESHOLD:
+                ranked.append({**todo, "score": score})
+        ranked.sort(key=lambda t: (t["score"], t.get("created_at") or ""), reverse=True)
+        return ranked[:limit]
+
+    @staticmethod
+    async def best_match(user_id: str, spoken_text: str) -> Dict[str, Any]:
+        """Find the todo the user most likely meant"""
+        try:
+            candidates = await TodoMatcher.find_matches(user_id, spoken_text)
+            if not candidates:
+                return {
+                    "success": False,
+                    "data": None,
+                    "message": f"Could not find a todo matching '{spoken_text}'"
+                }
+
+            # Saying a todo's exact text settles it, even next to "buy milk and eggs"
+            spoken = " ".join(_words(spoken_text))
+            exact = [c for c in candidates if " ".join(_words(c["text"])) == spoken]
+            if exact:
+                candidates = exact[:1] + [c for c in candidates if c is not exact[0]]
+
+            best = candidates[0]
+            todo = {key: value for key, value in best.items() if key != "score"}
+            ambiguous = (
+                not exact
+                and len(candidates) > 1
+                and best["score"] - candidates[1]["score"] < AMBIGUITY_MARGIN
+            )
+            return {
+                "success": True,
+                "data": {
+                    "todo": todo,
+                    "score": best["score"],
+                    "alternatives": [c["text"] for c in candidates[1:]],
+                    "ambiguous": ambiguous
+                },
+                "message": "Todo matched successfully"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Error matching todo: {str(e)}"
+            }
+
+    # ------------------------------------------------------------------
+    # Fallback index maintenance (called by TodoService after writes)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def remember(todo: Dict[str, Any]) -> None:
+        index = TodoMatcher._indexes.get(str(todo.get("user_id")))
+        if index is not None:
+            index.todos[todo["id"]] = todo
+
+    @staticmethod
+    def discard(todo_id: str) -> None:
+        for index in TodoMatcher._indexes.values():
+            index.todos.pop(todo_id, None)
+
+    @staticmethod
+    def invalidate(user_id: Optional[str] = None) -> None:
+        if user_id is None:
+            TodoMatcher._indexes.clear()
+        else:
+            TodoMatcher._indexes.pop(user_id, None)
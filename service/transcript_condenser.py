@@ -0,0 +1,146 @@
+"""
+Condensed call transcripts for the agent.
+
+A long check-in call easily runs to thousands of tokens of transcript plus
+per-message timestamps and a cost breakdown, all of which used to be pasted
+into the next Gemini turn. Here we pull out what the agent actually uses -
+what the user said, what they committed to and which todos came up - and fit
+it into a token budget (TRANSCRIPT_TOKEN_BUDGET, ~4 characters per token).
+
+Everything runs locally; no model call is involved. Results for finished
+calls are cached per call id since they can't change anymore.
+"""
+
+import os
+import re
+import json
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+
+TRANSCRIPT_TOKEN_BUDGET = int(os.getenv("TRANSCRIPT_TOKEN_BUDGET", "500"))
+CHARS_PER_TOKEN = 4
+MAX_STATEMENT_CHARS = 240
+CACHE_SIZE = 256
+
+COMMITMENT_RE = re.compile(
+    r"\b(i will|i'll|i am going to|i'm going to|i'm gonna|i plan to|i promise|i commit|"
+    r"i need to|i have to|i should|i want to|let me|remind me|by (tomorrow|tonight|monday|tuesday|"
+    r"wednesday|thursday|friday|saturday|sunday|next week|the weekend))\b",
+    re.IGNORECASE,
+)
+TODO_RE = re.compile(r"\b(todo|to-do|task|list|remind|reminder|add|remove|delete|finish|done|complete)\b", re.IGNORECASE)
+TRANSCRIPT_LINE_RE = re.compile(r"^\s*(user|customer|ai|assistant|bot)\s*:\s*(.+)$", re.IGNORECASE)
+
+_cache: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _shorten(text: str, limit: int = MAX_STATEMENT_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def _turns(call_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(role, text) pairs with role normalised to 'user' or 'assistant'"""
+    turns = []
+    for msg in call_data.get("messages") or []:
+        role = (msg.get("role") or "").lower()
+        text = msg.get("message") or msg.get("content")
+        if role in ("user", "customer") and text:
+            turns.append(("user", text))
+        elif role in ("bot", "assistant") and text:
+            turns.append(("assistant", text))
+    if turns:
+        return turns
+
+    transcript = call_data.get("transcript") or (call_data.get("artifact") or {}).get("transcript") or ""
+    for line in transcript.splitlines():
+        match = TRANSCRIPT_LINE_RE.match(line)
+        if match:
+            role = "user" if match.group(1).lower() in ("user", "customer") else "assistant"
+            turns.append((role, match.group(2)))
+    return turns
+
+
+def _tool_mentions(call_data: Dict[str, Any]) -> List[str]:
+    """Todo tool calls the voice assistant made during the call"""
+    mentions = []
+    for msg in call_data.get("messages") or []:
+        for tool_call in msg.get("toolCalls") or []:
+            function_info = tool_call.get("function") or {}
+            name = function_info.get("name")
+            if not name or "todo" not in name.lower():
+                continue
+            arguments = function_info.get("arguments") or {}
+            if isinstance(arguments, str):
+                try:
+                    arguments = json.loads(arguments)
+                except ValueError:
+                    arguments = {}
+            detail = arguments.get("todo") or arguments.get("new_text") or ""
+            mentions.append(f"{name}: {detail}".rstrip(": "))
+    return mentions
+
+
+def _fit(lines: List[str], budget_chars: int) -> Tuple[List[str], int]:
+    kept = []
+    for line in lines:
+        if len(line) + 1 > budget_chars:
+            break
+        kept.append(line)
+        budget_chars -= len(line) + 1
+    return kept, budget_chars
+
+
+def condense_call(call_data: Dict[str, Any], token_budget: Optional[int] = None) -> str:
+    """Key points of a call in at most `token_budget` tokens"""
+    token_budget = token_budget or TRANSCRIPT_TOKEN_BUDGET
+    call_id = call_data.get("id") or "unknown"
+    cache_key = (call_id, token_budget)
+    cacheable = call_data.get("status") == "ended" and call_id != "unknown"
+    if cacheable and cache_key in _cache:
+        _cache.move_to_end(cache_key)
+        return _cache[cache_key]
+
+    turns = _turns(call_data)
+    user_turns = [text for role, text in turns if role == "user"]
+    commitments = [_shorten(t) for t in user_turns if COMMITMENT_RE.search(t)]
+    todo_mentions = _tool_mentions(call_data) or [_shorten(t) for t in user_turns if TODO_RE.search(t) and _shorten(t) not in commitments]
+    statements = [_shorten(t) for t in user_turns if _shorten(t) not in commitments and _shorten(t) not in todo_mentions]
+
+    header = [f"Call {call_id} ({call_data.get('status', 'unknown')}, {len(turns)} turns)"]
+    if call_data.get("endedReason"):
+        header.append(f"Ended: {call_data['endedReason']}")
+    summary = call_data.get("summary") or (call_data.get("analysis") or {}).get("summary")
+    if summary:
+        header.append(f"Summary: {_shorten(summary, 600)}")
+
+    remaining = token_budget * CHARS_PER_TOKEN
+    out, remaining = _fit(header, remaining)
+    # Highest value first: commitments, then todos, then whatever else the user said
+    for title, items in (("Commitments", commitments), ("Todo mentions", todo_mentions), ("User said", statements)):
+        if not items or remaining <= len(title) + 2:
+            continue
+        # Leave room for the "(+N more)" marker
+        kept, left = _fit([f"- {item}" for item in items], remaining - len(title) - 2 - 16)
+        if kept:
+            out.append(f"{title}:")
+            out.extend(kept)
+            remaining = left + 16
+            if len(kept) < len(items):
+                marker = f"  (+{len(items) - len(kept)} more)"
+                out.append(marker)
+                remaining -= len(marker) + 1
+
+    if not turns and not summary:
+        out.append("No transcript available yet.")
+
+    condensed = "\n".join(out)
+    if cacheable:
+        _cache[cache_key] = condensed
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return condensed
@@ -0,0 +1,109 @@
+"""
+Wait until a call's transcript is ready.
+
+Right after a call ends VAPI still has to post-process it, so asking for the
+transcript straight away used to return "may not be available yet" and the
+agent would burn LLM turns retrying. `transcript_waiter.wait_for(call_id)`
+resolves as soon as the transcript exists:
+
+- the end-of-call-report webhook pushes the finished call in (`notify`)
+- as a fallback one poll loop per call checks our call store and then the
+  VAPI call endpoint with exponential backoff
+- every waiter has its own deadline; all waiters of a call share the poll loop
+"""
+
+import time
+import asyncio
+import logging
+from typing import Optional, Dict, Any
+
+import httpx
+
+from service import vapi_client
+from service.call_store import CallStore
+
+logger = logging.getLogger(__name__)
+
+INITIAL_POLL_SECONDS = 1.0
+MAX_POLL_SECONDS = 15.0
+DEFAULT_TIMEOUT_SECONDS = 90.0
+
+
+def is_transcript_ready(call_data: Optional[Dict[str, Any]]) -> bool:
+    if not call_data or call_data.get("status") not in vapi_client.TERMINAL_STATUSES:
+        return False
+    artifact = call_data.get("artifact") or {}
+    return bool(call_data.get("transcript") or call_data.get("messages") or artifact.get("transcript"))
+
+
+class TranscriptWaiter:
+    def __init__(self):
+        self._ready: Dict[str, asyncio.Future] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+        # Latest deadline of anyone still waiting on a call; the poller stops after it
+        self._deadlines: Dict[str, float] = {}
+
+    def notify(self, call_id: str, call_data: Dict[str, Any]) -> None:
+        """Push a finished call in (called by the end-of-call-report webhook)"""
+        future = self._ready.get(call_id)
+        if future is not None and not future.done() and is_transcript_ready(call_data):
+            future.set_result(call_data)
+
+    async def wait_for(self, call_id: str, timeout: float = DEFAULT_TIMEOUT_SECONDS) -> Dict[str, Any]:
+        """
+        Return the call once its transcript is ready.
+
+        Raises:
+            asyncio.TimeoutError: If it isn't ready within `timeout` seconds.
+        """
+        future = self._ready.get(call_id)
+        if future is None or future.done():
+            future = asyncio.get_running_loop().create_future()
+            self._ready[call_id] = future
+
+        deadline = time.monotonic() + timeout
+        self._deadlines[call_id] = max(self._deadlines.get(call_id, 0.0), deadline)
+
+        poller = self._pollers.get(call_id)
+        if poller is None or poller.done():
+            self._pollers[call_id] = asyncio.create_task(self._poll(call_id, future))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        finally:
+            if future.done() or time.monotonic() >= self._deadlines.get(call_id, 0.0):
+                self._cleanup(call_id, future)
+
+    def _cleanup(self, call_id: str, future: asyncio.Future) -> None:
+        if self._ready.get(call_id) is future:
+            self._ready.pop(call_id, None)
+            self._deadlines.pop(call_id, None)
+            poller = self._pollers.pop(call_id, None)
+            if poller is not None and not poller.done():
+                poller.cancel()
+
+    async def _check_once(self, call_id: str) -> Optional[Dict[str, Any]]:
+        # Another worker may already have received the end-of-call report
+        stored = await CallStore.get_call(call_id)
+        if stored["success"] and is_transcript_ready(stored["data"]):
+            return stored["data"]
+        try:
+            return await vapi_client.get_call(call_id, use_cache=False)
+        except (vapi_client.VapiError, httpx.HTTPError) as e:
+            logger.warning(f"Polling call {call_id} failed: {str(e) or type(e).__name__}")
+            return None
+
+    async def _poll(self, call_id: str, future: asyncio.Future) -> None:
+        delay = INITIAL_POLL_SECONDS
+        while not future.done() and time.monotonic() < self._deadlines.get(call_id, 0.0):
+            call_data = await self._check_once(call_id)
+            if is_transcript_ready(call_data):
+                if not future.done():
+                    future.set_result(call_data)
+                return
+            remaining = self._deadlines.get(call_id, 0.0) - time.monotonic()
+            await asyncio.sleep(max(0.0, min(delay, remaining)))
+            delay = min(delay * 2, MAX_POLL_SECONDS)
+
+
+transcript_waiter = TranscriptWaiter()
@@ -0,0 +1,248 @@
+"""
+Async client for the VAPI REST API.
+
+One pooled httpx.AsyncClient per event loop (normally just the app loop, but
+scripts driving this with asyncio.run get their own), with explicit timeouts so a slow VAPI can't
+hang an agent run. Both the CallingTool and scheduled calls place calls
+through `create_call`, which retries transient failures.
+
+Call records are cached:
+- calls in a terminal status never change again, so they are kept in a
+  bounded on-disk SQLite cache (least recently used entries are evicted),
+  read and written from a worker thread so disk I/O never blocks the loop;
+  its directory is only created on first use
+- calls still in progress are kept in memory for a few seconds only
+- concurrent fetches of the same call share one request
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import sqlite3
+import logging
+import threading
+import weakref
+from typing import Optional, Dict, Any, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+VAPI_BASE_URL = os.getenv("VAPI_BASE_URL", "https://api.vapi.ai")
+VAPI_TIMEOUT = httpx.Timeout(float(os.getenv("VAPI_HTTP_TIMEOUT_SECONDS", "10")), connect=5.0)
+VAPI_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+
+CALL_CACHE_PATH = os.getenv("VAPI_CALL_CACHE_PATH", os.path.join(".cache", "vapi_calls.sqlite3"))
+CALL_CACHE_MAX_ENTRIES = int(os.getenv("VAPI_CALL_CACHE_MAX_ENTRIES", "5000"))
+LIVE_CALL_TTL_SECONDS = float(os.getenv("VAPI_LIVE_CALL_TTL_SECONDS", "5"))
+
+# Statuses after which VAPI never changes the call again
+TERMINAL_STATUSES = {"ended"}
+
+CREATE_CALL_ATTEMPTS = int(os.getenv("VAPI_CREATE_CALL_ATTEMPTS", "3"))
+RETRY_BASE_SECONDS = 0.5
+# Only retried when VAPI certainly didn't start a call, so we never dial twice.
+# 502/504 come from a gateway and the call may already be ringing behind it.
+RETRYABLE_STATUS_CODES = {429, 503}
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class VapiError(Exception):
+    """VAPI answered with a non-2xx status"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Pooled client bound to the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=VAPI_BASE_URL,
+            headers={"Authorization": f"Bearer {os.getenv('VAPI_API_KEY')}"},
+            timeout=VAPI_TIMEOUT,
+            limits=VAPI_LIMITS,
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class _DiskCallCache:
+    """Bounded SQLite cache for calls that reached a terminal status"""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        if not self._ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS calls ("
+                " call_id TEXT PRIMARY KEY, body TEXT NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS calls_last_access_idx ON calls (last_access)")
+            self._ready = True
+        return conn
+
+    def get(self, call_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT body FROM calls WHERE call_id = ?", (call_id,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE calls SET last_access = ? WHERE call_id = ?", (time.time(), call_id))
+                conn.commit()
+                return json.loads(row[0])
+            finally:
+                conn.close()
+
+    def put(self, call_id: str, call: Dict[str, Any]) -> None:
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO calls (call_id, body, last_access) VALUES (?, ?, ?)",
+                    (call_id, json.dumps(call), time.time()),
+                )
+                # Evict least recently used entries beyond the bound
+                conn.execute(
+                    "DELETE FROM calls WHERE call_id IN ("
+                    " SELECT call_id FROM calls ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+
+class CallCache:
+    def __init__(self, path: str = CALL_CACHE_PATH, max_entries: int = CALL_CACHE_MAX_ENTRIES):
+        self._disk = _DiskCallCache(path, max_entries)
+        self._live: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    async def get(self, call_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._live.get(call_id)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                return entry[1]
+            self._live.pop(call_id, None)
+        try:
+            return await asyncio.to_thread(self._disk.get, call_id)
+        except sqlite3.Error as e:
+            logger.warning(f"VAPI call cache read failed: {str(e)}")
+            return None
+
+    async def put(self, call: Dict[str, Any]) -> None:
+        call_id = call.get("id")
+        if not call_id:
+            return
+        if call.get("status") in TERMINAL_STATUSES:
+            self._live.pop(call_id, None)
+            try:
+                await asyncio.to_thread(self._disk.put, call_id, call)
+            except sqlite3.Error as e:
+                logger.warning(f"VAPI call cache write failed: {str(e)}")
+        else:
+            self._live[call_id] = (time.monotonic() + LIVE_CALL_TTL_SECONDS, call)
+
+
+call_cache = CallCache()
+_in_flight: Dict[str, asyncio.Future] = {}
+
+
+async def _request_call(call_id: str) -> Dict[str, Any]:
+    response = await get_http_client().get(f"/call/{call_id}")
+    if response.status_code != 200:
+        raise VapiError(response.status_code, response.text)
+    return response.json()
+
+
+async def get_call(call_id: str, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Fetch a call object from VAPI.
+
+    Raises:
+        VapiError: If VAPI doesn't return the call.
+        httpx.HTTPError: On timeouts and connection failures.
+    """
+    if use_cache:
+        cached = await call_cache.get(call_id)
+        if cached is not None:
+            return cached
+
+    # Several tools asking for the same call at once share one request
+    pending = _in_flight.get(call_id)
+    if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+        return await asyncio.shield(pending)
+
+    task = asyncio.ensure_future(_request_call(call_id))
+    _in_flight[call_id] = task
+    try:
+        call = await task
+    finally:
+        if _in_flight.get(call_id) is task:
+            _in_flight.pop(call_id, None)
+
+    await call_cache.put(call)
+    return call
+
+
+async def create_call(phone_number: str, assistant_id: Optional[str] = None, phone_number_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Start an outbound call and return VAPI's call object.
+
+    Rate limits (429), 503s and failures to connect are retried with
+    exponential backoff; anything that might already have started a call
+    (a read timeout, a 502/504 from a gateway) is not.
+
+    Raises:
+        VapiError: If VAPI rejects the call.
+        httpx.HTTPError: On timeouts and connection failures.
+    """
+    body = {
+        "phoneNumberId": phone_number_id or os.getenv("VAPI_PHONE_NUMBER_ID"),
+        "assistantId": assistant_id or os.getenv("VAPI_ASSISTANT_ID"),
+        "customer": {"number": phone_number},
+    }
+
+    for attempt in range(1, CREATE_CALL_ATTEMPTS + 1):
+        try:
+            response = await get_http_client().post("/call", json=body)
+            if response.status_code in (200, 201):
+                call = response.json()
+                await call_cache.put(call)
+                return call
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt == CREATE_CALL_ATTEMPTS:
+                raise VapiError(response.status_code, response.text)
+            reason = f"HTTP {response.status_code}"
+        except RETRYABLE_ERRORS as e:
+            if attempt == CREATE_CALL_ATTEMPTS:
+                raise
+            reason = type(e).__name__
+
+        delay = RETRY_BASE_SECONDS * (2 ** (attempt - 1)) * (1 + random.random())
+        logger.warning(f"Creating call to {phone_number} failed ({reason}), retry {attempt}/{CREATE_CALL_ATTEMPTS - 1} in {delay:.1f}s")
+        await asyncio.sleep(delay)
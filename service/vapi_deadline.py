@@ -0,0 +1,88 @@
+"""
+Latency budget for VAPI tool calls.
+
+VAPI waits on our webhook while the caller sits in silence, so every tool call
+runs under a budget. When a handler blows it we answer right away with a short
+spoken acknowledgement, let the handler finish in the background, and report
+how it actually went on the next tool call of the same call.
+
+Handlers run on the event loop like every other request. The blocking
+Supabase `.execute()` calls inside them go through `asyncio.to_thread`, so the
+loop stays free and the budget can fire while a query is still running.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+# Seconds a single webhook may spend before we answer with an acknowledgement
+TOOL_BUDGET_SECONDS = float(os.getenv("VAPI_TOOL_BUDGET_SECONDS", "3.5"))
+# Late outcomes nobody asked about again are dropped after this long
+OUTCOME_TTL_SECONDS = 15 * 60
+
+# Outcomes of handlers that finished after their acknowledgement was sent, per call
+_pending_outcomes: Dict[str, List[Dict[str, Any]]] = {}
+# Keep references so background tasks aren't garbage collected mid-flight
+_background_tasks: set = set()
+
+
+def _record_outcome(call_id: str, handler_name: str, future: "asyncio.Future") -> None:
+    _background_tasks.discard(future)
+    if future.cancelled():
+        outcome = {"error": "the request was cancelled"}
+    elif future.exception() is not None:
+        outcome = {"error": str(future.exception())}
+    else:
+        outcome = future.result()
+
+    logger.info(f"Late VAPI handler {handler_name} finished for call {call_id}: {outcome}")
+    _pending_outcomes.setdefault(call_id, []).append({
+        "handler": handler_name,
+        "outcome": outcome,
+        "finished_at": time.time()
+    })
+
+
+def pop_pending_outcomes(call_id: str) -> List[str]:
+    """Spoken summaries of work that finished after we had already acknowledged it"""
+    entries = _pending_outcomes.pop(call_id, [])
+    now = time.time()
+    for key in [k for k, v in _pending_outcomes.items() if v and now - v[-1]["finished_at"] > OUTCOME_TTL_SECONDS]:
+        _pending_outcomes.pop(key, None)
+
+    summaries = []
+    for entry in entries:
+        outcome = entry["outcome"]
+        if outcome.get("error"):
+            summaries.append(f"Heads up, your earlier request didn't go through: {outcome['error']}")
+        else:
+            summaries.append(f"Update on your earlier request: {outcome.get('result')}")
+    return summaries
+
+
+async def run_within_budget(
+    handler_name: str,
+    call_id: str,
+    handler: Callable[..., Awaitable[Dict[str, Any]]],
+    args: tuple,
+    acknowledgement: str,
+    budget: float,
+) -> Dict[str, Any]:
+    """
+    Run `handler(*args)` and return its result dict ({"result": ...} or {"error": ...}).
+
+    If it takes longer than `budget` seconds, return `{"result": acknowledgement}`
+    instead and keep the handler running; its outcome is queued for the call.
+    """
+    task = asyncio.ensure_future(handler(*args))
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout=max(budget, 0.0))
+    except asyncio.TimeoutError:
+        logger.warning(f"VAPI handler {handler_name} exceeded its {budget:.2f}s budget on call {call_id}, finishing in background")
+        _background_tasks.add(task)
+        task.add_done_callback(lambda t: _record_outcome(call_id, handler_name, t))
+        return {"result": acknowledgement}
@@ -0,0 +1,188 @@
+"""
+Run the agno pipelines (workflow.py, workflowv2.py, workflowTest.py) from the API.
+
+Workflows are registered by name and their modules are only imported the
+first time one is run, so the server doesn't build agents it never uses and
+importing a workflow module never executes it. A run streams SSE events with
+the same framing as chat_service (`data: {json}\\n\\n` with a `type` field):
+
+    {"type": "workflow_started", "workflow": name}
+    {"type": "step_started", "step": name, "index": ..., "started_at": seconds since the run started}
+    {"type": "step_output", "step": name, "content": ...}
+    {"type": "step_completed", "step": name, "duration": seconds, "status": "ok" | "skipped" | "cached" | "error"}
+    {"type": "done", "content": ..., "duration": seconds, "steps": [{"step", "duration", "status"}, ...]}
+    {"type": "error", "error": "..."}
+
+agno workflows report their steps through stream_events; DAG workflows
+(workflow_dag.py) through their on_step callback, so steps running side by
+side show up interleaved. Steps replayed from the step cache (workflow_cache.py)
+are "cached", and the steps of a Condition that evaluated False are "skipped",
+on both paths. API runs skip the step cache unless the request asks for it.
+"""
+
+import json
+import time
+import asyncio
+import contextlib
+import logging
+import importlib
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from agno.workflow import Workflow
+from agno.workflow.condition import Condition
+
+from workflow_cache import use_step_cache
+from workflow_dag import DagWorkflow, StepTiming
+
+logger = logging.getLogger(__name__)
+
+# name -> (module, attribute, description)
+WORKFLOWS = {
+    "mixed": ("workflow", "workflow", "Roast, echo in bold, then a plain function step"),
+    "research": ("workflowv2", "basic_workflow", "Research -> Summarize -> Condition(Fact Check) -> Write Article"),
+    "research_dag": ("workflowv2", "dag_workflow", "Research -> (Summarize | Condition(Fact Check)) -> Write Article"),
+    "roast": ("workflowTest", "workflow", "Roast agent, bold agent, then a custom function step"),
+}
+
+
+def list_workflows() -> List[Dict[str, str]]:
+    return [{"name": name, "description": description} for name, (_, _, description) in WORKFLOWS.items()]
+
+
+def get_workflow(name: str):
+    """
+    The workflow registered as `name`, importing its module on first use.
+
+    Raises:
+        KeyError: If no workflow has that name.
+    """
+    module_name, attribute, _ = WORKFLOWS[name]
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _event(data: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(data, default=str)}\n\n"
+
+
+def _content(content: Any) -> Any:
+    return content.model_dump(mode="json") if hasattr(content, "model_dump") else content
+
+
+def _conditions(steps: List[Any]) -> Dict[str, Condition]:
+    found: Dict[str, Condition] = {}
+    for step in steps or []:
+        if isinstance(step, Condition):
+            found[step.name] = step
+            found.update(_conditions(step.steps))
+            found.update(_conditions(step.else_steps))
+    return found
+
+
+def _skipped_steps(condition: Optional[Condition], name: str) -> List[str]:
+    # Report the steps the condition skipped by their own names, like the DAG path does
+    if condition is None:
+        return [name]
+    return [getattr(step, "name", None) or getattr(step, "__name__", name) for step in condition.steps or []] or [name]
+
+
+async def _agno_events(workflow: Workflow, input: str, started: float) -> AsyncGenerator[Dict[str, Any], None]:
+    step_started: Dict[Any, float] = {}
+    conditions = _conditions(workflow.steps)
+    async for event in workflow.arun(input=input, stream=True, stream_events=True):
+        kind = getattr(event, "event", None)
+        # Steps inside conditions are indexed (outer, inner)
+        index = getattr(event, "step_index", None)
+        key = (getattr(event, "step_name", None), json.dumps(index))
+        if kind == "StepStarted":
+            step_started[key] = time.perf_counter()
+            yield {"type": "step_started", "step": event.step_name, "index": index,
+                   "started_at": round(step_started[key] - started, 3)}
+        elif kind in ("StepCompleted", "StepError"):
+            duration = time.perf_counter() - step_started.pop(key, time.perf_counter())
+            if kind == "StepCompleted":
+                yield {"type": "step_output", "step": event.step_name, "content": _content(event.content)}
+            status = "error" if kind == "StepError" else "cached" if getattr(event, "cached", False) else "ok"
+            yield {"type": "step_completed", "step": event.step_name, "duration": round(duration, 3),
+                   "status": status, **({"error": event.error} if kind == "StepError" else {})}
+        elif kind == "ConditionExecutionCompleted" and not event.condition_result and not event.executed_steps:
+            for name in _skipped_steps(conditions.get(event.step_name), event.step_name):
+                yield {"type": "step_started", "step": name, "index": index,
+                       "started_at": round(time.perf_counter() - started, 3)}
+                yield {"type": "step_completed", "step": name, "duration": 0.0, "status": "skipped"}
+        elif kind == "WorkflowCompleted":
+            yield {"type": "_result", "content": _content(event.content)}
+        elif kind == "WorkflowError":
+            raise RuntimeError(event.error)
+
+
+def _status(timing: StepTiming) -> str:
+    if timing.skipped:
+        return "skipped"
+    if timing.error:
+        return "error"
+    return "cached" if timing.cached else "ok"
+
+
+async def _dag_events(workflow: DagWorkflow, input: str) -> AsyncGenerator[Dict[str, Any], None]:
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_step(kind: str, timing: StepTiming, content: Optional[str]) -> None:
+        if kind == "started":
+            queue.put_nowait({"type": "step_started", "step": timing.name, "index": None,
+                              "started_at": round(timing.started_at, 3)})
+            return
+        if not timing.skipped and not timing.error:
+            queue.put_nowait({"type": "step_output", "step": timing.name, "content": content})
+        queue.put_nowait({"type": "step_completed", "step": timing.name, "duration": round(timing.duration, 3),
+                          "status": _status(timing), **({"error": timing.error} if timing.error else {})})
+
+    run = asyncio.create_task(workflow.arun(input, on_step=on_step))
+    getter: Optional[asyncio.Task] = None
+    try:
+        while not (run.done() and queue.empty()):
+            getter = asyncio.create_task(queue.get())
+            await asyncio.wait({getter, run}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+            else:
+                getter.cancel()
+        result = run.result()
+        yield {"type": "_result", "content": result.content}
+    finally:
+        # A client that disconnects mid-run closes us while both tasks may still be pending
+        for task in (getter, run):
+            if task is not None and not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+
+async def stream_workflow(name: str, input: str, use_cache: bool = False) -> AsyncGenerator[str, None]:
+    """
+    SSE events for one run of the workflow registered as `name`.
+
+    Steps are only replayed from the step cache when `use_cache` is set.
+    """
+    started = time.perf_counter()
+    steps: List[Dict[str, Any]] = []
+    try:
+        with use_step_cache(use_cache):
+            workflow = get_workflow(name)
+            yield _event({"type": "workflow_started", "workflow": name})
+            events = _dag_events(workflow, input) if isinstance(workflow, DagWorkflow) else _agno_events(workflow, input, started)
+            async for event in events:
+                if event["type"] == "_result":
+                    yield _event({
+                        "type": "done",
+                        "content": event["content"],
+                        "duration": round(time.perf_counter() - started, 3),
+                        "steps": steps,
+                    })
+                    return
+                if event["type"] == "step_completed":
+                    steps.append({"step": event["step"], "duration": event["duration"], "status": event["status"]})
+                yield _event(event)
+            yield _event({"type": "error", "error": f"Workflow {name} ended without a result"})
+    except Exception as e:
+        logger.error(f"Error running workflow {name}: {str(e)}")
+        yield _event({"type": "error", "error": f"An error occurred: {str(e)}"})
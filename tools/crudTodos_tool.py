@@ -12,6 +12,7 @@ from agno.tools import Toolkit
 from agno.utils.log import logger
 from models import TodoCreate, TodoUpdate
 from service.todo_crud import TodoService
+from service.todo_matcher import TodoMatcher
 
 class crud_todos_tool(Toolkit):
     """
@@ -25,6 +26,7 @@ class crud_todos_tool(Toolkit):
     - delete_todo: Delete an existing todo by ID
     - update_todo: Update an existing todo's information
     - get_todos: Retrieve all todos for a user
+    - find_todo: Find the todo a user is referring to by (partial) description
     """
     def __init__(self, **kwargs):
         """
@@ -40,6 +42,7 @@ class crud_todos_tool(Toolkit):
                 self.delete_todo, 
                 self.update_todo, 
                 self.get_todos,
+                self.find_todo,
                 self.toggle_todo,
                 self.clear_completed_todos
             ], 
@@ -162,6 +165,33 @@ class crud_todos_tool(Toolkit):
                 "message": f"Error retrieving todos: {str(e)}"
             })
 
+    async def find_todo(self, user_id: str, text: str) -> str:
+        """
+        Find the todo a user is referring to without listing all of their todos.
+        Use this before update/toggle/delete when you only know what the todo is about.
+
+        Args:
+            user_id (str): The ID of the user who owns the todo.
+            text (str): What the user called the todo, e.g. "the milk one".
+        
+        Returns:
+            str: JSON string with the best matching todo, its match score (0-1), close alternatives and
+                 `ambiguous` (ask the user which one they meant before changing it).
+            
+        Example:
+            result = await find_todo("user123", "milk")
+        """
+        try:
+            result = await TodoMatcher.best_match(user_id, text)
+            return str(result)
+        except Exception as e:
+            logger.error(f"Error in find_todo tool: {str(e)}")
+            return str({
+                "success": False,
+                "data": None,
+                "message": f"Error matching todo: {str(e)}"
+            })
+
     async def toggle_todo(self, todo_id: str) -> str:
         """
         Toggle the completion status of a todo (completed <-> not completed).
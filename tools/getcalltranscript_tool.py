@@ -1,199 +1,272 @@
-import os
-import requests
+import asyncio
+import httpx
 
 from agno.tools import Toolkit
 from agno.utils.log import logger
+from service.call_store import CallStore
+from service.call_log_service import CallLogService
+from service import vapi_client
+from service.transcript_condenser import condense_call
+from service.transcript_waiter import transcript_waiter
 
 
 class GetCallTranscriptTool(Toolkit):
     def __init__(self, **kwargs):
         super().__init__(name="GetCallTranscriptTool", tools=[
-            self.get_call_transcript, 
+            self.get_call_transcript,
             self.get_call_analysis,
             self.get_last_call_transcript,
-            self.get_last_call_analysis
+            self.get_last_call_analysis,
+            self.wait_for_last_call_transcript,
+            self.search_call_history
         ], **kwargs)
-    
-    def _get_vapi_headers(self):
-        """Helper method to get VAPI API headers"""
-        return {
-            'Authorization': f'Bearer {os.getenv("VAPI_API_KEY")}',
-        }
-    
-    def _get_last_call_id(self):
-        """Helper method to read the last call ID from file"""
+
+    async def _get_last_call_id(self, user_id: str):
+        """Helper method to look up the user's most recent call in the call log"""
+        result = await CallLogService.get_last_call(user_id)
+        if result["success"]:
+            return result["data"]["call_id"]
+        return None
+
+    async def _fetch_call(self, call_id: str) -> dict:
+        """
+        Get a call object: local call cache, then our call store, and the VAPI API only on a miss.
+
+        Raises:
+            RuntimeError: If the VAPI API doesn't return the call.
+        """
+        cached = await vapi_client.call_cache.get(call_id)
+        if cached is not None:
+            return cached
+
+        stored = await CallStore.get_call(call_id)
+        if stored["success"]:
+            print(f"Call {call_id} served from call store")
+            await vapi_client.call_cache.put(stored["data"])
+            return stored["data"]
+
         try:
-            file_path = os.path.join(os.path.dirname(__file__), "last_call_id.txt")
-            if os.path.exists(file_path):
-                with open(file_path, "r") as f:
-                    call_id = f.read().strip()
-                return call_id
-            else:
-                return None
-        except Exception as e:
-            logger.error(f"Error reading last call ID from file: {str(e)}")
-            return None
+            return await vapi_client.get_call(call_id, use_cache=False)
+        except vapi_client.VapiError as e:
+            print(f'Failed to retrieve call details for {call_id}')
+            print(e.detail)
+            raise RuntimeError(e.detail)
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"VAPI request failed: {str(e) or type(e).__name__}")
 
-    def get_call_transcript(self,call_id:str) -> str:
+    async def get_call_transcript(self,call_id:str, full: bool = False) -> str:
         """
         Fetch the transcript of a completed call using the call ID.
-        
+        By default returns a condensed version (commitments, todo mentions, key user statements).
+
         Args:
             call_id (str): The call ID to fetch transcript for
-            
+            full (bool): Return the raw transcript instead of the condensed one. Only use when the user asks for it.
+
         Returns:
             str: The call transcript or error message
         """
         try:
-       
-            headers = self._get_vapi_headers()
-            file_path = os.path.join(os.path.dirname(__file__), "last_call_id.txt")
-            if os.path.exists(file_path):
-                with open(file_path, "r") as f:
-                    call_id = f.read().strip()
-            response = requests.get(f'https://api.vapi.ai/call/{call_id}', headers=headers)
-            
-            if response.status_code == 200:
-                call_data = response.json()
-                print(f'Call details for {call_id}:', call_data)
-                
-                # Try to get transcript from different possible locations
-                transcript = call_data.get('transcript')
-                if transcript:
-                    return f"Transcript for call {call_id}: {transcript}"
-                
-                # Try artifact.transcript
-                artifact = call_data.get('artifact', {})
-                if artifact and artifact.get('transcript'):
-                    return f"Transcript for call {call_id}: {artifact['transcript']}"
-                
-                # Try messages array
-                messages = call_data.get('messages', [])
-                if messages:
-                    conversation = []
-                    for msg in messages:
-                        role = msg.get('role', 'unknown')
-                        content = msg.get('content', 'No content')
-                        conversation.append(f"{role}: {content}")
-                    return f"Conversation for call {call_id}:\n" + "\n".join(conversation)
-                
-                # If no transcript found
-                status = call_data.get('status', 'unknown')
-                return f"Call {call_id} status: {status}. Transcript may not be available yet."
-            else:
-                print(f'Failed to retrieve call details for {call_id}')
-                print(response.text)
-                return f"Failed to retrieve call details for {call_id}: {response.text}"
-                
+            try:
+                call_data = await self._fetch_call(call_id)
+            except RuntimeError as e:
+                return f"Failed to retrieve call details for {call_id}: {str(e)}"
+
+            print(f'Call details for {call_id}:', call_data)
+
+            if not full:
+                return condense_call(call_data)
+
+            # Try to get transcript from different possible locations
+            transcript = call_data.get('transcript')
+            if transcript:
+                return f"Transcript for call {call_id}: {transcript}"
+
+            # Try artifact.transcript
+            artifact = call_data.get('artifact', {})
+            if artifact and artifact.get('transcript'):
+                return f"Transcript for call {call_id}: {artifact['transcript']}"
+
+            # Try messages array
+            messages = call_data.get('messages', [])
+            if messages:
+                conversation = []
+                for msg in messages:
+                    role = msg.get('role', 'unknown')
+                    content = msg.get('content', msg.get('message', 'No content'))
+                    conversation.append(f"{role}: {content}")
+                return f"Conversation for call {call_id}:\n" + "\n".join(conversation)
+
+            # If no transcript found
+            status = call_data.get('status', 'unknown')
+            return f"Call {call_id} status: {status}. Transcript may not be available yet."
+
         except Exception as e:
             logger.error(f"Error fetching transcript for call {call_id}: {str(e)}")
             return f"Error fetching transcript for call {call_id}: {str(e)}"
 
-    def get_call_analysis(self, call_id: str) -> str:
+    async def get_call_analysis(self, call_id: str, full: bool = False) -> str:
         """
         Get detailed analysis and summary of a call including transcript if available.
-        
+
         Args:
             call_id (str): The call ID to analyze
-            
+            full (bool): Include the cost breakdown and every message with timestamps instead of a condensed transcript
+
         Returns:
             str: Detailed call analysis including transcript, duration, status, etc.
         """
         try:
-            # Use the working REST API approach
-            headers = self._get_vapi_headers()
-            response = requests.get(f'https://api.vapi.ai/call/{call_id}', headers=headers)
-            
-            if response.status_code == 200:
-                call_data = response.json()
-                print(f'Call details for analysis {call_id}:', call_data)
-                
-                analysis = []
-                analysis.append(f"=== Call Analysis for {call_id} ===")
-                
-                # Basic call info
-                status = call_data.get('status', 'unknown')
-                analysis.append(f"Status: {status}")
-                
-                if 'startedAt' in call_data:
-                    analysis.append(f"Started: {call_data['startedAt']}")
-                    
-                if 'endedAt' in call_data:
-                    analysis.append(f"Ended: {call_data['endedAt']}")
-                
-                if 'cost' in call_data:
-                    analysis.append(f"Cost: ${call_data['cost']}")
-                
-                if 'costBreakdown' in call_data:
-                    breakdown = call_data['costBreakdown']
-                    analysis.append(f"Cost Breakdown: {breakdown}")
-                
-                # Try to get transcript from different possible locations
-                transcript_found = False
-                
-                # Method 1: Direct transcript property 
-                transcript = call_data.get('transcript')
-                if transcript:
-                    analysis.append(f"\n=== Transcript ===\n{transcript}")
-                    transcript_found = True
-                
-                # Method 2: Artifact transcript
-                artifact = call_data.get('artifact', {})
-                if not transcript_found and artifact and artifact.get('transcript'):
-                    analysis.append(f"\n=== Transcript ===\n{artifact['transcript']}")
-                    transcript_found = True
-                
-                # Method 3: Messages array
-                messages = call_data.get('messages', [])
-                if messages:
-                    analysis.append("\n=== Conversation Messages ===")
-                    for i, message in enumerate(messages):
-                        role = message.get('role', 'unknown')
-                        content = message.get('content', 'No content')
-                        timestamp = message.get('time', message.get('timestamp', 'No timestamp'))
-                        analysis.append(f"{i+1}. [{timestamp}] {role}: {content}")
-                    transcript_found = True
-                
-                if not transcript_found:
-                    analysis.append("\n⚠️  No transcript available yet. This may be because:")
-                    analysis.append("- The call is still in progress")
-                    analysis.append("- The call just ended and transcript is being processed")
-                    analysis.append("- Transcription was disabled for this call")
-                
+            try:
+                call_data = await self._fetch_call(call_id)
+            except RuntimeError as e:
+                return f"Failed to retrieve call analysis for {call_id}: {str(e)}"
+
+            print(f'Call details for analysis {call_id}:', call_data)
+
+            analysis = []
+            analysis.append(f"=== Call Analysis for {call_id} ===")
+
+            # Basic call info
+            status = call_data.get('status', 'unknown')
+            analysis.append(f"Status: {status}")
+
+            if 'startedAt' in call_data:
+                analysis.append(f"Started: {call_data['startedAt']}")
+
+            if 'endedAt' in call_data:
+                analysis.append(f"Ended: {call_data['endedAt']}")
+
+            if 'cost' in call_data:
+                analysis.append(f"Cost: ${call_data['cost']}")
+
+            if not full:
+                analysis.append("\n=== Key Points ===")
+                analysis.append(condense_call(call_data))
                 return "\n".join(analysis)
-            else:
-                print(f'Failed to retrieve call analysis for {call_id}')
-                print(response.text)
-                return f"Failed to retrieve call analysis for {call_id}: {response.text}"
-                
+
+            if 'costBreakdown' in call_data:
+                breakdown = call_data['costBreakdown']
+                analysis.append(f"Cost Breakdown: {breakdown}")
+
+            # Try to get transcript from different possible locations
+            transcript_found = False
+
+            # Method 1: Direct transcript property
+            transcript = call_data.get('transcript')
+            if transcript:
+                analysis.append(f"\n=== Transcript ===\n{transcript}")
+                transcript_found = True
+
+            # Method 2: Artifact transcript
+            artifact = call_data.get('artifact', {})
+            if not transcript_found and artifact and artifact.get('transcript'):
+                analysis.append(f"\n=== Transcript ===\n{artifact['transcript']}")
+                transcript_found = True
+
+            # Method 3: Messages array
+            messages = call_data.get('messages', [])
+            if messages:
+                analysis.append("\n=== Conversation Messages ===")
+                for i, message in enumerate(messages):
+                    role = message.get('role', 'unknown')
+                    content = message.get('content', message.get('message', 'No content'))
+                    timestamp = message.get('time', message.get('timestamp', 'No timestamp'))
+                    analysis.append(f"{i+1}. [{timestamp}] {role}: {content}")
+                transcript_found = True
+
+            if not transcript_found:
+                analysis.append("\n⚠️  No transcript available yet. This may be because:")
+                analysis.append("- The call is still in progress")
+                analysis.append("- The call just ended and transcript is being processed")
+                analysis.append("- Transcription was disabled for this call")
+
+            return "\n".join(analysis)
+
         except Exception as e:
             logger.error(f"Error getting call analysis for {call_id}: {str(e)}")
             return f"Error getting call analysis for {call_id}: {str(e)}"
 
-    def get_last_call_transcript(self) -> str:
+    async def get_last_call_transcript(self, user_id: str, full: bool = False) -> str:
         """
-        Fetch the transcript of the last call made (reads call ID from last_call_id.txt).
-        
+        Fetch the transcript of the user's most recent call.
+
+        Args:
+            user_id (str): The user whose last call to fetch
+            full (bool): Return the raw transcript instead of the condensed one
+
         Returns:
             str: The call transcript or error message
         """
-        call_id = self._get_last_call_id()
+        call_id = await self._get_last_call_id(user_id)
         if not call_id:
-            return "No last call ID found. Make sure you've made a call first using the calling tool."
-        
+            return "No calls found for this user. Make sure you've made a call first using the calling tool."
+
         print(f"Fetching transcript for last call ID: {call_id}")
-        return self.get_call_transcript(call_id)
+        return await self.get_call_transcript(call_id, full=full)
 
-    def get_last_call_analysis(self) -> str:
+    async def get_last_call_analysis(self, user_id: str, full: bool = False) -> str:
         """
-        Get detailed analysis of the last call made (reads call ID from last_call_id.txt).
-        
+        Get detailed analysis of the user's most recent call.
+
+        Args:
+            user_id (str): The user whose last call to analyze
+            full (bool): Include the cost breakdown and every message
+
         Returns:
             str: Detailed call analysis including transcript, duration, status, etc.
         """
-        call_id = self._get_last_call_id()
+        call_id = await self._get_last_call_id(user_id)
         if not call_id:
-            return "No last call ID found. Make sure you've made a call first using the calling tool."
-        
+            return "No calls found for this user. Make sure you've made a call first using the calling tool."
+
         print(f"Fetching analysis for last call ID: {call_id}")
-        return self.get_call_analysis(call_id)
+        return await self.get_call_analysis(call_id, full=full)
+
+    async def wait_for_last_call_transcript(self, user_id: str, timeout_seconds: int = 90) -> str:
+        """
+        Wait until the transcript of the user's most recent call is ready, then return it (condensed).
+        Use this right after a call ends instead of retrying get_last_call_transcript.
+
+        Args:
+            user_id (str): The user whose last call to wait for
+            timeout_seconds (int): Give up after this many seconds (default 90)
+
+        Returns:
+            str: The condensed call transcript or a message saying it isn't ready yet
+        """
+        call_id = await self._get_last_call_id(user_id)
+        if not call_id:
+            return "No calls found for this user. Make sure you've made a call first using the calling tool."
+
+        try:
+            call_data = await transcript_waiter.wait_for(call_id, timeout=float(timeout_seconds))
+        except asyncio.TimeoutError:
+            return f"Transcript for call {call_id} was still not ready after {timeout_seconds} seconds. The call may still be in progress."
+
+        await vapi_client.call_cache.put(call_data)
+        return condense_call(call_data)
+
+    async def search_call_history(self, user_id: str, query: str, limit: int = 5) -> str:
+        """
+        Search all of the user's past call transcripts, e.g. "what did I commit to on last week's call?".
+
+        Args:
+            user_id (str): The user whose calls to search
+            query (str): Keywords to look for, e.g. "gym commit" or "report deadline"
+            limit (int): Maximum number of calls to return (default 5)
+
+        Returns:
+            str: Matching calls (newest-best first) with highlighted snippets, or a message if nothing matched
+        """
+        result = await CallStore.search_transcripts(user_id, query, limit)
+        if not result["success"]:
+            return result["message"]
+        if not result["data"]:
+            return f"No past calls mention '{query}'."
+
+        lines = [f"Calls matching '{query}':"]
+        for hit in result["data"]:
+            when = hit.get("ended_at") or hit.get("started_at") or "unknown time"
+            lines.append(f"- Call {hit['call_id']} ({when}): {hit.get('snippet', '')}")
+        return "\n".join(lines)
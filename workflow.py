@@ -1,55 +1,58 @@
 from agno.agent import Agent
 import os
-from agno.models.google import Gemini
+import asyncio
+from typing import Dict
+from model_provider import get_model
 from agno.workflow import Workflow, StepOutput
 DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "gemini-2.5-flash")
 POSTGRES_DB_URL = os.getenv("POSTGRES_AGNO_DB_URL")
 model_id = DEFAULT_MODEL
-model = Gemini(id=model_id)
-def data_preprocessor(step_input):
-    data_preprocessor_agent = Agent(
-        model=model,
-      
-        name="HabitElevate AI Assistant",
-      
-        instructions="whatever input you get you try to roast the user for their questions !",
+model = get_model(model_id)
 
-        markdown=True,
-        stream_intermediate_steps=False,
-        num_history_runs=10,
-    )
+STEP_INSTRUCTIONS = {
+    "roast": "whatever input you get you try to roast the user for their questions !",
+    "bold": "YOU DONT DO ANYTHING JUST RETURN THE INPUT YOU GET IN THE BOLD LETTERS ",
+}
+
+_step_agents: Dict[str, Agent] = {}
+
+def get_step_agent(kind: str) -> Agent:
+    """
+    Agent for a workflow step, created on first use and reused by every run
+    after that. The step agents keep no history or storage, so one instance
+    can serve concurrent runs.
+    """
+    if kind not in _step_agents:
+        _step_agents[kind] = Agent(
+            model=model,
+            name="HabitElevate AI Assistant",
+            instructions=STEP_INSTRUCTIONS[kind],
+            markdown=True,
+            stream_events=False,
+            num_history_runs=10,
+        )
+    return _step_agents[kind]
+
+def _content(response) -> str:
+    # Extract content from response
+    if hasattr(response, 'content'):
+        return response.content
+    elif hasattr(response, 'output') and hasattr(response.output, 'content'):
+        return response.output.content
+    return str(response)
+
+async def data_preprocessor(step_input):
     print("inside the dataPreprocessor")
-    response = data_preprocessor_agent.run(step_input.input)
-  
-    return StepOutput(content=f"Processed: {response}") 
-def howitworksAgent(step_input):
-    agent = Agent(
-        model=model,
-      
-        name="HabitElevate AI Assistant",
-      
-        instructions="YOU DONT DO ANYTHING JUST RETURN THE INPUT YOU GET IN THE BOLD LETTERS ",
+    response = await get_step_agent("roast").arun(step_input.input)
 
-        markdown=True,
-        stream_intermediate_steps=False,
-        num_history_runs=10,
-    )
-  
+    return StepOutput(content=f"Processed: {_content(response)}")
+async def howitworksAgent(step_input):
     query = step_input.input if hasattr(step_input, 'input') else "ARE HUMANS IMMORTAL?"
-    
-    # Run the agent synchronously (non-streaming for simplicity)
+
+    # Non-streaming for simplicity; awaited so other runs keep going meanwhile
     try:
-        response = agent.run(query)
-        
-        # Extract content from response
-        if hasattr(response, 'content'):
-            final_content = response.content
-        elif hasattr(response, 'output') and hasattr(response.output, 'content'):
-            final_content = response.output.content
-        else:
-            final_content = str(response)
-            
-        return StepOutput(content=f"Processed: {final_content}")
+        response = await get_step_agent("bold").arun(query)
+        return StepOutput(content=f"Processed: {_content(response)}")
     except Exception as e:
         print(f"Error in howitworksAgent: {e}")
         return StepOutput(content=f"Error: {str(e)}")
@@ -65,16 +68,18 @@ def step2(step_input):
 workflow = Workflow(
     name="Mixed Execution Pipeline",
     description="This workflow is a mixed execution pipeline that processes the input through a series of steps.EACH Steps output is the input for the next step",
-  
+
     steps=[
             #i can pass the fx with agent or raw python fx in here !
-            #so basically pass small function that do tool calling seperately and 
+            #so basically pass small function that do tool calling seperately and
             #each step can now emit a event right !
+            #the agent steps are async, so run the workflow with arun / aprint_response
         data_preprocessor,  # Function
         howitworksAgent,
         step2
-      
+
     ]
 )
 
-workflow.print_response("Analyze the competitive landscape for fintech startups", markdown=True)
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(workflow.aprint_response("Analyze the competitive landscape for fintech startups", markdown=True))
@@ -12,13 +12,14 @@ from agno.team import Team
 
 from agno.workflow.step import Step
 from agno.workflow.workflow import Workflow
-from agno.models.google import Gemini
+from model_provider import get_model
 from agno.workflow import Workflow,Step, StepOutput, StepInput
+from workflow_cache import memoize
 DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "gemini-2.5-flash")
 POSTGRES_DB_URL = os.getenv("POSTGRES_AGNO_DB_URL")
 
 model_id = DEFAULT_MODEL
-model = Gemini(id=model_id)
+model = get_model(model_id)
 # Defining my agents in here
 roast_agent = Agent(
         model=model,
@@ -87,6 +88,8 @@ workflow = Workflow(
       
     ]
 )
+# reruns with the same input replay step outputs from the step cache (WORKFLOW_STEP_CACHE=off to disable)
+memoize(workflow)
 
 if __name__ == "__main__":
     # Try with stream=False to avoid async issues
@@ -0,0 +1,356 @@
+"""
+Step-level memoization for agno workflows.
+
+Rerunning a workflow with the same input used to call every agent again. A
+step's output is now cached under a key made of:
+
+- the workflow and step name
+- a hash of what the step actually receives (the message an agent step is
+  sent, or the input and previous outputs a function step gets)
+- the step's configuration: model, instructions, output schema, tools for an
+  agent; the function's source for a function step
+
+so editing a prompt or a function only recomputes that step and whatever it
+feeds into, while unchanged prefixes of the pipeline are replayed from the
+cache. Two workflows that share a step name never replay each other's output.
+
+Entries live in a SQLite file (WORKFLOW_STEP_CACHE_PATH) so they survive
+restarts and expire after WORKFLOW_STEP_CACHE_TTL_SECONDS. `memoize(workflow)`
+swaps a workflow's steps for cached ones in place, and
+`get_step_cache().invalidate(name)` drops one step's entries. Set
+WORKFLOW_STEP_CACHE=off to run without it, or wrap a single run in
+`use_step_cache(False)`. A replayed step's StepCompletedEvent has
+`cached=True` so listeners can tell it from a fresh run. Async runs go through `aget` and
+`aput`, which do the SQLite I/O in a worker thread so steps running side by
+side on one event loop don't wait on each other's disk access.
+"""
+
+import os
+import json
+import contextlib
+import contextvars
+import time
+import asyncio
+import hashlib
+import inspect
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+from agno.run.workflow import StepCompletedEvent, StepStartedEvent
+from agno.workflow.condition import Condition
+from agno.workflow.step import Step
+from agno.workflow.types import StepInput, StepOutput
+from agno.workflow.workflow import STEP_TYPE_MAPPING
+
+logger = logging.getLogger(__name__)
+
+WORKFLOW_STEP_CACHE = os.getenv("WORKFLOW_STEP_CACHE", "on")
+WORKFLOW_STEP_CACHE_PATH = os.getenv("WORKFLOW_STEP_CACHE_PATH", os.path.join(".cache", "workflow_steps.sqlite3"))
+WORKFLOW_STEP_CACHE_TTL_SECONDS = float(os.getenv("WORKFLOW_STEP_CACHE_TTL_SECONDS", "86400"))
+
+_cache_enabled: contextvars.ContextVar[bool] = contextvars.ContextVar("workflow_step_cache_enabled", default=True)
+
+
+@contextlib.contextmanager
+def use_step_cache(enabled: bool) -> Iterator[None]:
+    """Turn step caching on or off for the runs made inside this block"""
+    token = _cache_enabled.set(enabled)
+    try:
+        yield
+    finally:
+        _cache_enabled.reset(token)
+
+
+def step_cache_enabled() -> bool:
+    return _cache_enabled.get()
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return value
+
+
+def executor_fingerprint(step: Step) -> Dict[str, Any]:
+    """What the step runs, so a changed prompt or function doesn't reuse stale output"""
+    agent = step.agent
+    if agent is not None:
+        model = agent.model
+        tools = []
+        for tool in agent.tools or []:
+            tools.append(getattr(tool, "name", None) or getattr(tool, "__name__", None) or type(tool).__name__)
+        return {
+            "agent": agent.name,
+            "model": f"{type(model).__name__}:{getattr(model, 'id', None)}" if model is not None else None,
+            "temperature": getattr(model, "temperature", None),
+            "instructions": agent.instructions,
+            "description": agent.description,
+            "expected_output": agent.expected_output,
+            "output_schema": agent.output_schema.model_json_schema() if agent.output_schema else None,
+            "markdown": agent.markdown,
+            "tools": tools,
+        }
+    executor = step.executor if step.executor is not None else getattr(step, "team", None)
+    try:
+        source = inspect.getsource(executor)
+    except (OSError, TypeError):
+        source = None
+    return {
+        "executor": f"{getattr(executor, '__module__', '')}.{getattr(executor, '__qualname__', type(executor).__name__)}",
+        "source": _hash(source) if source else None,
+    }
+
+
+class StepCache:
+    """Step outputs in a SQLite file, keyed by step, input and configuration"""
+
+    def __init__(self, path: str = WORKFLOW_STEP_CACHE_PATH, ttl_seconds: float = WORKFLOW_STEP_CACHE_TTL_SECONDS):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "stores": 0}
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS step_outputs ("
+                " key TEXT PRIMARY KEY, step_name TEXT NOT NULL, content TEXT NOT NULL,"
+                " created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS step_outputs_step_idx ON step_outputs (step_name)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @staticmethod
+    def key(step_name: str, step_input: Any, config: Dict[str, Any], namespace: Optional[str] = None) -> str:
+        """`namespace` (the workflow name) keeps workflows that share a step name apart"""
+        return _hash({"workflow": namespace, "step": step_name, "input": _jsonable(step_input), "config": config})
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT content FROM step_outputs WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+            self.stats["misses" if row is None else "hits"] += 1
+        return None if row is None else json.loads(row[0])
+
+    def put(self, key: str, step_name: str, content: Any, ttl_seconds: Optional[float] = None) -> None:
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        try:
+            payload = json.dumps(_jsonable(content))
+        except (TypeError, ValueError):
+            logger.warning(f"Not caching output of step {step_name}: it isn't JSON serializable")
+            return
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO step_outputs (key, step_name, content, created_at, expires_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, step_name, payload, now, now + ttl),
+            )
+            self.stats["stores"] += 1
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, step_name: str, content: Any, ttl_seconds: Optional[float] = None) -> None:
+        await asyncio.to_thread(self.put, key, step_name, content, ttl_seconds)
+
+    def invalidate(self, step_name: Optional[str] = None) -> int:
+        """Drop cached outputs of one step (all steps when None); returns how many were removed"""
+        with self._lock, self._connect() as conn:
+            if step_name is None:
+                cursor = conn.execute("DELETE FROM step_outputs")
+            else:
+                cursor = conn.execute("DELETE FROM step_outputs WHERE step_name = ?", (step_name,))
+        return cursor.rowcount
+
+    def purge_expired(self) -> int:
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute("DELETE FROM step_outputs WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+
+class MemoizedStep(Step):
+    """A Step that replays its output from a StepCache when it has seen the same input and config"""
+
+    def __init__(self, *args, cache: StepCache, ttl_seconds: Optional[float] = None,
+                 namespace: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+        self.cache_ttl_seconds = ttl_seconds
+        self.cache_namespace = namespace
+
+    @classmethod
+    def from_step(cls, step: Step, cache: StepCache, ttl_seconds: Optional[float] = None,
+                  namespace: Optional[str] = None) -> "MemoizedStep":
+        return cls(
+            name=step.name,
+            agent=step.agent,
+            team=step.team,
+            executor=step.executor,
+            step_id=step.step_id,
+            description=step.description,
+            max_retries=step.max_retries,
+            skip_on_failure=step.skip_on_failure,
+            strict_input_validation=step.strict_input_validation,
+            add_workflow_history=step.add_workflow_history,
+            num_history_runs=step.num_history_runs,
+            cache=cache,
+            ttl_seconds=ttl_seconds,
+            namespace=namespace,
+        )
+
+    def _cache_key(self, step_input: StepInput) -> str:
+        if self.agent is not None or self.team is not None:
+            # Exactly what the agent is sent (agno passes it the last step's output)
+            received = self._prepare_message(step_input.input, step_input.previous_step_outputs)
+        else:
+            received = {"input": step_input.input, "previous": step_input.previous_step_content}
+        return self.cache.key(self.name, received, executor_fingerprint(self), self.cache_namespace)
+
+    def _replayed(self, content: Any) -> Optional[StepOutput]:
+        if content is None:
+            return None
+        logger.info(f"Step {self.name}: replaying cached output")
+        return self._process_step_output(StepOutput(content=content))
+
+    def _cached(self, key: str) -> Optional[StepOutput]:
+        return self._replayed(self.cache.get(key))
+
+    async def _acached(self, key: str) -> Optional[StepOutput]:
+        return self._replayed(await self.cache.aget(key))
+
+    @staticmethod
+    def _storable(output: Any) -> bool:
+        return isinstance(output, StepOutput) and output.success is not False and output.content is not None
+
+    def _store(self, key: str, output: Any) -> None:
+        if self._storable(output):
+            self.cache.put(key, self.name, output.content, self.cache_ttl_seconds)
+
+    async def _astore(self, key: str, output: Any) -> None:
+        if self._storable(output):
+            await self.cache.aput(key, self.name, output.content, self.cache_ttl_seconds)
+
+    def _replay_stream(self, cached: StepOutput, kwargs: Dict[str, Any]) -> List[Any]:
+        # Same events a streamed run of the step emits, so listeners still see it start and finish
+        run = kwargs.get("workflow_run_response")
+        if not (kwargs.get("stream_events") and run):
+            return [cached]
+        common = {
+            "run_id": run.run_id or "",
+            "workflow_name": run.workflow_name or "",
+            "workflow_id": run.workflow_id or "",
+            "session_id": run.session_id or "",
+            "step_name": self.name,
+            "step_index": kwargs.get("step_index"),
+            "step_id": self.step_id,
+            "parent_step_id": kwargs.get("parent_step_id"),
+        }
+        completed = StepCompletedEvent(**common, content=cached.content, step_response=cached)
+        completed.cached = True
+        return [StepStartedEvent(**common), cached, completed]
+
+    def execute(self, step_input: StepInput, *args, **kwargs) -> StepOutput:
+        if not step_cache_enabled():
+            return super().execute(step_input, *args, **kwargs)
+        key = self._cache_key(step_input)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        output = super().execute(step_input, *args, **kwargs)
+        self._store(key, output)
+        return output
+
+    async def aexecute(self, step_input: StepInput, *args, **kwargs) -> StepOutput:
+        if not step_cache_enabled():
+            return await super().aexecute(step_input, *args, **kwargs)
+        key = self._cache_key(step_input)
+        cached = await self._acached(key)
+        if cached is not None:
+            return cached
+        output = await super().aexecute(step_input, *args, **kwargs)
+        await self._astore(key, output)
+        return output
+
+    def execute_stream(self, step_input: StepInput, *args, **kwargs):
+        if not step_cache_enabled():
+            yield from super().execute_stream(step_input, *args, **kwargs)
+            return
+        key = self._cache_key(step_input)
+        cached = self._cached(key)
+        if cached is not None:
+            yield from self._replay_stream(cached, kwargs)
+            return
+        for event in super().execute_stream(step_input, *args, **kwargs):
+            self._store(key, event)
+            yield event
+
+    async def aexecute_stream(self, step_input: StepInput, *args, **kwargs):
+        if not step_cache_enabled():
+            async for event in super().aexecute_stream(step_input, *args, **kwargs):
+                yield event
+            return
+        key = self._cache_key(step_input)
+        cached = await self._acached(key)
+        if cached is not None:
+            for event in self._replay_stream(cached, kwargs):
+                yield event
+            return
+        async for event in super().aexecute_stream(step_input, *args, **kwargs):
+            await self._astore(key, event)
+            yield event
+
+
+# agno looks step types up by exact class when it saves a workflow session
+STEP_TYPE_MAPPING.setdefault(MemoizedStep, STEP_TYPE_MAPPING[Step])
+
+
+def _memoize_steps(steps: List[Any], cache: StepCache, only: Optional[set], namespace: Optional[str]) -> List[Any]:
+    memoized = []
+    for step in steps:
+        if callable(step) and not isinstance(step, (Step, Condition)):
+            step = Step(name=step.__name__, executor=step)
+        if isinstance(step, Condition):
+            step.steps = _memoize_steps(step.steps or [], cache, only, namespace)
+            if step.else_steps:
+                step.else_steps = _memoize_steps(step.else_steps, cache, only, namespace)
+        elif isinstance(step, Step) and not isinstance(step, MemoizedStep) and (only is None or step.name in only):
+            step = MemoizedStep.from_step(step, cache, namespace=namespace)
+        memoized.append(step)
+    return memoized
+
+
+def memoize(workflow, cache: Optional["StepCache"] = None, steps: Optional[List[str]] = None):
+    """
+    Cache the outputs of `workflow`'s steps (or just the named ones) in place.
+    Conditions are descended into; other step containers are left as they are.
+    Entries are keyed under the workflow's name.
+    """
+    cache = cache or get_step_cache()
+    if cache is None:
+        return workflow
+    workflow.steps = _memoize_steps(list(workflow.steps or []), cache, set(steps) if steps else None, workflow.name)
+    return workflow
+
+
+_step_cache: Optional[StepCache] = None
+
+
+def get_step_cache() -> Optional[StepCache]:
+    """The shared step cache, or None when WORKFLOW_STEP_CACHE=off"""
+    global _step_cache
+    if WORKFLOW_STEP_CACHE == "off":
+        return None
+    if _step_cache is None:
+        _step_cache = StepCache()
+    return _step_cache
@@ -0,0 +1,201 @@
+"""
+A small DAG runner for agent workflows.
+
+agno's Workflow runs its steps one after another, even when a step doesn't
+need the one before it. Here every step names the steps it depends on; a
+step starts as soon as all of its dependencies are done, so independent
+branches run concurrently and a step with several dependencies gets all of
+their outputs joined together.
+
+Each step is an agent or a function taking a StepInput (sync or async), like
+an agno Step, and can have a condition that skips it. Every run records when
+each step started and how long it took, relative to the start of the run.
+With a StepCache (workflow_cache.py) step outputs are memoized the same way
+as for memoized agno workflows, keyed under the workflow's name.
+"""
+
+import time
+import asyncio
+import inspect
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from agno.agent import Agent
+from agno.workflow import StepInput, StepOutput
+
+from workflow_cache import StepCache, executor_fingerprint, step_cache_enabled
+
+
+@dataclass
+class DagStep:
+    name: str
+    agent: Optional[Agent] = None
+    executor: Optional[Callable[[StepInput], Any]] = None
+    depends_on: List[str] = field(default_factory=list)
+    # Evaluated on this step's StepInput; False skips the step
+    condition: Optional[Callable[[StepInput], bool]] = None
+    description: Optional[str] = None
+
+
+@dataclass
+class StepTiming:
+    name: str
+    started_at: float
+    duration: float
+    skipped: bool = False
+    cached: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class DagRunOutput:
+    content: Optional[str]
+    outputs: Dict[str, Optional[str]]
+    timings: List[StepTiming]
+    duration: float
+
+    def timings_table(self) -> str:
+        lines = [f"{'step':20}{'start':>9}{'duration':>10}  status"]
+        for timing in sorted(self.timings, key=lambda t: t.started_at):
+            status = "ok"
+            if timing.skipped:
+                status = "skipped"
+            elif timing.error:
+                status = f"error: {timing.error}"
+            elif timing.cached:
+                status = "cached"
+            lines.append(f"{timing.name:20}{timing.started_at:>8.2f}s{timing.duration:>9.2f}s  {status}")
+        lines.append(f"{'total':20}{'':>9}{self.duration:>9.2f}s")
+        return "\n".join(lines)
+
+
+class DagWorkflow:
+    def __init__(self, name: str, steps: List[DagStep], description: Optional[str] = None,
+                 cache: Optional[StepCache] = None):
+        self.name = name
+        self.description = description
+        self.cache = cache
+        self.steps = {step.name: step for step in steps}
+        if len(self.steps) != len(steps):
+            raise ValueError("Step names must be unique")
+        for step in steps:
+            if (step.agent is None) == (step.executor is None):
+                raise ValueError(f"Step {step.name} needs exactly one of agent or executor")
+            missing = [dep for dep in step.depends_on if dep not in self.steps]
+            if missing:
+                raise ValueError(f"Step {step.name} depends on unknown steps: {missing}")
+        self._check_acyclic()
+        # The output of the run is the output of the last step nothing depends on
+        needed = {dep for step in steps for dep in step.depends_on}
+        self.final_step = [step.name for step in steps if step.name not in needed][-1]
+
+    def _check_acyclic(self) -> None:
+        state: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name) == 1:
+                raise ValueError(f"Workflow {self.name} has a cycle through step {name}")
+            if state.get(name) == 2:
+                return
+            state[name] = 1
+            for dep in self.steps[name].depends_on:
+                visit(dep)
+            state[name] = 2
+
+        for name in self.steps:
+            visit(name)
+
+    @staticmethod
+    def _join(outputs: Dict[str, Optional[str]]) -> Optional[str]:
+        present = {name: content for name, content in outputs.items() if content}
+        if not present:
+            return None
+        if len(present) == 1:
+            return next(iter(present.values()))
+        return "\n\n".join(f"## Output from {name}\n{content}" for name, content in present.items())
+
+    @staticmethod
+    def _message(step_input: StepInput) -> str:
+        if step_input.previous_step_content:
+            return f"{step_input.input}\n\n{step_input.previous_step_content}"
+        return step_input.input
+
+    async def _run_step(self, step: DagStep, step_input: StepInput, timing: StepTiming) -> Optional[str]:
+        key = None
+        if self.cache is not None and step_cache_enabled():
+            received = self._message(step_input)
+            if step.agent is None:
+                received = {"input": step_input.input, "previous": step_input.previous_step_content}
+            key = self.cache.key(step.name, received, executor_fingerprint(step), self.name)
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                timing.cached = True
+                return cached
+
+        if step.agent is not None:
+            response = await step.agent.arun(self._message(step_input))
+            content = response.content
+        else:
+            result = step.executor(step_input)
+            if inspect.isawaitable(result):
+                result = await result
+            content = result.content if isinstance(result, StepOutput) else result
+
+        if key is not None and content is not None:
+            await self.cache.aput(key, step.name, content)
+        return content
+
+    async def arun(self, input: str, on_step: Optional[Callable[[str, StepTiming, Optional[str]], None]] = None) -> DagRunOutput:
+        """
+        Run every step once its dependencies are done and return outputs plus timings.
+
+        `on_step(kind, timing, content)` is called with "started" when a step
+        starts and "completed" when it finishes (content is its output).
+        """
+        started = time.perf_counter()
+        outputs: Dict[str, Optional[str]] = {}
+        timings: List[StepTiming] = []
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run(step: DagStep) -> Optional[str]:
+            await asyncio.gather(*(tasks[dep] for dep in step.depends_on))
+            dep_outputs = {dep: outputs.get(dep) for dep in step.depends_on}
+            step_input = StepInput(
+                input=input,
+                previous_step_content=self._join(dep_outputs),
+                previous_step_outputs={name: StepOutput(step_name=name, content=content) for name, content in dep_outputs.items()},
+            )
+            step_started = time.perf_counter()
+            timing = StepTiming(name=step.name, started_at=step_started - started, duration=0.0)
+            timings.append(timing)
+            if on_step is not None:
+                on_step("started", timing, None)
+            try:
+                if step.condition is not None and not step.condition(step_input):
+                    timing.skipped = True
+                    outputs[step.name] = None
+                else:
+                    outputs[step.name] = await self._run_step(step, step_input, timing)
+                return outputs[step.name]
+            except Exception as e:
+                timing.error = str(e)
+                raise
+            finally:
+                timing.duration = time.perf_counter() - step_started
+                if on_step is not None:
+                    on_step("completed", timing, outputs.get(step.name))
+
+        for step in self.steps.values():
+            tasks[step.name] = asyncio.ensure_future(run(step))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        return DagRunOutput(
+            content=outputs.get(self.final_step),
+            outputs=outputs,
+            timings=timings,
+            duration=time.perf_counter() - started,
+        )
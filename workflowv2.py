@@ -6,11 +6,16 @@ from agno.workflow.types import StepInput
 from agno.workflow.workflow import Workflow
 from agno.agent import Agent
 import os
-from agno.models.google import Gemini
+import sys
+import time
+import asyncio
+from model_provider import get_model
 from agno.workflow import Workflow, StepOutput
+from workflow_dag import DagStep, DagWorkflow
+from workflow_cache import get_step_cache, memoize
 DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "gemini-2.5-flash")
 model_id = DEFAULT_MODEL
-model = Gemini(id=model_id)
+model = get_model(model_id)
 # === BASIC AGENTS ===
 researcher = Agent(
     model=model,
@@ -107,8 +112,51 @@ basic_workflow = Workflow(
         write_article,
     ],
 )
+# Reruns with the same input replay unchanged steps from the step cache
+memoize(basic_workflow)
+
+# === SAME PIPELINE AS A DAG ===
+# Summarizing and fact-checking only need the research, so they run side by
+# side; the article waits for both. Fact-checking is decided on the research
+# itself here, since the summary isn't ready yet when it starts.
+dag_workflow = DagWorkflow(
+    name="Basic DAG Workflow",
+    description="Research -> (Summarize | Condition(Fact Check)) -> Write Article",
+    steps=[
+        DagStep(name="research", description="Research the topic", agent=researcher),
+        DagStep(name="summarize", description="Summarize research findings", agent=summarizer,
+                depends_on=["research"]),
+        DagStep(name="fact_check", description="Verify facts and claims", agent=fact_checker,
+                depends_on=["research"], condition=needs_fact_checking),
+        DagStep(name="write_article", description="Write final article", agent=writer,
+                depends_on=["summarize", "fact_check"]),
+    ],
+    cache=get_step_cache(),
+)
+
+
+async def compare_latency(topic: str) -> None:
+    """Run the topic through both workflows and print end-to-end latency"""
+    started = time.perf_counter()
+    await basic_workflow.arun(input=topic)
+    sequential = time.perf_counter() - started
+
+    result = await dag_workflow.arun(topic)
+    print(result.timings_table())
+    print(f"sequential: {sequential:.2f}s  dag: {result.duration:.2f}s")
+
 
 if __name__ == "__main__":
+    # --fresh [step ...]: forget cached outputs (of the given steps, or all) before running
+    if "--fresh" in sys.argv and get_step_cache() is not None:
+        names = [arg for arg in sys.argv[sys.argv.index("--fresh") + 1:] if not arg.startswith("--")]
+        for name in names or [None]:
+            get_step_cache().invalidate(name)
+
+    if "--compare" in sys.argv:
+        asyncio.run(compare_latency("Recent breakthroughs in quantum computing"))
+        sys.exit()
+
     print("🚀 Running Basic Linear Workflow Example")
     print("=" * 50)
 